@@ -0,0 +1,36 @@
+"""baseline schema
+
+スキーマの正は database/migrations/*.sql です（拡張機能 uuid-ossp・RLS ポリシー・
+パーティションなど Alembic で表現していない定義を含むため）。
+このリビジョンはスキーマを作成せず、001〜009 を適用済みであることを記録するだけです。
+SQL マイグレーションの適用後に alembic stamp head で記録してください。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 01:03:05.933191
+"""
+from __future__ import annotations
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import context, op
+
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # 空のデータベースに記録だけしてしまわないよう、SQL マイグレーションの適用を確認
+    if context.is_offline_mode():
+        return
+    if not sa.inspect(op.get_bind()).has_table('sales_daily_summary'):
+        raise RuntimeError(
+            'database/migrations/*.sql を番号順に適用してから alembic stamp head を実行してください'
+        )
+
+
+def downgrade() -> None:
+    pass
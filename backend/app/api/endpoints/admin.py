@@ -0,0 +1,25 @@
+"""Admin and metrics endpoints."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.break_even import break_even_cache_stats
+from app.pricing import price_cache_stats
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+def get_metrics() -> Dict[str, Any]:
+    """
+    キャッシュ等の運用メトリクスを取得
+
+    Returns:
+        メトリクス情報
+    """
+    return {
+        "price_cache": price_cache_stats(),
+        "break_even_cache": break_even_cache_stats(),
+    }
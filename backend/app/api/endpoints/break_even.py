@@ -2,29 +2,49 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from decimal import Decimal
+from typing import Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import extract, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.models import FixedCost, SalesData
-from app.schemas import BreakEvenResponse, round_jpy, round_rate
+from app.api.deps import get_async_db, get_db
+from app.break_even import (
+    DEFAULT_TREND_MONTHS,
+    calculate_product_contributions,
+    forecast_break_even,
+    get_break_even_response,
+)
+from app.break_even_scenarios import evaluate_scenarios
+from app.schemas import (
+    BreakEvenForecastResponse,
+    BreakEvenResponse,
+    BreakEvenScenarioRequest,
+    BreakEvenScenarioResponse,
+    ProductContributionResponse,
+)
 
 router = APIRouter()
 
 
 @router.get("/current", response_model=BreakEvenResponse)
-def get_current_break_even(
+async def get_current_break_even(
     year_month: str = Query(None, description="対象年月（YYYY-MM形式）"),
-    db: Session = Depends(get_db),
+    refresh: bool = Query(False, description="キャッシュとスナップショットを使わず再計算する"),
+    trend_months: int = Query(DEFAULT_TREND_MONTHS, ge=1, le=60, description="トレンドの月数"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     現在の損益分岐点情報を取得
 
+    break_even_analysis に保存した月次スナップショットを返します。
+    売上・固定費・月次売上が変更された月は再計算します。
+    結果はプロセス内でキャッシュし、該当月への書き込み時に破棄します。
+
     Args:
         year_month: 対象年月（指定しない場合は当月）
+        refresh: キャッシュとスナップショットを使わず再計算するかどうか
+        trend_months: トレンドの月数（対象月を含む過去Nか月）
         db: データベースセッション
 
     Returns:
@@ -37,85 +57,140 @@ def get_current_break_even(
         else:
             target_date = date.today().replace(day=1)
 
-        target_year = target_date.year
-        target_month = target_date.month
-
-        # 固定費の取得
-        fixed_cost = (
-            db.query(FixedCost)
-            .filter(
-                extract("year", FixedCost.year_month) == target_year,
-                extract("month", FixedCost.year_month) == target_month,
-            )
-            .first()
+        # キャッシュ・スナップショットを参照（未作成・古い場合のみ再計算）
+        # 集計処理は同期APIのため、非同期セッション上で run_sync により実行
+        return await db.run_sync(get_break_even_response, target_date, trend_months, refresh=refresh)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"code": "INVALID_PARAM", "message": "年月の形式が不正です（YYYY-MM形式で指定してください）"}},
         )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"error": {"code": "DATABASE_ERROR", "message": str(e)}},
+        )
+
+
+@router.get("/forecast", response_model=BreakEvenForecastResponse)
+def get_break_even_forecast(
+    year_month: str = Query(None, description="対象年月（YYYY-MM形式）"),
+    as_of: str = Query(None, description="実績の集計日（YYYY-MM-DD形式）"),
+    db: Session = Depends(get_db),
+):
+    """
+    月末の売上高・達成率の着地見込みを取得
+
+    月途中では /current の達成率は実績のみのため低く出ます。日次売上のペースから
+    月末の売上高と達成率を予測し、95%の上限・下限を返します。
 
-        if not fixed_cost:
-            # 固定費データがない場合はデフォルト値を使用
-            fixed_cost_amount = Decimal("4000000")  # デフォルト400万円
+    Args:
+        year_month: 対象年月（指定しない場合は当月）
+        as_of: 実績の集計日（指定しない場合は当日）
+        db: データベースセッション
+
+    Returns:
+        月末の着地見込み
+    """
+    try:
+        if year_month:
+            target_date = datetime.strptime(year_month, "%Y-%m").date()
         else:
-            fixed_cost_amount = fixed_cost.amount
-
-        # 売上データの集計
-        sales_summary = (
-            db.query(
-                func.sum(SalesData.quantity_kg * SalesData.unit_price_per_kg).label("revenue"),
-                func.sum(SalesData.quantity_kg * SalesData.unit_cost_per_kg).label("cost"),
-            )
-            .filter(
-                extract("year", SalesData.sale_date) == target_year,
-                extract("month", SalesData.sale_date) == target_month,
-            )
-            .first()
+            target_date = date.today().replace(day=1)
+        as_of_date = datetime.strptime(as_of, "%Y-%m-%d").date() if as_of else None
+
+        return forecast_break_even(db, target_date, as_of_date)
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"code": "INVALID_PARAM", "message": "日付の形式が不正です（YYYY-MM / YYYY-MM-DD形式で指定してください）"}},
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"error": {"code": "DATABASE_ERROR", "message": str(e)}},
         )
 
-        # 売上データがない場合のデフォルト値
-        revenue = sales_summary.revenue or Decimal("0")
-        variable_cost = sales_summary.cost or Decimal("0")
 
-        # 変動費率と粗利率の計算
-        if revenue > 0:
-            variable_cost_rate = round_rate(variable_cost / revenue)
-            gross_profit = revenue - variable_cost
-            gross_margin_rate = round_rate(gross_profit / revenue)
-        else:
-            variable_cost_rate = Decimal("0.75")  # デフォルト75%
-            gross_margin_rate = Decimal("0.25")  # デフォルト25%
+@router.get("/products", response_model=ProductContributionResponse)
+def get_product_contributions(
+    year_month: str = Query(None, description="対象年月（YYYY-MM形式）"),
+    limit: int = Query(20, ge=1, le=10000, description="取得件数"),
+    sort_by: Literal[
+        "contribution_margin", "contribution_margin_rate", "revenue", "variable_cost"
+    ] = Query("contribution_margin", description="並び替え項目"),
+    order: Literal["asc", "desc"] = Query("desc", description="並び順"),
+    db: Session = Depends(get_db),
+):
+    """
+    商品別の貢献利益（損益分岐点への寄与）を取得
 
-        # 損益分岐点の計算
-        if gross_margin_rate > 0:
-            break_even_revenue = round_jpy(fixed_cost_amount / gross_margin_rate)
-        else:
-            break_even_revenue = 0
+    粗利率を押し下げている商品を調べる場合は
+    sort_by=contribution_margin_rate&order=asc を指定します。
 
-        # 達成率の計算
-        if break_even_revenue > 0:
-            achievement_rate = round_rate(revenue / Decimal(break_even_revenue))
+    Args:
+        year_month: 対象年月（指定しない場合は当月）
+        limit: 取得件数（上位N件）
+        sort_by: 並び替え項目
+        order: 並び順（asc / desc）
+        db: データベースセッション
+
+    Returns:
+        商品別の売上・変動費・貢献利益と固定費カバー率
+    """
+    try:
+        if year_month:
+            target_date = datetime.strptime(year_month, "%Y-%m").date()
         else:
-            achievement_rate = Decimal("0")
+            target_date = date.today().replace(day=1)
 
-        # 差額の計算
-        delta_revenue = round_jpy(revenue - Decimal(break_even_revenue))
+        return calculate_product_contributions(
+            db,
+            target_date,
+            limit=limit,
+            sort_by=sort_by,
+            descending=order == "desc",
+        )
 
-        # ステータスの判定
-        if achievement_rate >= Decimal("1.5"):
-            status = "safe"
-        elif achievement_rate >= Decimal("1.0"):
-            status = "warning"
-        else:
-            status = "danger"
-
-        return BreakEvenResponse(
-            year_month=target_date.strftime("%Y-%m"),
-            fixed_costs=round_jpy(fixed_cost_amount),
-            current_revenue=round_jpy(revenue),
-            variable_cost_rate=variable_cost_rate,
-            gross_margin_rate=gross_margin_rate,
-            break_even_revenue=break_even_revenue,
-            achievement_rate=achievement_rate,
-            delta_revenue=delta_revenue,
-            status=status,
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"code": "INVALID_PARAM", "message": "年月の形式が不正です（YYYY-MM形式で指定してください）"}},
         )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"error": {"code": "DATABASE_ERROR", "message": str(e)}},
+        )
+
+
+@router.post("/scenarios", response_model=BreakEvenScenarioResponse)
+def simulate_break_even_scenarios(
+    payload: BreakEvenScenarioRequest,
+    db: Session = Depends(get_db),
+):
+    """
+    損益分岐点のwhat-ifシナリオを一括計算
+
+    固定費の内訳（人件費・家賃・その他など）と粗利率の範囲の全組み合わせについて、
+    /current と同じ計算式・丸めで損益分岐点売上高と達成率を計算します。
+
+    Args:
+        payload: シナリオ入力（基準年月、売上高、固定費・粗利率の範囲）
+        db: データベースセッション
+
+    Returns:
+        軸ごとの値、平坦化した結果行列、状態ごとの件数
+    """
+    try:
+        if payload.year_month:
+            target_date = datetime.strptime(payload.year_month, "%Y-%m").date()
+        else:
+            target_date = date.today().replace(day=1)
+
+        return evaluate_scenarios(db, target_date, payload)
 
     except ValueError as e:
         raise HTTPException(
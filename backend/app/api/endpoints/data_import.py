@@ -1,19 +1,26 @@
 """Data import endpoints."""
 from __future__ import annotations
 
-import io
+import os
 import uuid
-from datetime import datetime
+from concurrent.futures import Future
+from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-import pandas as pd
 
-from app.api.deps import get_db
-from app.models import ImportLog, MonthlyRevenue, Product, SalesData
-from app.schemas import round_jpy
+from app.api.deps import get_async_db, get_db
+from app.api.pagination import decode_cursor, keyset_page
+from app.core.cache import invalidate_break_even
+from app.core.executors import get_import_pool
+from app.models import ImportLog, MonthlyRevenue, SalesData
+from app.schemas import IMPORT_JOB_MAX_ERRORS, ImportJobResponse, round_jpy
 
 router = APIRouter()
 
@@ -64,6 +71,7 @@ def save_monthly_revenue(
             message = "月次総売上高を登録しました"
 
         db.commit()
+        invalidate_break_even([target_date])
 
         return {
             "success": True,
@@ -86,30 +94,40 @@ def save_monthly_revenue(
 
 
 @router.get("/monthly-revenue")
-def get_monthly_revenue_list(
+async def get_monthly_revenue_list(
+    response: Response,
     limit: int = 12,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    月次総売上高の一覧を取得
+    月次総売上高の一覧を取得（新しい月順）
+
+    続きがある場合は次ページのカーソルを X-Next-Cursor ヘッダーで返します。
+    cursor を指定した場合は year_month によるキーセットページングとなり、
+    offset は無視されます。
 
     Args:
+        response: レスポンス（X-Next-Cursor ヘッダーを設定）
         limit: 取得件数
-        offset: オフセット
+        offset: オフセット（cursor を指定しない場合のみ）
+        cursor: 前のページの X-Next-Cursor
         db: データベースセッション
 
     Returns:
         月次総売上高リスト
     """
+    query = select(MonthlyRevenue).order_by(MonthlyRevenue.year_month.desc()).limit(limit + 1)
+    if cursor is not None:
+        (year_month,) = decode_cursor(cursor, date.fromisoformat)
+        query = query.where(MonthlyRevenue.year_month < year_month)
+    else:
+        query = query.offset(offset)
+
     try:
-        revenues = (
-            db.query(MonthlyRevenue)
-            .order_by(MonthlyRevenue.year_month.desc())
-            .limit(limit)
-            .offset(offset)
-            .all()
-        )
+        result = await db.execute(query)
+        revenues = keyset_page(result.scalars().all(), limit, response, lambda revenue: (revenue.year_month,))
 
         return [
             {
@@ -129,104 +147,351 @@ def get_monthly_revenue_list(
         )
 
 
+def _on_import_finished(future: Future) -> None:
+    """ジョブ終了時にAPIプロセス側の損益分岐点キャッシュを破棄"""
+    invalidate_break_even()
+
+
+# 取込み元IDの最大文字数（ファイル名・シート名を付けて import_row_hashes.source に保存）
+SOURCE_ID_MAX_LENGTH = 100
+
+
+def _check_source_id(source_id: Optional[str]) -> None:
+    """取込み元IDのバリデーション"""
+    if source_id is not None and not (0 < len(source_id.strip()) <= SOURCE_ID_MAX_LENGTH):
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"code": "INVALID_PARAM", "message": f"取込み元IDは1〜{SOURCE_ID_MAX_LENGTH}文字で指定してください"}},
+        )
+
+
+def _create_import_log(db: Session, **values) -> str:
+    """インポートログを作成・コミットしてIDを返す（スレッドプールで実行）"""
+    import_log = ImportLog(**values)
+    db.add(import_log)
+    db.commit()
+    return str(import_log.id)
+
+
+def _unchanged_response(import_log: ImportLog) -> dict:
+    """前回と同じ内容のファイルのレスポンス（取込みは行わない）"""
+    return {
+        "success": True,
+        "unchanged": True,
+        "import_log_id": str(import_log.id),
+        "file_name": import_log.file_name,
+        "imported": 0,
+        "skipped": 0,
+        "unchanged_rows": import_log.total_rows or 0,
+        "deleted": 0,
+        "errors": [],
+        "warnings": [],
+    }
+
+
 @router.post("/excel")
 async def import_excel(
     file: UploadFile = File(...),
     import_type: str = "products",
+    streaming: bool = True,
+    background: bool = True,
+    dry_run: bool = False,
+    incremental: bool = True,
+    source_id: Optional[str] = None,
     db: Session = Depends(get_db),
 ):
     """
-    Excelファイルからデータをインポート
+    Excel・CSVファイルからデータをインポート
+
+    アップロードを一時ファイルに書き出し、ワーカープロセスでインポートします。
+    すぐにジョブIDを返すため、進捗は GET /jobs/{job_id} で確認してください。
+    .xlsx・.csv は一定行数ごとに読み込み・検証・書き込みを行うため、
+    ファイルサイズによらずメモリ使用量はほぼ一定です。
+    同じファイル名の前回のインポートと内容が同じ場合は何もせずに返します。
+    source_id を指定した場合は、同じ取込み元IDの前回のインポートからの差分
+    （追加・変更・削除された行）のみ反映します。
 
     Args:
-        file: アップロードされたExcelファイル
+        file: アップロードされたExcel・CSVファイル
         import_type: インポートタイプ（products または sales）
+        streaming: チャンク単位で処理するかどうか（False の場合はファイル全体を読み込む、.xls は常に全体）
+        background: バックグラウンドで実行するかどうか（False の場合は完了まで待って結果を返す）
+        dry_run: 検証のみ行い、データベースには書き込まない（商品マスタとの照合は行わない）
+        incremental: 前回の同じファイル名のインポートと同じ内容のファイルを取り込まないかどうか
+        source_id: 取込み元ID（同じデータを更新して出力したファイルに共通のID、指定時のみ行単位の差分取込み）
         db: データベースセッション
 
     Returns:
-        インポート結果
+        ジョブID（background=True）、インポート結果または検証結果（dry_run=True）
     """
-    if not file.filename.endswith(('.xlsx', '.xls')):
+    # pandas・openpyxl は初回のインポート時に読み込む（APIの起動を速くするため）
+    from app.importers.excel import spool_upload
+    from app.importers.hashing import file_digest, import_source, unchanged_import
+    from app.importers.validation import IMPORT_RULES, dry_run as validate_only
+    from app.jobs.imports import import_chunks, read_chunks, run_import_job, save_result
+
+    if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"code": "INVALID_FILE", "message": "Excel・CSVファイルをアップロードしてください"}},
+        )
+    suffix = os.path.splitext(file.filename)[1]
+    if import_type not in IMPORT_RULES:
         raise HTTPException(
             status_code=400,
-            detail={"error": {"code": "INVALID_FILE", "message": "Excelファイルをアップロードしてください"}},
+            detail={"error": {"code": "INVALID_PARAM", "message": f"インポートタイプが不正です: {import_type}"}},
         )
+    _check_source_id(source_id)
 
+    path = None
     try:
-        # ファイルを読み込む
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-
-        imported_count = 0
-        skipped_count = 0
-        errors = []
-
-        if import_type == "products":
-            # 商品データのインポート
-            for index, row in df.iterrows():
-                try:
-                    # 必須カラムのチェック
-                    if pd.isna(row.get('商品コード')) or pd.isna(row.get('商品名')):
-                        skipped_count += 1
-                        errors.append({
-                            "row": index + 2,
-                            "reason": "商品コードまたは商品名が空です",
-                        })
-                        continue
-
-                    # 既存データの確認
-                    existing = db.query(Product).filter(
-                        Product.product_code == str(row['商品コード'])
-                    ).first()
-
-                    if existing:
-                        # 更新
-                        existing.product_name = str(row['商品名'])
-                        if not pd.isna(row.get('原価')):
-                            existing.unit_cost_per_kg = Decimal(str(row['原価']))
-                        if not pd.isna(row.get('単価')):
-                            existing.unit_price_per_kg = Decimal(str(row['単価']))
-                    else:
-                        # 新規作成
-                        product = Product(
-                            product_code=str(row['商品コード']),
-                            product_name=str(row['商品名']),
-                            unit_cost_per_kg=Decimal(str(row.get('原価', 0))),
-                            unit_price_per_kg=Decimal(str(row.get('単価', 0))) if not pd.isna(row.get('単価')) else None,
-                        )
-                        db.add(product)
-
-                    imported_count += 1
-
-                except Exception as e:
-                    skipped_count += 1
-                    errors.append({
-                        "row": index + 2,
-                        "reason": str(e),
-                    })
+        # 一時ファイルへの書き出しはスレッドプールで行い、イベントループを止めない
+        path = await run_in_threadpool(spool_upload, file.file, suffix)
+
+        if dry_run:
+            result = await run_in_threadpool(
+                validate_only, import_type, read_chunks(path, file.filename, streaming)
+            )
+            return {
+                "success": not result.errors,
+                "dry_run": True,
+                "total": result.total_rows,
+                "imported": result.imported_rows,
+                "skipped": result.skipped_rows,
+                "errors": result.errors,
+                "warnings": result.warnings,
+            }
+
+        # 前回と同じ内容のファイルは取り込まない
+        file_hash = None
+        if incremental:
+            file_hash = await run_in_threadpool(file_digest, path)
+            previous = await run_in_threadpool(unchanged_import, db, import_type, file.filename, file_hash)
+            if previous is not None:
+                return _unchanged_response(previous)
+
+        if background:
+            job_id = await run_in_threadpool(
+                _create_import_log,
+                db,
+                import_type=import_type,
+                file_name=file.filename,
+                status="queued",
+                processed_rows=0,
+                file_hash=file_hash,
+            )
+
+            future = get_import_pool().submit(
+                run_import_job, job_id, path, file.filename, import_type, streaming, source_id
+            )
+            path = None  # 一時ファイルはジョブが削除する
+            future.add_done_callback(_on_import_finished)
+
+            return JSONResponse(
+                status_code=202,
+                content={"success": True, "job_id": job_id, "status": "queued"},
+            )
+
+        # 完了まで待つ場合もDB処理はスレッドプールで実行
+        result = await run_in_threadpool(
+            import_chunks,
+            db,
+            import_type,
+            read_chunks(path, file.filename, streaming),
+            source=import_source(source_id) if source_id is not None else None,
+        )
 
         # インポートログを保存
         import_log = ImportLog(
-            import_type=import_type,
-            file_name=file.filename,
-            total_rows=len(df),
-            imported_rows=imported_count,
-            skipped_rows=skipped_count,
-            error_details={"errors": errors} if errors else None,
+            import_type=import_type, file_name=file.filename, status="completed", file_hash=file_hash
         )
+        save_result(import_log, result)
         db.add(import_log)
-        db.commit()
+        await run_in_threadpool(db.commit)
+        # 取り込んだデータが損益分岐点のどの月に影響するかは限定しない
+        invalidate_break_even()
 
         return {
             "success": True,
-            "imported": imported_count,
-            "skipped": skipped_count,
-            "errors": errors,
+            "imported": result.imported_rows,
+            "skipped": result.skipped_rows,
+            "unchanged_rows": result.unchanged_rows,
+            "deleted": result.deleted_rows,
+            "errors": result.errors,
+            "warnings": result.warnings,
         }
 
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
+        raise HTTPException(
+            status_code=500,
+            detail={"error": {"code": "IMPORT_ERROR", "message": f"インポート処理でエラーが発生しました: {str(e)}"}},
+        )
+    finally:
+        if path is not None:
+            os.remove(path)
+
+
+@router.post("/excel/batch")
+async def import_excel_batch(
+    files: List[UploadFile] = File(...),
+    import_type: str = "products",
+    streaming: bool = True,
+    incremental: bool = True,
+    source_id: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    複数のExcel・CSVファイル（全シート）をまとめてインポート
+
+    シートごとの読み込み・検証をプロセスプールで並列に実行し、
+    検証を通過した行を1トランザクションで登録します（失敗時はすべて取り消し）。
+    インポートログはファイルごとに作成し、シートごとの件数を記録します。
+    前回と同じ内容のファイルは読み込みません。source_id を指定した場合は、
+    取込み元IDとファイル名・シートごとに前回からの差分のみ反映します。
+
+    Args:
+        files: アップロードされたExcel・CSVファイル
+        import_type: インポートタイプ（products または sales）
+        streaming: チャンク単位で読み込むかどうか（.xls は常に全体）
+        incremental: 前回の同じファイル名のインポートと同じ内容のファイルを取り込まないかどうか
+        source_id: 取込み元ID（指定時のみ行単位の差分取込み）
+        db: データベースセッション
+
+    Returns:
+        ファイル・シートごとのインポート結果
+    """
+    # pandas・openpyxl は初回のインポート時に読み込む（APIの起動を速くするため）
+    from app.importers.excel import spool_upload
+    from app.importers.hashing import file_digest, unchanged_import
+    from app.importers.validation import IMPORT_RULES
+    from app.jobs.imports import import_files
+
+    for file in files:
+        if not file.filename.endswith(('.xlsx', '.xls', '.csv')):
+            raise HTTPException(
+                status_code=400,
+                detail={"error": {"code": "INVALID_FILE", "message": f"Excel・CSVファイルをアップロードしてください: {file.filename}"}},
+            )
+    if import_type not in IMPORT_RULES:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"code": "INVALID_PARAM", "message": f"インポートタイプが不正です: {import_type}"}},
+        )
+    _check_source_id(source_id)
+
+    spooled: List[tuple] = []
+    try:
+        results = []
+        changed = []
+        for file in files:
+            path = await run_in_threadpool(spool_upload, file.file, os.path.splitext(file.filename)[1])
+            spooled.append((path, file.filename))
+            file_hash = None
+            if incremental:
+                file_hash = await run_in_threadpool(file_digest, path)
+                previous = await run_in_threadpool(unchanged_import, db, import_type, file.filename, file_hash)
+                if previous is not None:
+                    results.append(_unchanged_response(previous))
+                    continue
+            changed.append((path, file.filename, file_hash))
+
+        import_logs = await run_in_threadpool(import_files, db, import_type, changed, streaming, source_id)
+        # コミット後は属性の再読み込みが発生するため、結果はコミット前に組み立てる
+        for import_log in import_logs:
+            details = import_log.error_details or {}
+            results.append(
+                {
+                    "import_log_id": str(import_log.id),
+                    "file_name": import_log.file_name,
+                    "imported": import_log.imported_rows,
+                    "skipped": import_log.skipped_rows,
+                    "unchanged_rows": import_log.unchanged_rows,
+                    "deleted": import_log.deleted_rows,
+                    "sheets": details.get("sheets", []),
+                    "errors": details.get("errors", []),
+                    "warnings": details.get("warnings", []),
+                }
+            )
+        await run_in_threadpool(db.commit)
+        invalidate_break_even()
+
+        return {
+            "success": True,
+            "imported": sum(result["imported"] for result in results),
+            "skipped": sum(result["skipped"] for result in results),
+            "unchanged_rows": sum(result["unchanged_rows"] for result in results),
+            "deleted": sum(result["deleted"] for result in results),
+            "files": results,
+        }
+
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
         raise HTTPException(
             status_code=500,
             detail={"error": {"code": "IMPORT_ERROR", "message": f"インポート処理でエラーが発生しました: {str(e)}"}},
         )
+    finally:
+        for path, _ in spooled:
+            os.remove(path)
+
+
+@router.get("/jobs/{job_id}", response_model=ImportJobResponse)
+def get_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+):
+    """
+    インポートジョブの状態を取得
+
+    Args:
+        job_id: ジョブID（インポートログID）
+        db: データベースセッション
+
+    Returns:
+        ジョブの状態・進捗・結果
+    """
+    try:
+        log_id = uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"code": "INVALID_PARAM", "message": "ジョブIDの形式が不正です"}},
+        )
+
+    try:
+        import_log = db.get(ImportLog, log_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"error": {"code": "DATABASE_ERROR", "message": str(e)}},
+        )
+    if import_log is None:
+        raise HTTPException(
+            status_code=404,
+            detail={"error": {"code": "NOT_FOUND", "message": "インポートジョブが見つかりません"}},
+        )
+
+    details = import_log.error_details or {}
+    errors = details.get("errors", [])
+    warnings = details.get("warnings", [])
+    return ImportJobResponse(
+        job_id=str(import_log.id),
+        import_type=import_log.import_type,
+        file_name=import_log.file_name,
+        status=import_log.status,
+        processed_rows=import_log.processed_rows or 0,
+        total_rows=import_log.total_rows,
+        imported_rows=import_log.imported_rows,
+        skipped_rows=import_log.skipped_rows,
+        unchanged_rows=import_log.unchanged_rows or 0,
+        deleted_rows=import_log.deleted_rows or 0,
+        rows_per_second=import_log.rows_per_second,
+        started_at=import_log.started_at.isoformat() if import_log.started_at else None,
+        finished_at=import_log.finished_at.isoformat() if import_log.finished_at else None,
+        error_message=import_log.error_message,
+        error_count=len(errors),
+        errors=errors[:IMPORT_JOB_MAX_ERRORS],
+        warning_count=len(warnings),
+        warnings=warnings[:IMPORT_JOB_MAX_ERRORS],
+    )
@@ -2,12 +2,16 @@
 from __future__ import annotations
 
 import uuid
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_db
+from app.api.pagination import decode_cursor, keyset_page
 from app.models import PriceSimulation, Product
 from app.schemas import (
     PriceSimulationSaveRequest,
@@ -17,6 +21,18 @@ from app.schemas import (
 
 router = APIRouter()
 
+# シミュレーション履歴（SimulationHistoryResponse）の列
+_HISTORY_COLUMNS = (
+    PriceSimulation.id,
+    Product.product_name,
+    PriceSimulation.simulation_at,
+    PriceSimulation.input_cost_per_kg,
+    PriceSimulation.target_margin_rate,
+    PriceSimulation.calculated_price_per_kg,
+    PriceSimulation.selected_price_per_kg,
+    PriceSimulation.status,
+)
+
 
 @router.post("/save", response_model=PriceSimulationSaveResponse)
 def save_price_simulation(
@@ -81,44 +97,58 @@ def save_price_simulation(
 
 
 @router.get("/history", response_model=List[SimulationHistoryResponse])
-def get_simulation_history(
+async def get_simulation_history(
+    response: Response,
     limit: int = 50,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    シミュレーション履歴を取得
+    シミュレーション履歴を取得（新しい順）
+
+    続きがある場合は次ページのカーソルを X-Next-Cursor ヘッダーで返します。
+    cursor を指定した場合は (simulation_at, id) によるキーセットページングとなり、
+    offset は無視されます（何ページ目でも同じコストで取得できます）。
 
     Args:
+        response: レスポンス（X-Next-Cursor ヘッダーを設定）
         limit: 取得件数
-        offset: オフセット
+        offset: オフセット（cursor を指定しない場合のみ）
+        cursor: 前のページの X-Next-Cursor
         db: データベースセッション
 
     Returns:
         シミュレーション履歴リスト
     """
-    try:
-        simulations = (
-            db.query(PriceSimulation)
-            .join(Product)
-            .order_by(PriceSimulation.simulation_at.desc())
-            .limit(limit)
-            .offset(offset)
-            .all()
+    # レスポンスに必要な列のみを商品名と合わせて1回のクエリで取得（ORMオブジェクトは作らない）
+    query = (
+        select(*_HISTORY_COLUMNS)
+        .join(Product, PriceSimulation.product_id == Product.id)
+        .order_by(PriceSimulation.simulation_at.desc(), PriceSimulation.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        simulation_at, simulation_id = decode_cursor(cursor, datetime.fromisoformat, uuid.UUID)
+        query = query.where(
+            tuple_(PriceSimulation.simulation_at, PriceSimulation.id) < tuple_(simulation_at, simulation_id)
         )
+    else:
+        query = query.offset(offset)
+
+    try:
+        result = await db.execute(query)
+        rows = keyset_page(result.all(), limit, response, lambda row: (row.simulation_at.isoformat(), row.id))
 
         return [
             SimulationHistoryResponse(
-                id=str(sim.id),
-                product_name=sim.product.product_name,
-                simulation_at=sim.simulation_at.isoformat(),
-                input_cost_per_kg=sim.input_cost_per_kg,
-                target_margin_rate=sim.target_margin_rate,
-                calculated_price_per_kg=sim.calculated_price_per_kg,
-                selected_price_per_kg=sim.selected_price_per_kg,
-                status=sim.status,
+                **{
+                    **row._mapping,
+                    "id": str(row.id),
+                    "simulation_at": row.simulation_at.isoformat(),
+                }
             )
-            for sim in simulations
+            for row in rows
         ]
 
     except Exception as e:
@@ -1,43 +1,64 @@
 """Product endpoints."""
 from __future__ import annotations
 
-from typing import List
+import uuid
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
+from app.api.deps import get_async_db, get_db
+from app.api.pagination import decode_cursor, keyset_page
+from app.jobs.repricing import reprice_products
 from app.models import Product
-from app.schemas import ProductListResponse
+from app.schemas import ProductListResponse, RepricingResponse
 
 router = APIRouter()
 
 
 @router.get("/list", response_model=List[ProductListResponse])
-def get_product_list(
+async def get_product_list(
+    response: Response,
     limit: int = 100,
     offset: int = 0,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    商品リストを取得
+    商品リストを取得（商品名順）
+
+    続きがある場合は次ページのカーソルを X-Next-Cursor ヘッダーで返します。
+    cursor を指定した場合は (product_name, id) によるキーセットページングとなり、
+    offset は無視されます。
 
     Args:
+        response: レスポンス（X-Next-Cursor ヘッダーを設定）
         limit: 取得件数
-        offset: オフセット
+        offset: オフセット（cursor を指定しない場合のみ）
+        cursor: 前のページの X-Next-Cursor
         db: データベースセッション
 
     Returns:
         商品リスト
     """
+    query = (
+        select(Product)
+        .where(Product.is_active == True)
+        .order_by(Product.product_name, Product.id)
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        product_name, product_id = decode_cursor(cursor, str, uuid.UUID)
+        query = query.where(tuple_(Product.product_name, Product.id) > tuple_(product_name, product_id))
+    else:
+        query = query.offset(offset)
+
     try:
-        products = (
-            db.query(Product)
-            .filter(Product.is_active == True)
-            .order_by(Product.product_name)
-            .limit(limit)
-            .offset(offset)
-            .all()
+        result = await db.execute(query)
+        products = keyset_page(
+            result.scalars().all(), limit, response, lambda product: (product.product_name, product.id)
         )
 
         return [
@@ -56,3 +77,28 @@ def get_product_list(
             status_code=500,
             detail={"error": {"code": "DATABASE_ERROR", "message": str(e)}},
         )
+
+
+@router.post("/reprice", response_model=RepricingResponse)
+def reprice_product_catalog(
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+):
+    """
+    全商品の推奨価格を目標粗利率から一括で再計算
+
+    Args:
+        dry_run: True の場合は件数のみ集計し、変更しない
+        db: データベースセッション
+
+    Returns:
+        再計算結果の件数（changed / guarded / unchanged / skipped）
+    """
+    try:
+        return reprice_products(db, dry_run=dry_run)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={"error": {"code": "DATABASE_ERROR", "message": str(e)}},
+        )
@@ -0,0 +1,80 @@
+"""Keyset pagination helpers.
+
+List endpoints page by the values of their sort key instead of OFFSET, so
+every page is an index range scan that costs the same as the first one. The
+sort key of the last row is handed to the client as an opaque cursor
+(URL-safe base64 of a JSON array) in the ``X-Next-Cursor`` response header;
+the client sends it back as ``cursor`` to get the following page.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, List, Sequence, TypeVar
+
+from fastapi import HTTPException, Response
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """ソートキーの値をカーソル文字列に変換（日時・UUID などは文字列化）"""
+    payload = json.dumps([value if value is None else str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[str], Any]) -> List[Any]:
+    """
+    カーソル文字列をソートキーの値に戻す
+
+    Args:
+        cursor: encode_cursor で作成したカーソル
+        parsers: ソートキーごとの変換関数（datetime.fromisoformat, uuid.UUID など）
+
+    Returns:
+        変換したソートキーの値
+
+    Raises:
+        HTTPException: カーソルが不正な場合（400 INVALID_PARAM）
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("cursor size mismatch")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=400,
+            detail={"error": {"code": "INVALID_PARAM", "message": "cursor が不正です"}},
+        )
+
+
+def keyset_page(
+    rows: Sequence[T],
+    limit: int,
+    response: Response,
+    sort_key: Callable[[T], Sequence[Any]],
+) -> Sequence[T]:
+    """
+    limit + 1 件取得した行から1ページ分を返し、続きがあれば次ページのカーソルをヘッダーに設定
+
+    Args:
+        rows: limit + 1 件を上限に取得した行
+        limit: 取得件数
+        response: レスポンス（X-Next-Cursor ヘッダーを設定）
+        sort_key: 行からソートキーの値を取り出す関数
+
+    Returns:
+        1ページ分の行
+    """
+    if limit < 1:
+        return rows[:0]
+    if len(rows) <= limit:
+        return rows
+    page = rows[:limit]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*sort_key(page[-1]))
+    return page
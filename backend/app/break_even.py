@@ -0,0 +1,607 @@
+"""Break-even calculation and materialized monthly snapshots."""
+from __future__ import annotations
+
+import statistics
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .core.cache import break_even_cache
+from .core.db_types import truncate_month
+from .models import (
+    BreakEvenAnalysis,
+    FixedCost,
+    MonthlyRevenue,
+    Product,
+    SalesDailySummary,
+    SalesData,
+)
+from .schemas import (
+    BreakEvenForecastResponse,
+    BreakEvenResponse,
+    ProductContribution,
+    ProductContributionResponse,
+    TrendData,
+    round_jpy,
+    round_rate,
+)
+
+# 固定費データがない場合のデフォルト値（400万円）
+DEFAULT_FIXED_COST = Decimal("4000000")
+# 売上データがない場合のデフォルト値（変動費率75%、粗利率25%）
+DEFAULT_VARIABLE_COST_RATE = Decimal("0.75")
+DEFAULT_GROSS_MARGIN_RATE = Decimal("0.25")
+# トレンドの既定の月数
+DEFAULT_TREND_MONTHS = 12
+# 着地見込みの信頼水準と、対応する正規分布の両側z値
+FORECAST_CONFIDENCE_LEVEL = Decimal("0.95")
+_FORECAST_Z = Decimal("1.96")
+
+
+def add_months(month: date, months: int) -> date:
+    """月初日に月数を加算（負数で減算）"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(month: date) -> Tuple[date, date]:
+    """対象月の期間 [月初日, 翌月初日)（インデックスを使える範囲条件用）"""
+    start = month.replace(day=1)
+    return start, add_months(start, 1)
+
+
+def _break_even_figures(
+    revenue: Decimal,
+    variable_cost: Decimal,
+    fixed_cost_amount: Decimal,
+) -> Tuple[Decimal, Decimal, int, Decimal]:
+    """
+    売上・変動費・固定費から損益分岐点の指標を計算
+
+    Returns:
+        (変動費率, 粗利率, 損益分岐点売上高, 達成率)
+    """
+    # 変動費率と粗利率の計算
+    if revenue > 0:
+        variable_cost_rate = round_rate(variable_cost / revenue)
+        gross_margin_rate = round_rate((revenue - variable_cost) / revenue)
+    else:
+        variable_cost_rate = DEFAULT_VARIABLE_COST_RATE
+        gross_margin_rate = DEFAULT_GROSS_MARGIN_RATE
+
+    # 損益分岐点の計算
+    if gross_margin_rate > 0:
+        break_even_revenue = round_jpy(fixed_cost_amount / gross_margin_rate)
+    else:
+        break_even_revenue = 0
+
+    # 達成率の計算
+    if break_even_revenue > 0:
+        achievement_rate = round_rate(revenue / Decimal(break_even_revenue))
+    else:
+        achievement_rate = Decimal("0")
+
+    return variable_cost_rate, gross_margin_rate, break_even_revenue, achievement_rate
+
+
+def break_even_status(achievement_rate: Decimal) -> str:
+    """達成率からステータスを判定（safe: 150%以上、warning: 100%以上、danger: 100%未満）"""
+    if achievement_rate >= Decimal("1.5"):
+        return "safe"
+    if achievement_rate >= Decimal("1.0"):
+        return "warning"
+    return "danger"
+
+
+def calculate_break_even(db: Session, month: date) -> BreakEvenAnalysis:
+    """
+    指定月の損益分岐点を売上データから集計して計算
+
+    Args:
+        db: データベースセッション
+        month: 対象月（月初日）
+
+    Returns:
+        計算結果（未保存の BreakEvenAnalysis）
+    """
+    month_start, month_end = month_range(month)
+
+    # 固定費の取得
+    fixed_cost = (
+        db.query(FixedCost)
+        .filter(FixedCost.year_month >= month_start, FixedCost.year_month < month_end)
+        .first()
+    )
+    fixed_cost_amount = fixed_cost.amount if fixed_cost else DEFAULT_FIXED_COST
+
+    # 売上データの集計
+    sales_summary = (
+        db.query(
+            func.sum(SalesData.quantity_kg * SalesData.unit_price_per_kg).label("revenue"),
+            func.sum(SalesData.quantity_kg * SalesData.unit_cost_per_kg).label("cost"),
+        )
+        .filter(SalesData.sale_date >= month_start, SalesData.sale_date < month_end)
+        .first()
+    )
+
+    # 月次総売上高（手入力）
+    monthly_revenue = (
+        db.query(MonthlyRevenue.total_revenue)
+        .filter(MonthlyRevenue.year_month == month)
+        .scalar()
+    )
+
+    # 売上データがない場合のデフォルト値
+    revenue = sales_summary.revenue or Decimal("0")
+    variable_cost = sales_summary.cost or Decimal("0")
+
+    variable_cost_rate, gross_margin_rate, break_even_revenue, achievement_rate = _break_even_figures(
+        revenue, variable_cost, fixed_cost_amount
+    )
+
+    return BreakEvenAnalysis(
+        year_month=month,
+        fixed_cost=fixed_cost_amount,
+        total_revenue=revenue,
+        total_variable_cost=variable_cost,
+        variable_cost_rate=variable_cost_rate,
+        gross_margin_rate=gross_margin_rate,
+        break_even_revenue=Decimal(break_even_revenue),
+        actual_revenue=monthly_revenue,
+        achievement_rate=achievement_rate,
+        risk_level=break_even_status(achievement_rate),
+        is_stale=False,
+    )
+
+
+def refresh_snapshot(db: Session, month: date) -> BreakEvenAnalysis:
+    """
+    指定月のスナップショットを再計算して保存（存在しない場合は作成）
+
+    再計算の間はスナップショットの行をロックします（PostgreSQL）。再計算中の売上・固定費の
+    変更による is_stale の更新はコミット後まで待つため、古い値が最新として保存されることはありません。
+
+    Args:
+        db: データベースセッション
+        month: 対象月（月初日）
+
+    Returns:
+        保存したスナップショット
+    """
+    snapshot = (
+        db.query(BreakEvenAnalysis)
+        .filter(BreakEvenAnalysis.year_month == month)
+        .with_for_update()
+        .first()
+    )
+    if snapshot is None:
+        # 行がないと再計算中の変更を is_stale に反映できないため、古い状態で作成してから再計算する
+        created = calculate_break_even(db, month)
+        created.is_stale = True
+        db.add(created)
+        try:
+            db.commit()
+        except IntegrityError:
+            # 同じ月を別リクエストが同時に作成した場合は、そちらを更新する
+            db.rollback()
+        return refresh_snapshot(db, month)
+
+    calculated = calculate_break_even(db, month)
+    for column in (
+        "fixed_cost",
+        "total_revenue",
+        "total_variable_cost",
+        "variable_cost_rate",
+        "gross_margin_rate",
+        "break_even_revenue",
+        "actual_revenue",
+        "achievement_rate",
+        "risk_level",
+        "is_stale",
+    ):
+        setattr(snapshot, column, getattr(calculated, column))
+    snapshot.calculated_at = func.now()
+    db.commit()
+    db.refresh(snapshot)
+    return snapshot
+
+
+def get_snapshot(db: Session, month: date, refresh: bool = False) -> BreakEvenAnalysis:
+    """
+    指定月のスナップショットを取得（未作成・古い場合のみ再計算）
+
+    Args:
+        db: データベースセッション
+        month: 対象月（月初日）
+        refresh: True の場合は常に再計算
+
+    Returns:
+        スナップショット
+    """
+    if not refresh:
+        snapshot = (
+            db.query(BreakEvenAnalysis)
+            .filter(BreakEvenAnalysis.year_month == month, BreakEvenAnalysis.is_stale == False)
+            .first()
+        )
+        if snapshot is not None:
+            return snapshot
+    return refresh_snapshot(db, month)
+
+
+def calculate_trend(
+    db: Session,
+    month: date,
+    months: int = DEFAULT_TREND_MONTHS,
+) -> List[TrendData]:
+    """
+    指定月までの月次トレンド（売上高・損益分岐点）を計算
+
+    売上は sales_data を月単位で GROUP BY した1つの集計クエリで取得し、
+    固定費と結合します。期間条件は sale_date のインデックスを使える範囲指定です。
+
+    Args:
+        db: データベースセッション
+        month: 最終月（月初日）
+        months: 月数
+
+    Returns:
+        古い月から順のトレンドデータ
+    """
+    first_month = add_months(month.replace(day=1), -(months - 1))
+    period_end = add_months(month.replace(day=1), 1)
+
+    sales_month = truncate_month(SalesData.sale_date)
+    sales = (
+        select(
+            sales_month.label("month"),
+            func.sum(SalesData.quantity_kg * SalesData.unit_price_per_kg).label("revenue"),
+            func.sum(SalesData.quantity_kg * SalesData.unit_cost_per_kg).label("cost"),
+        )
+        .where(SalesData.sale_date >= first_month, SalesData.sale_date < period_end)
+        .group_by(sales_month)
+        .subquery()
+    )
+    fixed_month = truncate_month(FixedCost.year_month)
+    fixed = (
+        select(fixed_month.label("month"), func.max(FixedCost.amount).label("amount"))
+        .where(FixedCost.year_month >= first_month, FixedCost.year_month < period_end)
+        .group_by(fixed_month)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            func.coalesce(sales.c.month, fixed.c.month).label("month"),
+            sales.c.revenue,
+            sales.c.cost,
+            fixed.c.amount,
+        ).select_from(sales.join(fixed, sales.c.month == fixed.c.month, full=True))
+    ).all()
+    by_month = {row.month: row for row in rows}
+
+    trend = []
+    for offset in range(months):
+        target = add_months(first_month, offset)
+        row = by_month.get(target)
+        revenue = (row.revenue if row else None) or Decimal("0")
+        variable_cost = (row.cost if row else None) or Decimal("0")
+        fixed_cost_amount = row.amount if row and row.amount is not None else DEFAULT_FIXED_COST
+        _, _, break_even_revenue, _ = _break_even_figures(revenue, variable_cost, fixed_cost_amount)
+        trend.append(
+            TrendData(
+                month=target.strftime("%Y-%m"),
+                revenue=round_jpy(revenue),
+                break_even=break_even_revenue,
+            )
+        )
+    return trend
+
+
+def _rate(numerator: Optional[Decimal], denominator: Optional[Decimal]) -> Decimal:
+    if not numerator or not denominator:
+        return Decimal("0")
+    return round_rate(numerator / denominator)
+
+
+def calculate_product_contributions(
+    db: Session,
+    month: date,
+    limit: int = 20,
+    sort_by: str = "contribution_margin",
+    descending: bool = True,
+) -> ProductContributionResponse:
+    """
+    指定月の商品別の貢献利益を集計
+
+    sales_data を商品ごとに集計する1つのクエリで、売上・変動費・貢献利益と
+    全商品の合計（ウィンドウ関数）、固定費（スカラーサブクエリ）を取得します。
+    並び替えと上位N件の絞り込みもSQLで行います。
+
+    Args:
+        db: データベースセッション
+        month: 対象月（月初日）
+        limit: 取得件数
+        sort_by: 並び替え項目（contribution_margin / contribution_margin_rate / revenue / variable_cost）
+        descending: 降順にするかどうか
+
+    Returns:
+        商品別の貢献利益
+    """
+    month_start, month_end = month_range(month)
+
+    sales = (
+        select(
+            SalesData.product_id,
+            func.sum(SalesData.quantity_kg).label("quantity"),
+            func.sum(SalesData.quantity_kg * SalesData.unit_price_per_kg).label("revenue"),
+            func.sum(SalesData.quantity_kg * SalesData.unit_cost_per_kg).label("cost"),
+        )
+        .where(SalesData.sale_date >= month_start, SalesData.sale_date < month_end)
+        .group_by(SalesData.product_id)
+        .subquery()
+    )
+    contribution = (sales.c.revenue - sales.c.cost).label("contribution")
+    margin_rate = (contribution / func.nullif(sales.c.revenue, 0)).label("margin_rate")
+    fixed_cost = (
+        select(FixedCost.amount)
+        .where(FixedCost.year_month >= month_start, FixedCost.year_month < month_end)
+        .limit(1)
+        .scalar_subquery()
+    )
+    sort_columns = {
+        "contribution_margin": contribution,
+        "contribution_margin_rate": margin_rate,
+        "revenue": sales.c.revenue,
+        "variable_cost": sales.c.cost,
+    }
+    sort_column = sort_columns[sort_by]
+
+    rows = db.execute(
+        select(
+            sales.c.product_id,
+            Product.product_code,
+            Product.product_name,
+            sales.c.quantity,
+            sales.c.revenue,
+            sales.c.cost,
+            contribution,
+            func.sum(contribution).over().label("total_contribution"),
+            func.count().over().label("product_count"),
+            fixed_cost.label("fixed_cost"),
+        )
+        .select_from(sales)
+        .outerjoin(Product, Product.id == sales.c.product_id)
+        .order_by(
+            (sort_column.desc() if descending else sort_column.asc()).nulls_last(),
+            Product.product_code,
+        )
+        .limit(limit)
+    ).all()
+
+    if rows:
+        total_contribution = rows[0].total_contribution or Decimal("0")
+        product_count = rows[0].product_count
+        fixed_cost_amount = rows[0].fixed_cost
+    else:
+        total_contribution = Decimal("0")
+        product_count = 0
+        fixed_cost_amount = (
+            db.query(FixedCost.amount)
+            .filter(FixedCost.year_month >= month_start, FixedCost.year_month < month_end)
+            .limit(1)
+            .scalar()
+        )
+    if fixed_cost_amount is None:
+        fixed_cost_amount = DEFAULT_FIXED_COST
+
+    return ProductContributionResponse(
+        year_month=month.strftime("%Y-%m"),
+        fixed_costs=round_jpy(fixed_cost_amount),
+        total_contribution_margin=round_jpy(total_contribution),
+        break_even_coverage=_rate(total_contribution, fixed_cost_amount),
+        product_count=product_count,
+        products=[
+            ProductContribution(
+                product_id=str(row.product_id) if row.product_id else None,
+                product_code=row.product_code,
+                product_name=row.product_name,
+                quantity_kg=row.quantity,
+                revenue=round_jpy(row.revenue),
+                variable_cost=round_jpy(row.cost),
+                contribution_margin=round_jpy(row.contribution),
+                contribution_margin_rate=_rate(row.contribution, row.revenue),
+                contribution_share=_rate(row.contribution, total_contribution),
+                break_even_coverage=_rate(row.contribution, fixed_cost_amount),
+            )
+            for row in rows
+        ],
+    )
+
+
+def snapshot_to_response(
+    snapshot: BreakEvenAnalysis,
+    trend: Optional[List[TrendData]] = None,
+) -> BreakEvenResponse:
+    """スナップショットを損益分岐点レスポンスに変換"""
+    break_even_revenue = round_jpy(snapshot.break_even_revenue)
+    return BreakEvenResponse(
+        year_month=snapshot.year_month.strftime("%Y-%m"),
+        fixed_costs=round_jpy(snapshot.fixed_cost),
+        current_revenue=round_jpy(snapshot.total_revenue),
+        variable_cost_rate=snapshot.variable_cost_rate,
+        gross_margin_rate=snapshot.gross_margin_rate,
+        break_even_revenue=break_even_revenue,
+        achievement_rate=snapshot.achievement_rate,
+        delta_revenue=round_jpy(snapshot.total_revenue - Decimal(break_even_revenue)),
+        status=snapshot.risk_level,
+        trend=trend or [],
+    )
+
+
+def get_break_even_response(
+    db: Session,
+    month: date,
+    trend_months: int = DEFAULT_TREND_MONTHS,
+    refresh: bool = False,
+) -> BreakEvenResponse:
+    """
+    損益分岐点レスポンスを取得（TTL付きのプロセス内キャッシュを経由）
+
+    キャッシュは (対象月, トレンド月数) ごとに保持し、売上・固定費・月次売上の
+    書き込み時に対象月を含むものを破棄します（BreakEvenAnalysis.mark_stale）。
+
+    Args:
+        db: データベースセッション
+        month: 対象月（月初日）
+        trend_months: トレンドの月数
+        refresh: True の場合はキャッシュとスナップショットを使わず再計算
+
+    Returns:
+        損益分岐点分析結果
+    """
+    key = (month, trend_months)
+    if not refresh:
+        cached = break_even_cache.get(key)
+        if cached is not None:
+            return cached
+
+    snapshot = get_snapshot(db, month, refresh=refresh)
+    response = snapshot_to_response(snapshot, calculate_trend(db, month, trend_months))
+    break_even_cache.set(key, response)
+    return response
+
+
+def break_even_cache_stats() -> Dict[str, Any]:
+    """損益分岐点レスポンスキャッシュの統計情報"""
+    return break_even_cache.stats()
+
+
+def forecast_break_even(db: Session, month: date, as_of: Optional[date] = None) -> BreakEvenForecastResponse:
+    """
+    月途中の日次売上ペースから月末の売上高・達成率を予測
+
+    sales_daily_summary（商品×日の集計）のみを参照し、sales_data は読みません。
+    月末見込み = 実績 + 日次平均 × 残り日数。上限・下限は日次売上のばらつき
+    （残り日数分の合計と平均の推定誤差）から正規近似で求めます。
+
+    Args:
+        db: データベースセッション
+        month: 対象月（月初日）
+        as_of: 実績の集計日（未指定時は当日、対象月の範囲に丸める）
+
+    Returns:
+        月末の着地見込み
+    """
+    month_start, month_end = month_range(month)
+    days_in_month = (month_end - month_start).days
+    last_day = month_end - timedelta(days=1)
+    as_of = min(as_of or date.today(), last_day)
+    elapsed_days = max((as_of - month_start).days + 1, 0)
+
+    # 日ごとの売上高・変動費（商品合計）
+    rows = (
+        db.query(
+            SalesDailySummary.sale_date,
+            func.sum(SalesDailySummary.revenue).label("revenue"),
+            func.sum(SalesDailySummary.variable_cost).label("cost"),
+        )
+        .filter(SalesDailySummary.sale_date >= month_start, SalesDailySummary.sale_date <= as_of)
+        .group_by(SalesDailySummary.sale_date)
+        .all()
+    )
+    daily_revenue = {row.sale_date: Decimal(row.revenue or 0) for row in rows}
+    actual_revenue = sum(daily_revenue.values(), Decimal("0"))
+    actual_variable_cost = sum((Decimal(row.cost or 0) for row in rows), Decimal("0"))
+
+    fixed_cost = (
+        db.query(FixedCost.amount)
+        .filter(FixedCost.year_month >= month_start, FixedCost.year_month < month_end)
+        .scalar()
+    )
+    fixed_cost_amount = fixed_cost if fixed_cost is not None else DEFAULT_FIXED_COST
+
+    _, gross_margin_rate, break_even_revenue, _ = _break_even_figures(
+        actual_revenue, actual_variable_cost, fixed_cost_amount
+    )
+
+    # 売上のない日も0として日次平均・標準偏差を計算
+    remaining_days = days_in_month - elapsed_days
+    if elapsed_days > 0:
+        samples = [
+            daily_revenue.get(month_start + timedelta(days=offset), Decimal("0"))
+            for offset in range(elapsed_days)
+        ]
+        mean = actual_revenue / elapsed_days
+        deviation = statistics.stdev(samples) if elapsed_days > 1 else Decimal("0")
+    else:
+        mean = deviation = Decimal("0")
+    projected = actual_revenue + mean * remaining_days
+    if elapsed_days > 0:
+        margin = _FORECAST_Z * deviation * (
+            Decimal(remaining_days) + Decimal(remaining_days * remaining_days) / elapsed_days
+        ).sqrt()
+    else:
+        margin = Decimal("0")
+    lower = max(projected - margin, actual_revenue)
+    upper = projected + margin
+
+    def _achievement(revenue: Decimal) -> Decimal:
+        if break_even_revenue > 0:
+            return round_rate(revenue / Decimal(break_even_revenue))
+        return Decimal("0")
+
+    achievement_rate = _achievement(projected)
+    return BreakEvenForecastResponse(
+        year_month=month_start.strftime("%Y-%m"),
+        as_of=as_of.isoformat(),
+        elapsed_days=elapsed_days,
+        days_in_month=days_in_month,
+        actual_revenue=round_jpy(actual_revenue),
+        projected_revenue=round_jpy(projected),
+        projected_revenue_lower=round_jpy(lower),
+        projected_revenue_upper=round_jpy(upper),
+        confidence_level=FORECAST_CONFIDENCE_LEVEL,
+        fixed_costs=round_jpy(fixed_cost_amount),
+        gross_margin_rate=gross_margin_rate,
+        break_even_revenue=break_even_revenue,
+        achievement_rate=achievement_rate,
+        achievement_rate_lower=_achievement(lower),
+        achievement_rate_upper=_achievement(upper),
+        status=break_even_status(achievement_rate),
+    )
+
+
+def backfill_snapshots(
+    db: Session,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[date]:
+    """
+    過去月のスナップショットを一括作成・再計算
+
+    Args:
+        db: データベースセッション
+        start: 開始月（未指定時は売上データの最古月）
+        end: 終了月（未指定時は当月）
+
+    Returns:
+        再計算した月の一覧
+    """
+    if start is None:
+        oldest = db.query(func.min(SalesData.sale_date)).scalar()
+        start = oldest or date.today()
+    if end is None:
+        end = date.today()
+
+    month = start.replace(day=1)
+    end = end.replace(day=1)
+    months = []
+    while month <= end:
+        refresh_snapshot(db, month)
+        months.append(month)
+        month = add_months(month, 1)
+    return months
@@ -0,0 +1,163 @@
+"""Vectorized what-if grid for break-even planning.
+
+Every combination of fixed-cost items and gross margin rates is evaluated in
+one NumPy pass with scaled integers (fixed costs in sen, rates in 1/10000,
+revenue in 1/1000000 yen), reproducing the ROUND_HALF_UP results of
+``app.break_even``.
+"""
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import pricing_kernel as kernel
+from .break_even import get_snapshot, month_range
+from .models import FixedCost
+from .pricing_sweep import round_half_up_div
+from .schemas import (
+    BreakEvenScenarioRequest,
+    BreakEvenScenarioResponse,
+    ScenarioAxis,
+    ScenarioRange,
+)
+
+AMOUNT_PLACES = 2
+REVENUE_PLACES = 6
+
+_STATUS_SAFE = 15000  # 達成率150%（1/10000単位）
+_STATUS_WARNING = 10000  # 達成率100%
+
+
+def _axis_values(axis: ScenarioRange, places: int) -> np.ndarray:
+    """範囲を等分した値（10**places 倍の整数、四捨五入）"""
+    start = kernel.to_scaled(axis.start.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP), places)
+    if axis.steps == 1:
+        return np.array([start], dtype=np.int64)
+    stop = kernel.to_scaled(axis.stop.quantize(Decimal(1).scaleb(-places), rounding=ROUND_HALF_UP), places)
+    intervals = axis.steps - 1
+    steps = np.arange(axis.steps, dtype=np.int64)
+    return round_half_up_div(start * intervals + steps * (stop - start), intervals)
+
+
+def _to_decimals(values: np.ndarray, places: int) -> List[Decimal]:
+    """整数（10**places 倍）を Decimal に変換（重複する値は一度だけ変換）"""
+    unique, inverse = np.unique(values, return_inverse=True)
+    decimals = [Decimal(value).scaleb(-places) for value in unique.tolist()]
+    return [decimals[index] for index in inverse.ravel().tolist()]
+
+
+def _base_fixed_costs(db: Session, month: date, total: Decimal, overridden: Dict[str, ScenarioRange]) -> Decimal:
+    """
+    シナリオで指定しなかった固定費の内訳の合計（基準月の値）
+
+    基準月の内訳（FixedCost.breakdown）がない場合は、基準月の固定費合計を使用します。
+    """
+    month_start, month_end = month_range(month)
+    fixed_cost = (
+        db.query(FixedCost)
+        .filter(FixedCost.year_month >= month_start, FixedCost.year_month < month_end)
+        .first()
+    )
+    breakdown = (fixed_cost.breakdown or {}) if fixed_cost else {}
+    if not breakdown:
+        return total
+    return sum(
+        (Decimal(str(amount)) for name, amount in breakdown.items() if name not in overridden and amount is not None),
+        Decimal("0"),
+    )
+
+
+def evaluate_scenarios(db: Session, month: date, payload: BreakEvenScenarioRequest) -> BreakEvenScenarioResponse:
+    """
+    固定費（内訳）と粗利率の全組み合わせについて損益分岐点・達成率を一括計算
+
+    Args:
+        db: データベースセッション
+        month: 基準月（月初日）
+        payload: シナリオ入力
+
+    Returns:
+        シナリオ結果
+    """
+    snapshot = get_snapshot(db, month)
+    revenue = payload.revenue if payload.revenue is not None else snapshot.total_revenue
+
+    # 固定費の軸（内訳ごと、合計、または基準月の固定費）
+    fixed_axes: List[Tuple[str, np.ndarray]]
+    base_fixed = 0
+    if payload.fixed_cost_items:
+        fixed_axes = [
+            (name, _axis_values(axis, AMOUNT_PLACES)) for name, axis in payload.fixed_cost_items.items()
+        ]
+        # 指定しなかった内訳は基準月の値のまま
+        base_fixed = kernel.to_scaled(
+            _base_fixed_costs(db, month, snapshot.fixed_cost, payload.fixed_cost_items).quantize(
+                Decimal(1).scaleb(-AMOUNT_PLACES), rounding=ROUND_HALF_UP
+            ),
+            AMOUNT_PLACES,
+        )
+    else:
+        fixed_axes = [
+            (
+                "fixed_costs",
+                _axis_values(payload.fixed_costs or ScenarioRange(start=snapshot.fixed_cost), AMOUNT_PLACES),
+            )
+        ]
+    margin_axis = _axis_values(
+        payload.gross_margin_rate or ScenarioRange(start=snapshot.gross_margin_rate),
+        kernel.RATE_PLACES,
+    )
+    shape = [len(values) for _, values in fixed_axes] + [len(margin_axis)]
+
+    # 固定費合計（内訳の和）を多次元に展開
+    fixed_total = np.full(shape[:-1], base_fixed, dtype=np.int64)
+    for position, (_, values) in enumerate(fixed_axes):
+        view = [1] * len(fixed_axes)
+        view[position] = len(values)
+        fixed_total = fixed_total + values.reshape(view)
+    fixed_total = fixed_total[..., np.newaxis]
+
+    # 損益分岐点売上高 = 固定費 / 粗利率（円、四捨五入）。粗利率0以下は0
+    positive_margin = margin_axis > 0
+    break_even = np.where(
+        positive_margin,
+        round_half_up_div(
+            fixed_total * 10 ** (kernel.RATE_PLACES - AMOUNT_PLACES),
+            np.where(positive_margin, margin_axis, 1),
+        ),
+        0,
+    )
+
+    # 達成率 = 売上高 / 損益分岐点売上高（小数第4位、四捨五入）。損益分岐点0は0
+    revenue_scaled = kernel.to_scaled(
+        Decimal(revenue).quantize(Decimal(1).scaleb(-REVENUE_PLACES), rounding=ROUND_HALF_UP), REVENUE_PLACES
+    )
+    has_break_even = break_even > 0
+    achievement = np.where(
+        has_break_even,
+        round_half_up_div(
+            np.full(break_even.shape, revenue_scaled, dtype=np.int64),
+            np.where(has_break_even, break_even, 1) * 10 ** (REVENUE_PLACES - kernel.RATE_PLACES),
+        ),
+        0,
+    )
+
+    safe = int(np.count_nonzero(achievement >= _STATUS_SAFE))
+    warning = int(np.count_nonzero(achievement >= _STATUS_WARNING)) - safe
+
+    axes = [ScenarioAxis(name=name, values=_to_decimals(values, AMOUNT_PLACES)) for name, values in fixed_axes]
+    axes.append(ScenarioAxis(name="gross_margin_rate", values=_to_decimals(margin_axis, kernel.RATE_PLACES)))
+
+    return BreakEvenScenarioResponse(
+        year_month=month.strftime("%Y-%m"),
+        revenue=round_half_up_div(revenue_scaled, 10 ** REVENUE_PLACES),
+        axes=axes,
+        shape=shape,
+        break_even_revenue=break_even.ravel().tolist(),
+        achievement_rate=_to_decimals(achievement.ravel(), kernel.RATE_PLACES),
+        status_counts={"safe": safe, "warning": warning, "danger": achievement.size - safe - warning},
+    )
@@ -1,5 +1,5 @@
 """Core application modules."""
 from .config import settings
-from .database import Base, SessionLocal, engine, get_db
+from .database import AsyncSessionLocal, Base, SessionLocal, engine, get_async_db, get_db
 
-__all__ = ["settings", "Base", "SessionLocal", "engine", "get_db"]
+__all__ = ["settings", "Base", "SessionLocal", "AsyncSessionLocal", "engine", "get_db", "get_async_db"]
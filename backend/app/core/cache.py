@@ -0,0 +1,106 @@
+"""In-process result caches."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from .config import settings
+
+
+class TTLCache:
+    """TTL and size-bounded LRU cache, safe to share between request threads."""
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """キャッシュから取得（未登録・期限切れの場合は None）"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """キャッシュに登録（上限を超えた場合は最も古い参照のものを破棄）"""
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """条件に一致するキーを破棄（条件未指定の場合はすべて）し、破棄した件数を返す"""
+        with self._lock:
+            if predicate is None:
+                keys = list(self._entries)
+            else:
+                keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """キャッシュの統計情報"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+# 損益分岐点レスポンスのキャッシュ（キー: (対象月, トレンド月数)）
+break_even_cache = TTLCache(
+    max_size=settings.BREAK_EVEN_CACHE_SIZE,
+    ttl_seconds=settings.BREAK_EVEN_CACHE_TTL_SECONDS,
+)
+
+
+def invalidate_break_even(months: Optional[Iterable[date]] = None) -> int:
+    """
+    指定月に依存する損益分岐点レスポンスを破棄
+
+    対象月そのものに加え、トレンドの期間に指定月を含むレスポンスも破棄します。
+    months を指定しない場合はすべて破棄します。
+    """
+    if months is None:
+        return break_even_cache.invalidate()
+    months = {(month.year, month.month) for month in months}
+    if not months:
+        return 0
+
+    def _depends_on(key: Hashable) -> bool:
+        target, trend_months = key
+        for year, month in months:
+            offset = (target.year - year) * 12 + target.month - month
+            if 0 <= offset < max(trend_months, 1):
+                return True
+        return False
+
+    return break_even_cache.invalidate(_depends_on)
@@ -1,20 +1,75 @@
-"""Database connection and session management."""
+"""Database connection and session management.
+
+Besides PostgreSQL, DATABASE_URL may point at SQLite: ``sqlite:///path.db``
+for a file, or ``sqlite://`` (``sqlite:///:memory:``) for a database that
+lives only in this process. The in-memory database is one shared-cache
+database, so the sync and async engines and every pooled connection see the
+same data. Import jobs then run in threads instead of worker processes (see
+``app.core.executors``).
+"""
 from __future__ import annotations
 
-from typing import Generator
+import sqlite3
+import threading
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from .config import settings
 
+# Shared-cache in-memory database used for DATABASE_URL=sqlite://
+_MEMORY_DATABASE = "file:pdss?mode=memory&cache=shared"
+
+
+def is_memory_database(url: str) -> bool:
+    """Return True if the URL is an in-memory SQLite database."""
+    scheme, _, rest = url.partition("://")
+    return scheme.split("+")[0] == "sqlite" and rest in ("", "/", "/:memory:")
+
+
+def resolve_database_url(url: str) -> str:
+    """Map an in-memory SQLite URL to the shared-cache database; other URLs are unchanged."""
+    if is_memory_database(url):
+        return f"sqlite:///{_MEMORY_DATABASE}&uri=true"
+    return url
+
+
+def _configure_sqlite(dbapi_connection, connection_record) -> None:
+    """Enable foreign keys (ON DELETE CASCADE) and, in memory, reads during another connection's write."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    if IN_MEMORY:
+        cursor.execute("PRAGMA read_uncommitted=ON")
+    cursor.close()
+
+
+IN_MEMORY = is_memory_database(settings.DATABASE_URL)
+DATABASE_URL = resolve_database_url(settings.DATABASE_URL)
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+_engine_options: Dict[str, Any] = {}
+if IS_SQLITE:
+    # Sessions are used from threadpool threads and import job threads
+    _engine_options["connect_args"] = {"check_same_thread": False}
+if IN_MEMORY:
+    # The database is dropped when its last connection closes; keep one open for the
+    # process lifetime. QueuePool gives every session its own connection (transaction).
+    _memory_anchor = sqlite3.connect(_MEMORY_DATABASE, uri=True, check_same_thread=False)
+    _engine_options["poolclass"] = QueuePool
+
 # Create database engine
 engine = create_engine(
-    settings.DATABASE_URL,
+    DATABASE_URL,
     pool_pre_ping=True,
     echo=settings.DEBUG,
+    **_engine_options,
 )
+if IS_SQLITE:
+    event.listen(engine, "connect", _configure_sqlite)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -22,6 +77,68 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for declarative models
 Base = declarative_base()
 
+# Async drivers used when ASYNC_DATABASE_URL is not set
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "postgres": "asyncpg", "sqlite": "aiosqlite"}
+
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_async_lock = threading.Lock()
+
+
+def async_database_url(url: str) -> str:
+    """
+    Convert a synchronous database URL to its async driver equivalent.
+
+    postgresql[+psycopg2]:// becomes postgresql+asyncpg:// and sqlite:// becomes
+    sqlite+aiosqlite://. URLs of other dialects are returned unchanged.
+    """
+    scheme, separator, rest = url.partition("://")
+    driver = _ASYNC_DRIVERS.get(scheme.split("+")[0])
+    if not separator or driver is None:
+        return url
+    dialect = "postgresql" if driver == "asyncpg" else "sqlite"
+    return f"{dialect}+{driver}://{rest}"
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Get the async database engine (created on first use).
+
+    The async driver is only imported here, so CLI jobs and workers that use the
+    synchronous engine do not need it installed.
+    """
+    global _async_engine, _async_session_factory
+    with _async_lock:
+        if _async_engine is None:
+            url = settings.ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+            _async_engine = create_async_engine(
+                url,
+                pool_pre_ping=True,
+                echo=settings.DEBUG,
+                **({"connect_args": {"check_same_thread": False}} if url.startswith("sqlite") else {}),
+            )
+            if url.startswith("sqlite"):
+                event.listen(_async_engine.sync_engine, "connect", _configure_sqlite)
+            _async_session_factory = async_sessionmaker(
+                _async_engine, autoflush=False, expire_on_commit=False
+            )
+        return _async_engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    """Create a new async database session."""
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's connections (called on application shutdown)."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -35,3 +152,14 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get async database session.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,55 @@
+"""Dialect-portable column types and SQL functions.
+
+Models use these instead of ``sqlalchemy.dialects.postgresql`` so that the
+schema can also be created on SQLite (``DATABASE_URL=sqlite://``). UUIDs
+are native on PostgreSQL and CHAR(32) elsewhere, and JSONB falls back to
+JSON. ``nil_uuid`` renders the all-zero UUID inline in each dialect's
+storage format, for unique indexes that treat NULL as one value.
+"""
+from __future__ import annotations
+
+from sqlalchemy import JSON, Date, Uuid
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+# UUID(as_uuid=True) と同じ引数で使用（PostgreSQL では uuid 型）
+UUID = Uuid
+
+JSONB = JSON().with_variant(postgresql.JSONB(), "postgresql")
+
+
+class truncate_month(FunctionElement):
+    """日付を月初日（DATE）に切り捨てる（PostgreSQL は date_trunc、SQLite は date()）"""
+
+    type = Date()
+    name = "truncate_month"
+    inherit_cache = True
+
+
+@compiles(truncate_month)
+def _truncate_month(element, compiler, **kw) -> str:
+    return f"CAST(date_trunc('month', {compiler.process(element.clauses, **kw)}) AS DATE)"
+
+
+@compiles(truncate_month, "sqlite")
+def _truncate_month_sqlite(element, compiler, **kw) -> str:
+    return f"date({compiler.process(element.clauses, **kw)}, 'start of month')"
+
+
+class nil_uuid(FunctionElement):
+    """NULL の代わりに比較する UUID（00000000-0000-0000-0000-000000000000、SQLへ直接埋め込む）"""
+
+    type = Uuid()
+    name = "nil_uuid"
+    inherit_cache = True
+
+
+@compiles(nil_uuid)
+def _nil_uuid(element, compiler, **kw) -> str:
+    return "'00000000-0000-0000-0000-000000000000'::uuid"
+
+
+@compiles(nil_uuid, "sqlite")
+def _nil_uuid_sqlite(element, compiler, **kw) -> str:
+    return "'00000000000000000000000000000000'"
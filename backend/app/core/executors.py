@@ -0,0 +1,63 @@
+"""Shared worker pools for CPU-bound work."""
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from .config import settings
+from .database import is_memory_database
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_import_pool: Optional[Executor] = None
+_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    CPU負荷の高い処理用のプロセスプールを取得（初回呼び出し時に生成）
+
+    ワーカーは spawn で起動するため、APIプロセスのスレッドやDB接続を引き継ぎません。
+    """
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.PROCESS_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def get_import_pool() -> Executor:
+    """
+    インポートジョブ用のプロセスプールを取得（初回呼び出し時に生成）
+
+    長時間のインポートが計算用のプールを占有しないよう別のプールで実行し、
+    APIプロセスのイベントループ・GILの影響を受けないようにします。
+    インメモリの SQLite（DATABASE_URL=sqlite://）は別プロセスから参照できないため、
+    スレッドプールで実行します。
+    """
+    global _import_pool
+    with _lock:
+        if _import_pool is None and is_memory_database(settings.DATABASE_URL):
+            _import_pool = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS)
+        if _import_pool is None:
+            _import_pool = ProcessPoolExecutor(
+                max_workers=settings.IMPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _import_pool
+
+
+def shutdown_executors() -> None:
+    """ワーカープールを停止（アプリケーション終了時に呼び出し）"""
+    global _process_pool, _import_pool
+    with _lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _import_pool is not None:
+            _import_pool.shutdown(wait=False, cancel_futures=True)
+            _import_pool = None
@@ -0,0 +1 @@
+"""Spreadsheet import pipelines."""
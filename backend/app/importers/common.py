@@ -0,0 +1,116 @@
+"""Column-wise validation helpers shared by the import pipelines."""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+
+import pandas as pd
+
+
+class ImportResult(NamedTuple):
+    """インポート結果（errors・warnings は ImportError・ImportWarning の形式）"""
+
+    total_rows: int
+    imported_rows: int
+    skipped_rows: int
+    errors: List[Dict[str, Any]]
+    warnings: List[Dict[str, Any]] = []
+    unchanged_rows: int = 0
+    deleted_rows: int = 0
+
+
+def combine_results(results: Iterable[ImportResult]) -> ImportResult:
+    """チャンクごとのインポート結果を合算"""
+    total_rows = imported_rows = skipped_rows = unchanged_rows = deleted_rows = 0
+    errors: List[Dict[str, Any]] = []
+    warnings: List[Dict[str, Any]] = []
+    for result in results:
+        total_rows += result.total_rows
+        imported_rows += result.imported_rows
+        skipped_rows += result.skipped_rows
+        unchanged_rows += result.unchanged_rows
+        deleted_rows += result.deleted_rows
+        errors.extend(result.errors)
+        warnings.extend(result.warnings)
+    return ImportResult(
+        total_rows, imported_rows, skipped_rows, errors, warnings, unchanged_rows, deleted_rows
+    )
+
+
+def accepted_warnings(warnings: List[Dict[str, Any]], errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """警告のうち、エラーで登録しなかった行の警告を除く（警告は登録した行のみ）"""
+    rejected_rows = {error["row"] for error in errors}
+    return [warning for warning in warnings if warning["row"] not in rejected_rows]
+
+
+def column(df: pd.DataFrame, name: str) -> pd.Series:
+    """列を取得（列がない場合はすべて欠損）"""
+    if name in df.columns:
+        return df[name]
+    return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+
+def decimal_values(series: pd.Series, valid: pd.Series) -> pd.Series:
+    """有効な値を Decimal に変換（無効・欠損は None）"""
+    values = pd.Series([None] * len(series), index=series.index, dtype=object)
+    values[valid] = [Decimal(str(value).strip()) for value in series[valid]]
+    return values
+
+
+def json_value(value: Any) -> Any:
+    """セルの値を JSON に保存できる値に変換（欠損は None）"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, "item"):
+        # NumPy のスカラー
+        return value.item()
+    return str(value)
+
+
+def cell_errors(
+    df: pd.DataFrame,
+    checks: Sequence[Tuple[pd.Series, str, str]],
+) -> Tuple[pd.Series, List[Dict[str, Any]]]:
+    """
+    検証結果をセルごとのエラーにまとめる（セルごとに最初に該当した理由のみ）
+
+    Args:
+        df: 読み込んだシート（index はデータ行の番号、シートの行番号は index + 2）
+        checks: (該当行のマスク, 列名, 理由) の一覧
+
+    Returns:
+        (エラー行のマスク, ImportError 形式のエラー一覧（行・検証の順）)
+    """
+    hits = []
+    for order, (mask, name, reason) in enumerate(checks):
+        hit = mask.fillna(False).astype(bool).to_numpy()
+        if not hit.any():
+            continue
+        hits.append(
+            pd.DataFrame(
+                {
+                    "index": df.index[hit],
+                    "order": order,
+                    "column": name,
+                    "value": column(df, name).to_numpy()[hit],
+                    "reason": reason,
+                }
+            )
+        )
+
+    rejected = pd.Series(False, index=df.index)
+    if not hits:
+        return rejected, []
+    found = (
+        pd.concat(hits, ignore_index=True)
+        .drop_duplicates(["index", "column"])
+        .sort_values(["index", "order"], kind="stable")
+    )
+    rejected[df.index.isin(found["index"])] = True
+    errors = [
+        {"row": int(index) + 2, "column": name, "value": json_value(value), "reason": reason}
+        for index, name, value, reason in zip(found["index"], found["column"], found["value"], found["reason"])
+    ]
+    return rejected, errors
@@ -0,0 +1,155 @@
+"""Streaming spreadsheet readers (Excel and CSV).
+
+Uploads are spooled to a temporary file and read row by row with openpyxl in
+read-only mode (or the pandas CSV chunk reader), so the file is never held in
+memory as a whole. Rows are yielded as fixed-size DataFrame chunks whose index
+is the 0-based data row number, matching ``pd.read_excel`` (the sheet row is
+``index + 2``).
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional
+
+import pandas as pd
+from openpyxl import load_workbook
+
+# 1チャンクあたりの行数（検証とDB書き込みの単位）
+EXCEL_CHUNK_SIZE = 5000
+
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def spool_upload(source: BinaryIO, suffix: str = ".xlsx") -> str:
+    """アップロードを一時ファイルに書き出し、そのパスを返す（削除は呼び出し側で行う）"""
+    handle, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(handle, "wb") as spool:
+            shutil.copyfileobj(source, spool, _COPY_BUFFER_SIZE)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+@contextmanager
+def spooled_upload(source: BinaryIO, suffix: str = ".xlsx") -> Iterator[str]:
+    """アップロードを一時ファイルに書き出し、そのパスを返す（終了時に削除）"""
+    path = spool_upload(source, suffix)
+    try:
+        yield path
+    finally:
+        os.remove(path)
+
+
+def _header(values: tuple) -> List[str]:
+    """ヘッダー行を列名に変換（空欄は pandas と同じ Unnamed: N）"""
+    return [
+        str(value).strip() if value is not None else f"Unnamed: {position}"
+        for position, value in enumerate(values)
+    ]
+
+
+def sheet_names(path: str) -> List[str]:
+    """Excelファイル（.xlsx）のシート名を先頭から順に取得（セルは読み込まない）"""
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def iter_excel_chunks(
+    path: str,
+    chunk_size: int = EXCEL_CHUNK_SIZE,
+    sheet_name: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Excelファイル（.xlsx）をチャンク単位で読み込む
+
+    1行目をヘッダーとし、値はセルの値（数式は計算結果）を object 型のまま返します。
+    末尾の空行は pd.read_excel と同様に読み飛ばします。
+
+    Args:
+        path: ファイルパス
+        chunk_size: 1チャンクあたりの行数
+        sheet_name: シート名（未指定時は先頭のシート）
+
+    Yields:
+        データ行のチャンク
+    """
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = sheet.iter_rows(values_only=True)
+        first = next(rows, None)
+        if first is None:
+            return
+        columns = _header(first)
+
+        buffer: List[tuple] = []
+        blank_rows = 0
+        start = 0
+        for values in rows:
+            if all(value is None for value in values):
+                # 後続にデータ行がある場合のみ空行として扱う
+                blank_rows += 1
+                continue
+            for _ in range(blank_rows):
+                buffer.append((None,) * len(columns))
+            blank_rows = 0
+            buffer.append(tuple(values[:len(columns)]) + (None,) * (len(columns) - len(values)))
+
+            while len(buffer) >= chunk_size:
+                chunk, buffer = buffer[:chunk_size], buffer[chunk_size:]
+                yield pd.DataFrame(
+                    chunk, columns=columns, dtype=object, index=range(start, start + len(chunk))
+                )
+                start += len(chunk)
+
+        if buffer:
+            yield pd.DataFrame(
+                buffer, columns=columns, dtype=object, index=range(start, start + len(buffer))
+            )
+    finally:
+        workbook.close()
+
+
+def detect_csv_encoding(path: str) -> str:
+    """CSVの文字コードを判定（UTF-8（BOM付きを含む）でなければ Shift_JIS（cp932））"""
+    with open(path, "rb") as handle:
+        head = handle.read(_COPY_BUFFER_SIZE)
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # 先頭ブロックの末尾でマルチバイト文字が切れた場合は UTF-8 とみなす
+        if e.start < len(head) - 3:
+            return "cp932"
+    return "utf-8-sig"
+
+
+def iter_csv_chunks(path: str, chunk_size: int = EXCEL_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    CSVファイルをチャンク単位で読み込む
+
+    値は文字列のまま返します（商品コードの先頭の0などを保持するため）。
+
+    Args:
+        path: ファイルパス
+        chunk_size: 1チャンクあたりの行数
+
+    Yields:
+        データ行のチャンク
+    """
+    with pd.read_csv(
+        path,
+        dtype=object,
+        encoding=detect_csv_encoding(path),
+        chunksize=chunk_size,
+        skipinitialspace=True,
+    ) as reader:
+        for chunk in reader:
+            yield chunk
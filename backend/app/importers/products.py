@@ -0,0 +1,149 @@
+"""Bulk import of the product master from a spreadsheet.
+
+The sheet is validated column-wise with pandas, existing product codes are
+prefetched in one query per chunk, and the rows are written with chunked
+``INSERT ... ON CONFLICT (product_code) DO UPDATE`` statements instead of one
+ORM round trip per row.
+"""
+from __future__ import annotations
+
+import uuid
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Product
+
+from .common import ImportResult, accepted_warnings, cell_errors, column, decimal_values
+from .hashing import RowHashes
+from .validation import validate_frame
+
+# 1回の INSERT ... ON CONFLICT で送る行数
+PRODUCT_IMPORT_CHUNK_SIZE = 1000
+
+
+def _existing_costs(db: Session, codes: List[str]) -> Dict[str, Decimal]:
+    """既存商品の原価（商品コード → 原価）をチャンク単位で一括取得"""
+    existing: Dict[str, Decimal] = {}
+    for start in range(0, len(codes), PRODUCT_IMPORT_CHUNK_SIZE):
+        chunk = codes[start:start + PRODUCT_IMPORT_CHUNK_SIZE]
+        rows = db.execute(
+            select(Product.product_code, Product.unit_cost_per_kg).where(Product.product_code.in_(chunk))
+        )
+        existing.update({code: cost for code, cost in rows})
+    return existing
+
+
+def _upsert_statement(dialect_name: str):
+    dialect = sqlite if dialect_name == "sqlite" else postgresql
+    statement = dialect.insert(Product)
+    return statement.on_conflict_do_update(
+        index_elements=[Product.product_code],
+        set_={
+            "product_name": statement.excluded.product_name,
+            "unit_cost_per_kg": statement.excluded.unit_cost_per_kg,
+            "unit_price_per_kg": func.coalesce(
+                statement.excluded.unit_price_per_kg, Product.unit_price_per_kg
+            ),
+            "updated_at": func.now(),
+        },
+    )
+
+
+def import_products(db: Session, df: pd.DataFrame, hashes: Optional[RowHashes] = None) -> ImportResult:
+    """
+    商品マスタを一括で登録・更新（コミットは呼び出し側で行う）
+
+    - 必須: 商品コード、商品名（新規商品は原価も必須）
+    - 原価・単価が空の場合、既存商品は現在の値を維持
+    - 同じ商品コードが複数行ある場合は後の行の値を優先
+    - 列単位の検証は validate_frame、商品マスタとの照合のみここで行う
+    - hashes を指定した場合、前回の取込みから変更のない行は書き込まない
+      （ファイルから消えた行の商品は削除しない）
+
+    Args:
+        db: データベースセッション
+        df: 読み込んだシート（1行目がヘッダー、index はデータ行の番号）
+        hashes: 取込み元の行ハッシュ（差分取込み時、登録は呼び出し側で save する）
+
+    Returns:
+        インポート結果
+    """
+    validation = validate_frame(df, "products")
+    if validation.rejected.all():
+        return ImportResult(len(df), 0, len(df), validation.errors, validation.warnings)
+
+    valid = ~validation.rejected
+    codes = column(df, "商品コード")
+    codes = codes.where(codes.isna(), codes.astype(str))
+    names = column(df, "商品名")
+    names = names.where(names.isna(), names.astype(str))
+    costs = decimal_values(column(df, "原価"), valid & validation.numbers["原価"].notna())
+    prices = decimal_values(column(df, "単価"), valid & validation.numbers["単価"].notna())
+
+    # 新規商品の原価はDB上の商品と照合して確認
+    existing = _existing_costs(db, codes[valid].unique().tolist())
+    is_new = valid & ~codes.isin(list(existing))
+    new_without_cost, errors = cell_errors(df, [(is_new & costs.isna(), "原価", "新規商品の原価が空です")])
+    rejected = validation.rejected | new_without_cost
+    errors = sorted(validation.errors + errors, key=lambda error: error["row"])
+
+    unchanged = pd.Series(False, index=df.index)
+    if hashes is not None:
+        hashes.partial = hashes.partial or bool(rejected.any())
+        normalized = pd.DataFrame(
+            {
+                "product_code": codes,
+                "product_name": names,
+                "unit_cost_per_kg": validation.numbers["原価"],
+                "unit_price_per_kg": validation.numbers["単価"],
+            }
+        )[~rejected]
+        keys = hashes.keys(normalized)
+        unchanged[keys.index] = hashes.unchanged(keys)
+        hashes.add(keys[~unchanged[keys.index]])
+    write = ~rejected & ~unchanged
+
+    # 商品コードごとに後の行の値を優先してまとめる（空欄は前の行の値を維持）
+    accepted = pd.DataFrame(
+        {
+            "product_code": codes[write],
+            "product_name": names[write],
+            "unit_cost_per_kg": costs[write],
+            "unit_price_per_kg": prices[write],
+        }
+    )
+    merged = accepted.groupby("product_code", sort=False).last()
+
+    rows = []
+    for code, name, cost, price in zip(
+        merged.index, merged["product_name"], merged["unit_cost_per_kg"], merged["unit_price_per_kg"]
+    ):
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "product_code": code,
+                "product_name": name,
+                "unit_cost_per_kg": cost if not pd.isna(cost) else existing[code],
+                "unit_price_per_kg": price if not pd.isna(price) else None,
+            }
+        )
+
+    if rows:
+        connection = db.connection()
+        statement = _upsert_statement(connection.dialect.name)
+        for start in range(0, len(rows), PRODUCT_IMPORT_CHUNK_SIZE):
+            connection.execute(statement, rows[start:start + PRODUCT_IMPORT_CHUNK_SIZE])
+
+    return ImportResult(
+        total_rows=len(df),
+        imported_rows=int(write.sum()),
+        skipped_rows=int(rejected.sum()),
+        errors=errors,
+        warnings=accepted_warnings(validation.warnings, errors),
+        unchanged_rows=int(unchanged.sum()),
+    )
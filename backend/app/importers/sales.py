@@ -0,0 +1,402 @@
+"""Bulk import of sales_data from Excel or CSV.
+
+Each chunk is validated column-wise with pandas and product codes are
+resolved through one prefetched ``product_code -> (id, cost)`` map. Valid rows
+are loaded into a temporary staging table (``COPY FROM STDIN`` on PostgreSQL)
+and moved into ``sales_data`` with one set-based ``INSERT ... SELECT``. The
+daily summary and break-even snapshots are updated from the staging table in
+the same transaction.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import uuid
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import (
+    Column,
+    Date,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    and_,
+    delete,
+    func,
+    insert,
+    not_,
+    or_,
+    select,
+    tuple_,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+from app.core.db_types import UUID
+from app.models import BreakEvenAnalysis, Product, SalesDailySummary, SalesData
+
+from .common import ImportResult, accepted_warnings, cell_errors, column
+from .hashing import ROW_HASH_BATCH_SIZE, RowHashes
+from .validation import IMPORT_RULES, validate_frame
+
+_CUSTOMER_MAX_LENGTH = IMPORT_RULES["sales"].max_lengths["顧客名"]
+_INVOICE_MAX_LENGTH = IMPORT_RULES["sales"].max_lengths["請求書番号"]
+
+# 取込み用の一時テーブル（トランザクション終了時に削除）
+_staging = Table(
+    "sales_import_staging",
+    MetaData(),
+    Column("row_number", Integer, nullable=False),
+    Column("id", UUID(as_uuid=True)),
+    Column("product_id", UUID(as_uuid=True), nullable=False),
+    Column("sale_date", Date, nullable=False),
+    Column("quantity_kg", Numeric(14, 3), nullable=False),
+    Column("unit_price_per_kg", Numeric(14, 3), nullable=False),
+    Column("unit_cost_per_kg", Numeric(14, 3), nullable=False),
+    Column("customer_name", String(_CUSTOMER_MAX_LENGTH)),
+    Column("invoice_number", String(_INVOICE_MAX_LENGTH)),
+    Column("row_key", String(48)),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+
+_STAGING_COLUMNS = [
+    "row_number",
+    "id",
+    "product_id",
+    "sale_date",
+    "quantity_kg",
+    "unit_price_per_kg",
+    "unit_cost_per_kg",
+    "customer_name",
+    "invoice_number",
+    "row_key",
+]
+
+
+def _product_map(db: Session) -> Dict[str, Tuple[uuid.UUID, Decimal]]:
+    """商品コード → (商品ID, 原価) を1回のクエリで取得"""
+    rows = db.execute(select(Product.product_code, Product.id, Product.unit_cost_per_kg))
+    return {code: (product_id, cost) for code, product_id, cost in rows}
+
+
+def _text(series: pd.Series, valid: pd.Series) -> pd.Series:
+    """有効な値を文字列に変換（無効・欠損は None）"""
+    values = pd.Series([None] * len(series), index=series.index, dtype=object)
+    values[valid] = [str(value).strip() for value in series[valid]]
+    return values
+
+
+def _validate_chunk(
+    chunk: pd.DataFrame,
+    products: Dict[str, Tuple[uuid.UUID, Decimal]],
+    hashes: Optional[RowHashes] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[tuple], int]:
+    """
+    1チャンク分の売上データを検証（列単位の検証は validate_frame、商品コードの照合のみここで行う）
+
+    Returns:
+        (エラー, 警告, 一時テーブルに読み込む行（_STAGING_COLUMNS の順、数値は文字列）, 変更のない行数)
+    """
+    validation = validate_frame(chunk, "sales")
+    if validation.rejected.all():
+        return validation.errors, validation.warnings, [], 0
+
+    codes = column(chunk, "商品コード")
+    codes = codes.where(codes.isna(), codes.astype(str))
+    resolved = codes.map(products)
+    unknown, errors = cell_errors(
+        chunk,
+        [(~validation.rejected & resolved.isna(), "商品コード", "商品コードが登録されていません")],
+    )
+    errors = sorted(validation.errors + errors, key=lambda error: error["row"])
+    accepted = ~(validation.rejected | unknown)
+
+    # 前回の取込みから変更のない行は読み込まない
+    row_keys = pd.Series([None] * len(chunk), index=chunk.index, dtype=object)
+    unchanged_rows = 0
+    if hashes is not None and accepted.any():
+        normalized = pd.DataFrame(
+            {
+                "sale_date": validation.dates["売上日"],
+                "product_code": codes,
+                "quantity_kg": validation.numbers["数量"],
+                "unit_price_per_kg": validation.numbers["単価"],
+                "unit_cost_per_kg": validation.numbers["原価"],
+                "customer_name": column(chunk, "顧客名"),
+                "invoice_number": column(chunk, "請求書番号"),
+            }
+        )[accepted]
+        keys = hashes.keys(normalized)
+        unchanged = hashes.unchanged(keys)
+        unchanged_rows = int(unchanged.sum())
+        row_keys[keys.index] = keys
+        accepted[keys.index[unchanged.to_numpy()]] = False
+
+    warnings = accepted_warnings(validation.warnings, errors)
+    if not accepted.any():
+        return errors, warnings, [], unchanged_rows
+
+    quantities = column(chunk, "数量")
+    prices = column(chunk, "単価")
+    costs = column(chunk, "原価")
+    customers = column(chunk, "顧客名")
+    invoices = column(chunk, "請求書番号")
+    customers = customers.where(customers.isna(), customers.astype(str))
+    invoices = invoices.where(invoices.isna(), invoices.astype(str))
+
+    # 原価が空の行は商品マスタの原価を使用
+    cost_text = _text(costs, accepted & costs.notna())
+    default_costs = resolved[accepted & costs.isna()].map(lambda product: str(product[1]))
+    cost_text[default_costs.index] = default_costs
+
+    rows = list(
+        zip(
+            (chunk.index[accepted] + 2).tolist(),
+            [str(uuid.uuid4()) for _ in range(int(accepted.sum()))],
+            resolved[accepted].map(lambda product: str(product[0])),
+            validation.dates["売上日"][accepted].dt.strftime("%Y-%m-%d"),
+            _text(quantities, accepted)[accepted],
+            _text(prices, accepted)[accepted],
+            cost_text[accepted],
+            customers[accepted].where(customers[accepted].notna(), None),
+            invoices[accepted].where(invoices[accepted].notna(), None),
+            row_keys[accepted],
+        )
+    )
+    return errors, warnings, rows, unchanged_rows
+
+
+def _copy_rows(connection: Connection, rows: List[tuple]) -> None:
+    """一時テーブルに行を読み込む（PostgreSQL は COPY FROM STDIN）"""
+    if connection.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {_staging.name} ({', '.join(_STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+        return
+
+    parameters = []
+    for row in rows:
+        values = dict(zip(_STAGING_COLUMNS, row))
+        values["id"] = uuid.UUID(values["id"])
+        values["product_id"] = uuid.UUID(values["product_id"])
+        values["sale_date"] = pd.Timestamp(values["sale_date"]).date()
+        for name in ("quantity_kg", "unit_price_per_kg", "unit_cost_per_kg"):
+            values[name] = Decimal(values[name])
+        parameters.append(values)
+    connection.execute(insert(_staging), parameters)
+
+
+def _delete_sales(connection: Connection, ids: List[uuid.UUID]) -> int:
+    """売上データを削除し、日次集計と損益分岐点スナップショットに反映"""
+    deleted = 0
+    for start in range(0, len(ids), ROW_HASH_BATCH_SIZE):
+        batch = ids[start:start + ROW_HASH_BATCH_SIZE]
+        deltas = {
+            (sale_date, product_id): [-quantity, -revenue, -variable_cost, -row_count]
+            for sale_date, product_id, quantity, revenue, variable_cost, row_count in connection.execute(
+                select(
+                    SalesData.sale_date,
+                    SalesData.product_id,
+                    func.sum(SalesData.quantity_kg),
+                    func.sum(SalesData.quantity_kg * SalesData.unit_price_per_kg),
+                    func.sum(SalesData.quantity_kg * SalesData.unit_cost_per_kg),
+                    func.count(),
+                )
+                .where(SalesData.id.in_(batch))
+                .group_by(SalesData.sale_date, SalesData.product_id)
+            )
+        }
+        SalesDailySummary.apply_deltas(connection, deltas)
+        BreakEvenAnalysis.mark_stale(connection, {sale_date for sale_date, _ in deltas})
+        deleted += connection.execute(delete(SalesData).where(SalesData.id.in_(batch))).rowcount
+    return deleted
+
+
+def _hold_possible_changes(connection: Connection, hashes: RowHashes) -> List[Dict[str, Any]]:
+    """
+    エラー行のある取込みで、前回の行を変更した可能性がある行を一時テーブルから除く
+
+    ファイルから消えた前回の行と売上日・商品が同じ行は、変更後の行か新しい行か区別できません。
+    変更前の行を残したまま登録すると二重計上になるため登録せず、エラーとして返します。
+    """
+    vanished = [hashes.previous[key] for key in hashes.vanished() if hashes.previous[key] is not None]
+    groups = set()
+    for start in range(0, len(vanished), ROW_HASH_BATCH_SIZE):
+        groups.update(
+            connection.execute(
+                select(SalesData.sale_date, SalesData.product_id)
+                .where(SalesData.id.in_(vanished[start:start + ROW_HASH_BATCH_SIZE]))
+                .distinct()
+            ).all()
+        )
+
+    groups = list(groups)
+    held: List[int] = []
+    for start in range(0, len(groups), ROW_HASH_BATCH_SIZE):
+        matches = tuple_(_staging.c.sale_date, _staging.c.product_id).in_(groups[start:start + ROW_HASH_BATCH_SIZE])
+        held.extend(connection.execute(select(_staging.c.row_number).where(matches)).scalars().all())
+        connection.execute(delete(_staging).where(matches))
+    return [
+        {
+            "row": row,
+            "column": "売上日",
+            "value": None,
+            "reason": "前回の取込みから変更された行の可能性があるため登録していません（エラー行を修正して再度取り込んでください）",
+        }
+        for row in held
+    ]
+
+
+def import_sales(
+    db: Session,
+    chunks: Iterable[pd.DataFrame],
+    hashes: Optional[RowHashes] = None,
+) -> ImportResult:
+    """
+    売上データを一括登録（コミットは呼び出し側で行う）
+
+    - 必須: 売上日、商品コード、数量、単価（原価が空の場合は商品マスタの原価）
+    - 任意: 顧客名、請求書番号
+    - 登録した月の損益分岐点スナップショットを再計算対象にし、日次集計を更新
+    - hashes を指定した場合、前回の取込みから変更のない行は登録せず、
+      ファイルから消えた行（変更前の行を含む）は sales_data から削除
+      （エラー行がある場合は削除せず、消えた行と売上日・商品が同じ行も登録しない）
+
+    Args:
+        db: データベースセッション
+        chunks: 読み込んだシートのチャンク（index はデータ行の番号）
+        hashes: 取込み元の行ハッシュ（差分取込み時）
+
+    Returns:
+        インポート結果
+    """
+    connection = db.connection()
+    connection.execute(CreateTable(_staging, if_not_exists=True))
+    connection.execute(delete(_staging))
+
+    products = _product_map(db)
+    total_rows = 0
+    errors: List[Dict[str, Any]] = []
+    warnings: List[Dict[str, Any]] = []
+    unchanged_rows = 0
+    for chunk in chunks:
+        total_rows += len(chunk)
+        chunk_errors, chunk_warnings, rows, chunk_unchanged = _validate_chunk(chunk, products, hashes)
+        errors.extend(chunk_errors)
+        warnings.extend(chunk_warnings)
+        unchanged_rows += chunk_unchanged
+        if rows:
+            _copy_rows(connection, rows)
+
+    # 一時テーブルから sales_data へ一括登録（商品の存在と値の範囲をDB側でも確認）
+    joined = _staging.join(Product.__table__, Product.id == _staging.c.product_id)
+    valid = and_(
+        _staging.c.quantity_kg > 0,
+        _staging.c.unit_price_per_kg > 0,
+        _staging.c.unit_cost_per_kg > 0,
+    )
+    rejected_rows = connection.execute(
+        select(_staging.c.row_number)
+        .select_from(_staging.outerjoin(Product.__table__, Product.id == _staging.c.product_id))
+        .where(or_(Product.id.is_(None), not_(valid)))
+    ).scalars().all()
+    errors.extend(
+        {"row": row, "column": "商品コード", "value": None, "reason": "商品が存在しないか、数量・単価・原価が0以下です"}
+        for row in rejected_rows
+    )
+    # エラー行がある場合は前回の行を削除しないため、変更された可能性のある行も登録しない
+    if hashes is not None:
+        hashes.partial = hashes.partial or bool(errors)
+        if hashes.partial:
+            errors.extend(_hold_possible_changes(connection, hashes))
+    errors.sort(key=lambda error: error["row"])
+
+    # 取り込む月の月次パーティションを作成（PostgreSQL でパーティション化されている場合）
+    first_date, last_date = connection.execute(
+        select(func.min(_staging.c.sale_date), func.max(_staging.c.sale_date))
+    ).one()
+    if first_date is not None:
+        SalesData.ensure_partitions(connection, first_date, last_date)
+
+    connection.execute(
+        insert(SalesData).from_select(
+            [
+                "id",
+                "product_id",
+                "sale_date",
+                "quantity_kg",
+                "unit_price_per_kg",
+                "unit_cost_per_kg",
+                "customer_name",
+                "invoice_number",
+            ],
+            select(
+                _staging.c.id,
+                _staging.c.product_id,
+                _staging.c.sale_date,
+                _staging.c.quantity_kg,
+                _staging.c.unit_price_per_kg,
+                _staging.c.unit_cost_per_kg,
+                _staging.c.customer_name,
+                _staging.c.invoice_number,
+            )
+            .select_from(joined)
+            .where(valid),
+        )
+    )
+
+    # 日次集計と損益分岐点スナップショットへの反映
+    deltas = {
+        (sale_date, product_id): [quantity, revenue, variable_cost, row_count]
+        for sale_date, product_id, quantity, revenue, variable_cost, row_count in connection.execute(
+            select(
+                _staging.c.sale_date,
+                _staging.c.product_id,
+                func.sum(_staging.c.quantity_kg),
+                func.sum(_staging.c.quantity_kg * _staging.c.unit_price_per_kg),
+                func.sum(_staging.c.quantity_kg * _staging.c.unit_cost_per_kg),
+                func.count(),
+            )
+            .select_from(joined)
+            .where(valid)
+            .group_by(_staging.c.sale_date, _staging.c.product_id)
+        )
+    }
+    SalesDailySummary.apply_deltas(connection, deltas)
+    BreakEvenAnalysis.mark_stale(connection, {sale_date for sale_date, _ in deltas})
+
+    # 差分取込み: 登録した行のハッシュを記録し、ファイルから消えた行を削除
+    deleted_rows = 0
+    if hashes is not None:
+        imported = connection.execute(
+            select(_staging.c.row_key, _staging.c.id).select_from(joined).where(valid)
+        ).all()
+        hashes.add([row_key for row_key, _ in imported], [record_id for _, record_id in imported])
+        deleted_rows = _delete_sales(connection, hashes.removed_records())
+        hashes.save(connection)
+    connection.execute(delete(_staging))
+
+    imported_rows = sum(delta[3] for delta in deltas.values())
+    return ImportResult(
+        total_rows=total_rows,
+        imported_rows=imported_rows,
+        skipped_rows=total_rows - imported_rows - unchanged_rows,
+        errors=errors,
+        warnings=accepted_warnings(warnings, errors),
+        unchanged_rows=unchanged_rows,
+        deleted_rows=deleted_rows,
+    )
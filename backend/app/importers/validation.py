@@ -0,0 +1,177 @@
+"""Frame-level validation of import sheets.
+
+Every check runs on whole columns with pandas/NumPy (no per-row Python loop)
+and produces fully populated ``ImportError`` / ``ImportWarning`` entries
+(sheet row, column, original value, reason). The importers run this stage
+first and only add the checks that need the database; the dry-run mode of
+the import endpoint runs it alone.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.pricing import DEFAULT_MIN_MARGIN_RATE
+from app.schemas import MARGIN_RATE_MAX, MARGIN_RATE_MIN, UNIT_COST_MAX, UNIT_COST_MIN
+
+from .common import ImportResult, cell_errors, column, combine_results
+
+
+class ColumnRules(NamedTuple):
+    """インポートタイプごとの列の検証ルール"""
+
+    required: Tuple[str, ...]
+    numeric: Tuple[str, ...]
+    amounts: Tuple[str, ...]
+    dates: Tuple[str, ...] = ()
+    max_lengths: Dict[str, int] = {}
+    cost: str = "原価"
+    price: str = "単価"
+    # 粗利率が範囲外の行をエラーにする（False の場合は警告のみ）
+    margin_bound: bool = True
+
+
+IMPORT_RULES: Dict[str, ColumnRules] = {
+    "products": ColumnRules(
+        required=("商品コード", "商品名"),
+        numeric=("原価", "単価"),
+        amounts=("原価", "単価"),
+        max_lengths={"商品コード": 50, "商品名": 200},
+    ),
+    "sales": ColumnRules(
+        required=("売上日", "商品コード", "数量", "単価"),
+        numeric=("数量", "単価", "原価"),
+        amounts=("単価", "原価"),
+        dates=("売上日",),
+        max_lengths={"顧客名": 200, "請求書番号": 50},
+        # 赤字・高粗利の取引も実績として取り込む
+        margin_bound=False,
+    ),
+}
+
+_MIN_MARGIN = float(MARGIN_RATE_MIN)
+_MAX_MARGIN = float(MARGIN_RATE_MAX)
+_WARNING_MARGIN = float(DEFAULT_MIN_MARGIN_RATE)
+
+
+class FrameValidation(NamedTuple):
+    """シート単位の検証結果"""
+
+    rejected: pd.Series
+    numbers: Dict[str, pd.Series]
+    dates: Dict[str, pd.Series]
+    errors: List[Dict[str, Any]]
+    warnings: List[Dict[str, Any]]
+
+
+def _to_numbers(series: pd.Series) -> pd.Series:
+    """数値に変換（欠損・数値でない値は NaN）"""
+    present = series.notna()
+    if series.dtype == object:
+        series = series.where(~present, series.astype(str).str.strip())
+    return pd.to_numeric(series.where(present), errors="coerce").astype(float)
+
+
+def validate_frame(df: pd.DataFrame, import_type: str) -> FrameValidation:
+    """
+    シート（またはチャンク）を列単位で検証
+
+    - 必須列・必須値、数値・日付への変換、文字数
+    - 負の値・0、原価・単価の範囲（UNIT_COST_MIN〜UNIT_COST_MAX）
+    - 粗利率の範囲（MARGIN_RATE_MIN〜MARGIN_RATE_MAX、margin_bound が False の場合は警告）、
+      最低粗利率未満は警告
+
+    Args:
+        df: 読み込んだシート（index はデータ行の番号、シートの行番号は index + 2）
+        import_type: インポートタイプ（IMPORT_RULES のキー）
+
+    Returns:
+        検証結果（エラーのある行は rejected が True）
+    """
+    rules = IMPORT_RULES[import_type]
+
+    # 必須列がない場合はヘッダー行のエラー（先頭のチャンクのみ）を返し、全行をスキップ
+    missing_columns = [name for name in rules.required if name not in df.columns]
+    if missing_columns:
+        first_chunk = len(df.index) == 0 or df.index[0] == 0
+        errors = [
+            {"row": 1, "column": name, "value": None, "reason": f"必須列「{name}」がありません"}
+            for name in missing_columns
+            if first_chunk
+        ]
+        return FrameValidation(pd.Series(True, index=df.index), {}, {}, errors, [])
+
+    checks: List[Tuple[pd.Series, str, str]] = []
+    for name in rules.required:
+        checks.append((column(df, name).isna(), name, f"{name}は必須です"))
+
+    dates: Dict[str, pd.Series] = {}
+    for name in rules.dates:
+        raw = column(df, name)
+        dates[name] = pd.to_datetime(raw, errors="coerce", format="mixed")
+        checks.append((raw.notna() & dates[name].isna(), name, f"{name}が日付ではありません"))
+
+    numbers: Dict[str, pd.Series] = {}
+    for name in rules.numeric:
+        raw = column(df, name)
+        values = numbers[name] = _to_numbers(raw)
+        checks.append((raw.notna() & values.isna(), name, f"{name}が数値ではありません"))
+        checks.append((values < 0, name, f"{name}に負の値は指定できません"))
+        checks.append((values == 0, name, f"{name}は0より大きい値を指定してください"))
+        if name in rules.amounts:
+            out_of_range = (values > 0) & ((values < float(UNIT_COST_MIN)) | (values > float(UNIT_COST_MAX)))
+            checks.append((out_of_range, name, f"{name}は{UNIT_COST_MIN}〜{UNIT_COST_MAX}の範囲で指定してください"))
+
+    for name, max_length in rules.max_lengths.items():
+        raw = column(df, name)
+        lengths = raw.where(raw.isna(), raw.astype(str)).map(len, na_action="ignore")
+        checks.append((lengths > max_length, name, f"{name}は{max_length}文字以内で指定してください"))
+
+    # 粗利率（原価・単価がともに正しい行のみ）
+    cost = numbers.get(rules.cost)
+    price = numbers.get(rules.price)
+    margin = pd.Series(np.nan, index=df.index)
+    if cost is not None and price is not None:
+        priced = (cost >= float(UNIT_COST_MIN)) & (price >= float(UNIT_COST_MIN))
+        margin = ((price - cost) / price).where(priced)
+    margin_out_of_range = (margin < _MIN_MARGIN) | (margin > _MAX_MARGIN)
+    margin_range = f"{MARGIN_RATE_MIN:.0%}〜{MARGIN_RATE_MAX:.0%}"
+    if rules.margin_bound:
+        checks.append((margin_out_of_range, rules.price, f"粗利率は{margin_range}の範囲である必要があります"))
+
+    rejected, errors = cell_errors(df, checks)
+    low_margin = ~rejected & (margin >= _MIN_MARGIN) & (margin < _WARNING_MARGIN)
+    warnings = [
+        {"row": int(index) + 2, "message": f"粗利率が{DEFAULT_MIN_MARGIN_RATE:.0%}未満です"}
+        for index in df.index[low_margin.to_numpy()]
+    ]
+    if not rules.margin_bound:
+        warnings.extend(
+            {"row": int(index) + 2, "message": f"粗利率が{margin_range}の範囲外です"}
+            for index in df.index[(~rejected & margin_out_of_range).to_numpy()]
+        )
+        warnings.sort(key=lambda warning: warning["row"])
+    return FrameValidation(rejected, numbers, dates, errors, warnings)
+
+
+def dry_run(import_type: str, chunks: Iterable[pd.DataFrame]) -> ImportResult:
+    """
+    データベースに書き込まずにシートを検証（商品マスタとの照合は行わない）
+
+    Args:
+        import_type: インポートタイプ（IMPORT_RULES のキー）
+        chunks: 読み込んだシートのチャンク
+
+    Returns:
+        検証結果（imported_rows は取り込み可能な行数）
+    """
+    results = []
+    for chunk in chunks:
+        validation = validate_frame(chunk, import_type)
+        accepted = int((~validation.rejected).sum())
+        results.append(
+            ImportResult(len(chunk), accepted, len(chunk) - accepted, validation.errors, validation.warnings)
+        )
+    return combine_results(results)
@@ -0,0 +1,40 @@
+"""Backfill of monthly break-even snapshots.
+
+Usage (from the backend directory):
+    python -m app.jobs.break_even_snapshots [--from YYYY-MM] [--to YYYY-MM]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import datetime
+
+from app.break_even import backfill_snapshots
+
+
+def _month(value: str):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="損益分岐点の月次スナップショットを一括作成します")
+    parser.add_argument("--from", dest="start", type=_month, help="開始月（YYYY-MM、未指定時は売上データの最古月）")
+    parser.add_argument("--to", dest="end", type=_month, help="終了月（YYYY-MM、未指定時は当月）")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        months = backfill_snapshots(db, args.start, args.end)
+    finally:
+        db.close()
+
+    for month in months:
+        print(month.strftime("%Y-%m"))
+    print(f"{len(months)}件のスナップショットを更新しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""Background import jobs.
+
+Uploads are spooled to a temporary file by the API and imported in a
+separate worker process (``app.core.executors.get_import_pool``), so parsing
+and database writes never block the event loop. Progress is written to the
+job's ``ImportLog`` row from a second session after every chunk, while the
+import itself runs in one transaction.
+"""
+from __future__ import annotations
+
+import io
+import os
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.executors import get_process_pool
+from app.importers.common import ImportResult, accepted_warnings, combine_results
+from app.importers.excel import detect_csv_encoding, iter_csv_chunks, iter_excel_chunks, sheet_names
+from app.importers.hashing import RowHashes, import_source
+from app.importers.products import import_products
+from app.importers.sales import import_sales
+from app.importers.validation import validate_frame
+from app.models import ImportLog
+
+
+def read_chunks(
+    path: str,
+    file_name: str,
+    streaming: bool = True,
+    sheet_name: Optional[str] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    ファイルをチャンク単位で読み込む
+
+    streaming=False または .xls の場合はファイル全体を1チャンクとして読み込みます。
+    sheet_name を省略した場合は先頭のシートを読み込みます（CSVでは無視）。
+    """
+    is_csv = file_name.endswith(".csv")
+    if streaming and not file_name.endswith(".xls"):
+        if is_csv:
+            yield from iter_csv_chunks(path)
+        else:
+            yield from iter_excel_chunks(path, sheet_name=sheet_name)
+        return
+
+    if is_csv:
+        yield pd.read_csv(path, dtype=object, encoding=detect_csv_encoding(path), skipinitialspace=True)
+        return
+    with open(path, "rb") as handle:
+        contents = handle.read()
+    yield pd.read_excel(io.BytesIO(contents), sheet_name=sheet_name or 0)
+
+
+def list_sheets(path: str, file_name: str) -> List[Optional[str]]:
+    """ファイルのシート名を取得（CSVは [None]）"""
+    if file_name.endswith(".csv"):
+        return [None]
+    if file_name.endswith(".xls"):
+        with pd.ExcelFile(path) as workbook:
+            return list(workbook.sheet_names)
+    return sheet_names(path)
+
+
+class SheetResult(NamedTuple):
+    """1シート分の解析・検証結果（ワーカープロセスから返す）"""
+
+    sheet: Optional[str]
+    total_rows: int
+    rows: pd.DataFrame
+    errors: List[Dict[str, Any]]
+    warnings: List[Dict[str, Any]]
+
+
+def parse_sheet(
+    path: str,
+    file_name: str,
+    sheet_name: Optional[str],
+    import_type: str,
+    streaming: bool = True,
+) -> SheetResult:
+    """
+    1シートを読み込んで列単位で検証（ワーカープロセスで実行）
+
+    Returns:
+        シート全体の行数・エラー・警告と、検証を通過した行（index はデータ行の番号）
+    """
+    total_rows = 0
+    errors: List[Dict[str, Any]] = []
+    warnings: List[Dict[str, Any]] = []
+    accepted: List[pd.DataFrame] = []
+    for chunk in read_chunks(path, file_name, streaming, sheet_name):
+        total_rows += len(chunk)
+        validation = validate_frame(chunk, import_type)
+        errors.extend(validation.errors)
+        warnings.extend(validation.warnings)
+        accepted.append(chunk[~validation.rejected.to_numpy()])
+    rows = pd.concat(accepted) if accepted else pd.DataFrame()
+    return SheetResult(sheet_name, total_rows, rows, errors, warnings)
+
+
+def _tracked(chunks: Iterable[pd.DataFrame], progress: Callable[[int], None]) -> Iterator[pd.DataFrame]:
+    """チャンクを処理するたびに処理済みの行数を通知"""
+    processed = 0
+    for chunk in chunks:
+        yield chunk
+        processed += len(chunk)
+        progress(processed)
+
+
+def import_chunks(
+    db: Session,
+    import_type: str,
+    chunks: Iterable[pd.DataFrame],
+    progress: Optional[Callable[[int], None]] = None,
+    source: Optional[str] = None,
+    partial: bool = False,
+) -> ImportResult:
+    """
+    インポートタイプに応じてチャンクを取り込む（コミットは呼び出し側で行う）
+
+    source（取込み元）を指定した場合は、前回の同じ取込み元からの差分のみ取り込みます。
+    partial は検証済みの行のみを渡す場合に、除外した行があることを示します
+    （この場合ファイルから消えた行を削除扱いにしない）。
+    """
+    if progress is not None:
+        chunks = _tracked(chunks, progress)
+    hashes = None
+    if source is not None and import_type in ("sales", "products"):
+        hashes = RowHashes(db, import_type, source)
+        hashes.partial = partial
+    if import_type == "sales":
+        # 売上データのインポート（一時テーブルへの COPY と一括登録）
+        return import_sales(db, chunks, hashes)
+    if import_type == "products":
+        # 商品データのインポート（列単位の検証と一括 upsert）
+        result = combine_results(import_products(db, chunk, hashes) for chunk in chunks)
+        if hashes is not None:
+            hashes.save(db.connection())
+        return result
+    return combine_results(ImportResult(len(chunk), 0, 0, []) for chunk in chunks)
+
+
+def save_result(import_log: ImportLog, result: ImportResult) -> None:
+    """インポート結果をインポートログに反映"""
+    import_log.total_rows = result.total_rows
+    import_log.imported_rows = result.imported_rows
+    import_log.skipped_rows = result.skipped_rows
+    details = {}
+    if result.errors:
+        details["errors"] = result.errors
+    if result.warnings:
+        details["warnings"] = result.warnings
+    import_log.error_details = details or None
+    import_log.processed_rows = result.total_rows
+    import_log.unchanged_rows = result.unchanged_rows
+    import_log.deleted_rows = result.deleted_rows
+
+
+def _with_sheet(entries: List[Dict[str, Any]], sheet: Optional[str]) -> List[Dict[str, Any]]:
+    """エラー・警告にシート名を付与（CSVはそのまま）"""
+    if sheet is None:
+        return entries
+    return [{**entry, "sheet": sheet} for entry in entries]
+
+
+def import_files(
+    db: Session,
+    import_type: str,
+    files: Sequence[Tuple[str, str, Optional[str]]],
+    streaming: bool = True,
+    source_id: Optional[str] = None,
+) -> List[ImportLog]:
+    """
+    複数ファイルの全シートを並列に解析・検証し、1トランザクションで取り込む（コミットは呼び出し側で行う）
+
+    シートごとの読み込みと列単位の検証はプロセスプールで並列に実行し、
+    商品マスタとの照合と書き込みのみこのプロセスで順に行います。
+
+    Args:
+        db: データベースセッション
+        import_type: インポートタイプ（products または sales）
+        files: (一時ファイルのパス, ファイル名, ファイルのハッシュ) の一覧
+        streaming: チャンク単位で読み込むかどうか
+        source_id: 取込み元ID（指定時は「ID/ファイル名」のシートごとに前回からの差分のみ取り込む）
+
+    Returns:
+        ファイルごとのインポートログ（セッションに追加済み、error_details にシートごとの集計）
+    """
+    pool = get_process_pool()
+    submitted = [
+        (
+            file_name,
+            file_hash,
+            [
+                pool.submit(parse_sheet, path, file_name, sheet, import_type, streaming)
+                for sheet in list_sheets(path, file_name)
+            ],
+        )
+        for path, file_name, file_hash in files
+    ]
+
+    import_logs = []
+    for file_name, file_hash, futures in submitted:
+        sheets: List[Dict[str, Any]] = []
+        results: List[ImportResult] = []
+        for future in futures:
+            parsed = future.result()
+            source = import_source(f"{source_id}/{file_name}", parsed.sheet) if source_id is not None else None
+            written = ImportResult(0, 0, 0, [])
+            if len(parsed.rows) or source is not None:
+                chunks = [parsed.rows] if len(parsed.rows) else []
+                written = import_chunks(
+                    db, import_type, chunks, source=source, partial=bool(parsed.errors)
+                )
+            errors = sorted(parsed.errors + written.errors, key=lambda error: error["row"])
+            result = ImportResult(
+                total_rows=parsed.total_rows,
+                imported_rows=written.imported_rows,
+                skipped_rows=parsed.total_rows - written.imported_rows - written.unchanged_rows,
+                errors=_with_sheet(errors, parsed.sheet),
+                warnings=_with_sheet(accepted_warnings(parsed.warnings, written.errors), parsed.sheet),
+                unchanged_rows=written.unchanged_rows,
+                deleted_rows=written.deleted_rows,
+            )
+            results.append(result)
+            sheets.append(
+                {
+                    "sheet": parsed.sheet,
+                    "total_rows": result.total_rows,
+                    "imported_rows": result.imported_rows,
+                    "skipped_rows": result.skipped_rows,
+                    "unchanged_rows": result.unchanged_rows,
+                    "deleted_rows": result.deleted_rows,
+                    "error_count": len(result.errors),
+                    "warning_count": len(result.warnings),
+                }
+            )
+
+        import_log = ImportLog(
+            import_type=import_type, file_name=file_name, status="completed", file_hash=file_hash
+        )
+        save_result(import_log, combine_results(results))
+        import_log.error_details = {**(import_log.error_details or {}), "sheets": sheets}
+        db.add(import_log)
+        import_logs.append(import_log)
+    db.flush()
+    return import_logs
+
+
+def _rows_per_second(rows: int, started: float) -> Decimal:
+    elapsed = max(time.monotonic() - started, 1e-6)
+    return Decimal(str(round(rows / elapsed, 2)))
+
+
+def run_import_job(
+    job_id: str,
+    path: str,
+    file_name: str,
+    import_type: str,
+    streaming: bool = True,
+    source_id: Optional[str] = None,
+) -> None:
+    """
+    インポートジョブを実行（ワーカープロセスで呼び出し、一時ファイルは終了時に削除）
+
+    Args:
+        job_id: ジョブID（インポートログID）
+        path: 一時ファイルのパス
+        file_name: アップロードされたファイル名
+        import_type: インポートタイプ（products または sales）
+        streaming: チャンク単位で処理するかどうか
+        source_id: 取込み元ID（指定時は前回の同じ取込み元IDからの差分のみ取り込む）
+    """
+    from app.core.database import SessionLocal
+
+    log_id = uuid.UUID(job_id)
+    started = time.monotonic()
+    progress_db = SessionLocal()
+    db = SessionLocal()
+
+    def _update(**values) -> None:
+        progress_db.execute(update(ImportLog).where(ImportLog.id == log_id).values(**values))
+        progress_db.commit()
+
+    def _progress(processed: int) -> None:
+        # 進捗の記録に失敗してもインポート自体は続行する
+        try:
+            _update(processed_rows=processed, rows_per_second=_rows_per_second(processed, started))
+        except Exception:
+            progress_db.rollback()
+
+    try:
+        _update(status="running", started_at=func.now())
+        result = import_chunks(
+            db,
+            import_type,
+            read_chunks(path, file_name, streaming),
+            _progress,
+            source=import_source(source_id) if source_id is not None else None,
+        )
+
+        import_log = db.get(ImportLog, log_id)
+        save_result(import_log, result)
+        import_log.status = "completed"
+        import_log.rows_per_second = _rows_per_second(result.total_rows, started)
+        import_log.finished_at = func.now()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        _update(status="failed", error_message=str(e), finished_at=func.now())
+    finally:
+        db.close()
+        progress_db.close()
+        os.remove(path)
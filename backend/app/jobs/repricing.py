@@ -0,0 +1,137 @@
+"""Set-based catalog repricing job.
+
+Recomputes ``Product.unit_price_per_kg`` for every active product from its
+``unit_cost_per_kg`` and ``target_margin_rate`` in a handful of SQL
+statements. The price formula is evaluated in the database with scaled
+integers so the ROUND_HALF_UP result matches ``app.pricing_kernel``.
+
+Usage (from the backend directory):
+    python -m app.jobs.repricing [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from sqlalchemy import BigInteger, and_, case, cast, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import pricing_kernel as kernel
+from app.models import Product
+from app.pricing import DEFAULT_MIN_MARGIN_RATE
+from app.schemas import RepricingResponse
+
+
+def _scaled(expression, scale: int):
+    # DBの数値型（SQLiteではREAL）を丸めてから整数化する
+    return cast(func.round(expression * scale), BigInteger)
+
+
+def _count(condition):
+    """条件に該当する行数（集計関数）"""
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def _price_expression(cost, margin_rate):
+    """推奨価格（円/kg、四捨五入）= 原価 / (1 - 粗利率) を整数演算で表現"""
+    denominator = kernel.RATE_SCALE - _scaled(margin_rate, kernel.RATE_SCALE)
+    numerator = cost * (kernel.RATE_SCALE // kernel.COST_SCALE)
+    # round_half_up_div: (2n + d) // 2d（n, d > 0）
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def reprice_products(db: Session, dry_run: bool = False) -> RepricingResponse:
+    """
+    全商品の推奨価格を一括で再計算
+
+    - 対象: 有効（is_active）かつ目標粗利率が設定されている商品
+    - 推奨価格が最低売価（min_margin_rate、未設定時は DEFAULT_MIN_MARGIN_RATE）を
+      下回る場合は最低売価を設定（guarded）
+    - 価格がすでに正しい商品は更新しない（unchanged）
+
+    Args:
+        db: データベースセッション
+        dry_run: True の場合は件数のみ集計し、更新しない（SELECT のみ）
+
+    Returns:
+        再計算結果の件数
+    """
+    cost = _scaled(Product.unit_cost_per_kg, kernel.COST_SCALE)
+    recommended = _price_expression(cost, Product.target_margin_rate)
+    minimum = _price_expression(
+        cost, func.coalesce(Product.min_margin_rate, DEFAULT_MIN_MARGIN_RATE)
+    )
+    is_guarded = recommended < minimum
+    new_price = case((is_guarded, minimum), else_=recommended)
+
+    eligible = and_(
+        Product.is_active == True,
+        Product.target_margin_rate.isnot(None),
+        new_price > 0,
+    )
+    needs_update = or_(
+        Product.unit_price_per_kg.is_(None),
+        Product.unit_price_per_kg != new_price,
+    )
+
+    # 新しい価格を射影して件数を集計（ドライランはここまで、書き込みなし）
+    total, eligible_count, guarded, changed = db.execute(
+        select(
+            func.count(),
+            _count(eligible),
+            _count(and_(eligible, needs_update, is_guarded)),
+            _count(and_(eligible, needs_update, ~is_guarded)),
+        )
+        .select_from(Product)
+        .where(Product.is_active == True)
+    ).one()
+
+    if not dry_run:
+        try:
+            guarded = db.execute(
+                update(Product)
+                .where(eligible, needs_update, is_guarded)
+                .values(unit_price_per_kg=minimum)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            changed = db.execute(
+                update(Product)
+                .where(eligible, needs_update, ~is_guarded)
+                .values(unit_price_per_kg=recommended)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    return RepricingResponse(
+        total=total,
+        changed=changed,
+        guarded=guarded,
+        unchanged=eligible_count - changed - guarded,
+        skipped=total - eligible_count,
+        dry_run=dry_run,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="全商品の推奨価格を再計算します")
+    parser.add_argument("--dry-run", action="store_true", help="件数のみ集計し、変更しない")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        result = reprice_products(db, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    print(json.dumps(result.model_dump(), ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Rebuild of the daily sales summary from sales_data.
+
+Usage (from the backend directory):
+    python -m app.jobs.sales_daily_summary [--from YYYY-MM] [--to YYYY-MM]
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date, datetime
+
+from sqlalchemy import func
+
+
+def _month(value: str):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="商品×日の売上集計を sales_data から再作成します")
+    parser.add_argument("--from", dest="start", type=_month, help="開始月（YYYY-MM、未指定時は売上データの最古月）")
+    parser.add_argument("--to", dest="end", type=_month, help="終了月（YYYY-MM、未指定時は当月）")
+    args = parser.parse_args()
+
+    from app.break_even import add_months
+    from app.core.database import SessionLocal
+    from app.models import SalesDailySummary, SalesData
+
+    db = SessionLocal()
+    try:
+        start = args.start
+        if start is None:
+            start = db.query(func.min(SalesData.sale_date)).scalar() or date.today()
+        start = start.replace(day=1)
+        end = add_months((args.end or date.today()).replace(day=1), 1)
+        SalesDailySummary.rebuild(db.connection(), start, end)
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"{start.isoformat()} 〜 {end.isoformat()} の日次集計を再作成しました")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Maintenance of the monthly sales_data partitions.
+
+Run ``ensure`` monthly (cron) so partitions exist before their month starts;
+the sales import also creates partitions for the months it loads. ``detach``
+moves months older than the given month out of sales_data into an archive
+schema, from where they can be dumped and dropped.
+
+Usage (from the backend directory):
+    python -m app.jobs.sales_partitions ensure [--months-ahead 3]
+    python -m app.jobs.sales_partitions detach --before YYYY-MM [--keep-in-public]
+    python -m app.jobs.sales_partitions list
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from datetime import date, datetime
+
+
+def _month(value: str):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="sales_data の月次パーティションを管理します")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ensure = commands.add_parser("ensure", help="当月から指定した月数先までのパーティションを作成")
+    ensure.add_argument("--months-ahead", type=int, default=3, help="作成する先の月数（既定: 3）")
+    ensure.add_argument("--from", dest="start", type=_month, help="開始月（YYYY-MM、未指定時は当月）")
+    detach = commands.add_parser("detach", help="指定した月より前のパーティションを切り離す")
+    detach.add_argument("--before", type=_month, required=True, help="この月（YYYY-MM）より前を切り離す")
+    detach.add_argument("--archive-schema", default="archive", help="切り離したテーブルの移動先（既定: archive）")
+    detach.add_argument("--keep-in-public", action="store_true", help="切り離したテーブルを移動しない")
+    commands.add_parser("list", help="パーティションの一覧を表示")
+    args = parser.parse_args()
+
+    from app.break_even import add_months
+    from app.core.database import SessionLocal
+    from app.models import SalesData
+
+    db = SessionLocal()
+    try:
+        connection = db.connection()
+        if args.command == "ensure":
+            start = (args.start or date.today()).replace(day=1)
+            created = SalesData.ensure_partitions(connection, start, add_months(start, args.months_ahead))
+            db.commit()
+            for name in created:
+                print(name)
+            print(f"{len(created)}件のパーティションを作成しました")
+        elif args.command == "detach":
+            archive_schema = None if args.keep_in_public else args.archive_schema
+            detached = [
+                SalesData.detach_partition(connection, month, archive_schema)
+                for _, month in SalesData.partitions(connection)
+                if month is not None and month < args.before.replace(day=1)
+            ]
+            db.commit()
+            for name in detached:
+                print(name)
+            print(f"{len(detached)}件のパーティションを切り離しました")
+        else:
+            for name, month in SalesData.partitions(connection):
+                print(f"{month.strftime('%Y-%m') if month else 'DEFAULT':>8}  {name}")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
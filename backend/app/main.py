@@ -1,58 +1,65 @@
 from __future__ import annotations
 
+import uuid
 from decimal import Decimal, getcontext
-from typing import Any, Dict
+from typing import Any, Dict, List
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-
-from .api.endpoints import break_even, data_import, price_simulations, products
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import pricing_kernel
+from .api.deps import get_async_db, get_db
+from .api.endpoints import admin, break_even, data_import, price_simulations, products
+from .api.pagination import NEXT_CURSOR_HEADER
+from .break_even import DEFAULT_TREND_MONTHS
 from .core.config import settings
-from .core.database import Base, engine
+from .core.database import IN_MEMORY, Base, dispose_async_engine, engine
+from .core.executors import shutdown_executors
+from .models import Product
+from .pricing import DEFAULT_MIN_MARGIN_RATE, simulate_price
+from .pricing_montecarlo import run_monte_carlo
+from .pricing_sweep import sweep_prices
 from .schemas import (
+    BatchItemError,
     BreakEvenResponse,
-    GuardInfo,
     ImportResponse,
     ImportError,
     ImportWarning,
-    MARGIN_PRESETS,
-    PricePattern,
+    MonteCarloRequest,
+    MonteCarloResponse,
+    PriceSimulationBatchItem,
+    PriceSimulationBatchRequest,
+    PriceSimulationBatchResponse,
     PriceSimulationRequest,
     PriceSimulationResponse,
-    TrendData,
-    round_jpy,
+    PriceSweepRequest,
+    PriceSweepResponse,
+    PriceSweepSeries,
     round_rate,
 )
 
 getcontext().prec = 28
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
 )
 
-# 現状は 5% の粗利率を最低売価としてガード
-DEFAULT_MIN_MARGIN_RATE = Decimal("0.05")
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # キーセットページングの次ページのカーソルをブラウザから読めるようにする
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
-def calculate_recommended_price(unit_cost: Decimal, target_margin_rate: Decimal) -> Decimal:
-    if target_margin_rate >= Decimal("1"):
-        raise ValueError("target_margin_rate must be less than 1.0")
-    return unit_cost / (Decimal("1") - target_margin_rate)
-
-
 @app.post("/api/price-simulations/calculate", response_model=PriceSimulationResponse)
 def calculate_price_simulation(payload: PriceSimulationRequest) -> PriceSimulationResponse:
     """
@@ -64,74 +71,259 @@ def calculate_price_simulation(payload: PriceSimulationRequest) -> PriceSimulati
     - すべての計算で四捨五入（ROUND_HALF_UP）を適用
     """
     try:
-        unit_cost = payload.unit_cost_per_kg
-        target_margin_rate = payload.target_margin_rate
-        recommended_price_decimal = calculate_recommended_price(unit_cost, target_margin_rate)
+        return simulate_price(
+            payload.unit_cost_per_kg,
+            payload.target_margin_rate,
+            payload.quantity_kg,
+        )
     except ValueError as exc:
         raise HTTPException(
             status_code=400,
             detail={"error": {"code": "VALIDATION_ERROR", "message": str(exc)}},
         ) from exc
 
-    # 推奨価格と粗利益の計算（円/kg単位で四捨五入）
-    recommended_price = round_jpy(recommended_price_decimal)
-    rounded_price_decimal = Decimal(recommended_price)
-    gross_profit_decimal = rounded_price_decimal - unit_cost
-    gross_profit = round_jpy(gross_profit_decimal)
-
-    # 粗利率の計算（小数第4位まで）
-    margin_rate = round_rate(gross_profit_decimal / rounded_price_decimal)
-
-    # 総粗利益の計算（数量が指定されている場合）
-    gross_profit_total = None
-    if payload.quantity_kg is not None and payload.quantity_kg > Decimal("0"):
-        gross_profit_total = round_jpy(gross_profit_decimal * payload.quantity_kg)
-
-    # 5つの価格パターンを生成（10%, 15%, 20%, 25%, 30%）
-    price_patterns = []
-    for preset_margin in MARGIN_PRESETS:
-        price_decimal = calculate_recommended_price(unit_cost, preset_margin)
-        rounded_price = round_jpy(price_decimal)
-        rounded_price_decimal = Decimal(rounded_price)
-        price_patterns.append(
-            PricePattern(
-                margin_rate=round_rate(preset_margin),
-                price_per_kg=rounded_price,
-                profit_per_kg=round_jpy(rounded_price_decimal - unit_cost),
-            )
+
+def _format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in exc.errors()
+    )
+
+
+def _simulate_batch_item(
+    index: int,
+    raw: Any,
+    product_id: str | None = None,
+) -> PriceSimulationBatchItem:
+    """バッチ明細を1件計算（単体APIと同じ検証・計算を適用）"""
+    if not isinstance(raw, dict):
+        return PriceSimulationBatchItem(
+            index=index,
+            product_id=product_id,
+            error=BatchItemError(code="VALIDATION_ERROR", message="明細はオブジェクトで指定してください"),
+        )
+
+    try:
+        item = PriceSimulationRequest.model_validate(raw)
+    except ValidationError as exc:
+        product_name = raw.get("product_name")
+        return PriceSimulationBatchItem(
+            index=index,
+            product_id=product_id,
+            product_name=product_name if isinstance(product_name, str) else None,
+            error=BatchItemError(code="VALIDATION_ERROR", message=_format_validation_error(exc)),
+        )
+
+    try:
+        result = simulate_price(item.unit_cost_per_kg, item.target_margin_rate, item.quantity_kg)
+    except ValueError as exc:
+        return PriceSimulationBatchItem(
+            index=index,
+            product_id=product_id,
+            product_name=item.product_name,
+            error=BatchItemError(code="VALIDATION_ERROR", message=str(exc)),
         )
+    except ArithmeticError:
+        # 推奨価格が0円に丸められる場合など（単体APIでは500エラーになるケース）
+        return PriceSimulationBatchItem(
+            index=index,
+            product_id=product_id,
+            product_name=item.product_name,
+            error=BatchItemError(code="CALCULATION_ERROR", message="価格を計算できませんでした"),
+        )
+
+    return PriceSimulationBatchItem(
+        index=index,
+        product_id=product_id,
+        product_name=item.product_name,
+        result=result,
+    )
+
+
+@app.post("/api/price-simulations/calculate-batch", response_model=PriceSimulationBatchResponse)
+def calculate_price_simulation_batch(
+    payload: PriceSimulationBatchRequest,
+    db: Session = Depends(get_db),
+) -> PriceSimulationBatchResponse:
+    """
+    バッチ価格シミュレーションAPIエンドポイント
 
-    # 最低売価ガード（5%マージンを最低ラインとする）
-    minimum_price_decimal = calculate_recommended_price(unit_cost, DEFAULT_MIN_MARGIN_RATE)
-    minimum_price = round_jpy(minimum_price_decimal)
-    is_below_min = recommended_price < minimum_price
-    guard_message = (
-        "最低売価を下回っています"
-        if is_below_min
-        else "最低売価を満たしています"
+    複数の入力（PriceSimulationRequest形式）または商品IDをまとめて計算します。
+    計算結果は単体の計算APIと完全に一致し、明細ごとのエラーは
+    バッチ全体を失敗させずに results[].error として返します。
+    """
+    results: List[PriceSimulationBatchItem] = []
+
+    for index, raw in enumerate(payload.items):
+        results.append(_simulate_batch_item(index, raw))
+
+    if payload.product_ids:
+        offset = len(payload.items)
+
+        # 商品IDをまとめて解決（1クエリ）
+        parsed_ids: Dict[int, uuid.UUID] = {}
+        for position, product_id in enumerate(payload.product_ids):
+            try:
+                parsed_ids[position] = uuid.UUID(product_id)
+            except (ValueError, AttributeError, TypeError):
+                continue
+
+        try:
+            products = (
+                db.query(Product).filter(Product.id.in_(set(parsed_ids.values()))).all()
+                if parsed_ids
+                else []
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail={"error": {"code": "DATABASE_ERROR", "message": str(e)}},
+            )
+        products_by_id = {product.id: product for product in products}
+
+        for position, product_id in enumerate(payload.product_ids):
+            index = offset + position
+            if position not in parsed_ids:
+                results.append(
+                    PriceSimulationBatchItem(
+                        index=index,
+                        product_id=product_id,
+                        error=BatchItemError(code="INVALID_PARAM", message="商品IDの形式が不正です"),
+                    )
+                )
+                continue
+
+            product = products_by_id.get(parsed_ids[position])
+            if product is None:
+                results.append(
+                    PriceSimulationBatchItem(
+                        index=index,
+                        product_id=product_id,
+                        error=BatchItemError(code="NOT_FOUND", message="商品が見つかりません"),
+                    )
+                )
+                continue
+
+            target_margin_rate = (
+                payload.target_margin_rate
+                if payload.target_margin_rate is not None
+                else product.target_margin_rate
+            )
+            if target_margin_rate is None:
+                results.append(
+                    PriceSimulationBatchItem(
+                        index=index,
+                        product_id=product_id,
+                        product_name=product.product_name,
+                        error=BatchItemError(
+                            code="VALIDATION_ERROR", message="目標粗利率が設定されていません"
+                        ),
+                    )
+                )
+                continue
+
+            results.append(
+                _simulate_batch_item(
+                    index,
+                    {
+                        "product_name": product.product_name,
+                        "unit_cost_per_kg": product.unit_cost_per_kg,
+                        "target_margin_rate": target_margin_rate,
+                        "quantity_kg": payload.quantity_kg,
+                    },
+                    product_id=product_id,
+                )
+            )
+
+    failed = sum(1 for item in results if item.error is not None)
+    return PriceSimulationBatchResponse(
+        total=len(results),
+        succeeded=len(results) - failed,
+        failed=failed,
+        results=results,
     )
 
-    guard = GuardInfo(
-        minimum_price_per_kg=minimum_price,
-        is_below_min=is_below_min,
-        message=guard_message,
+
+@app.post("/api/price-simulations/sweep", response_model=PriceSweepResponse)
+def calculate_price_sweep(payload: PriceSweepRequest) -> PriceSweepResponse:
+    """
+    粗利率スイープ（価格カーブ）APIエンドポイント
+
+    指定した原価ごとに、粗利率の範囲（既定: 0%〜90%、0.1%刻み）すべての
+    販売価格・粗利益をNumPyで一括計算します。丸めは単体の計算APIと同じ
+    四捨五入（ROUND_HALF_UP）で、最低売価ガードの境界を guard_index で示します。
+    """
+    rate_places = pricing_kernel.RATE_PLACES
+    margin_from = pricing_kernel.to_scaled(payload.margin_from, rate_places)
+    margin_to = pricing_kernel.to_scaled(payload.margin_to, rate_places)
+    margin_step = pricing_kernel.to_scaled(payload.margin_step, rate_places)
+    margins = range(margin_from, margin_to + 1, margin_step)
+
+    result = sweep_prices(
+        [pricing_kernel.to_scaled(cost, pricing_kernel.COST_PLACES) for cost in payload.unit_costs_per_kg],
+        margins,
+        pricing_kernel.to_scaled(DEFAULT_MIN_MARGIN_RATE, rate_places),
     )
 
-    return PriceSimulationResponse(
-        recommended_price_per_kg=recommended_price,
-        gross_profit_per_kg=gross_profit,
-        gross_profit_total=gross_profit_total,
-        margin_rate=margin_rate,
-        price_patterns=price_patterns,
-        guard=guard,
+    return PriceSweepResponse(
+        margin_rates=[Decimal(margin).scaleb(-rate_places) for margin in margins],
+        minimum_margin_rate=round_rate(DEFAULT_MIN_MARGIN_RATE),
+        series=[
+            PriceSweepSeries(
+                unit_cost_per_kg=cost,
+                price_per_kg=prices,
+                profit_per_kg=profits,
+                minimum_price_per_kg=minimum_price,
+                guard_index=guard_index,
+            )
+            for cost, prices, profits, minimum_price, guard_index in zip(
+                payload.unit_costs_per_kg,
+                result.prices.tolist(),
+                result.profits.tolist(),
+                result.minimum_prices.tolist(),
+                result.guard_indexes,
+            )
+        ],
     )
 
 
+@app.post("/api/price-simulations/monte-carlo", response_model=MonteCarloResponse)
+def calculate_price_monte_carlo(payload: MonteCarloRequest) -> MonteCarloResponse:
+    """
+    原価変動シミュレーション（モンテカルロ法）APIエンドポイント
+
+    原価の確率分布（正規分布または三角分布）からサンプルを生成し、
+    推奨価格・総粗利益のパーセンタイルと最低売価を下回る確率を返します。
+    サンプル数が多い場合はプロセスプールで並列に計算します。
+    seed を指定すると同じ結果を再現できます。
+    """
+    return run_monte_carlo(payload)
+
+
+@app.on_event("startup")
+def _create_memory_schema() -> None:
+    # スキーマは Alembic で管理（alembic upgrade head）するが、
+    # インメモリの SQLite（DATABASE_URL=sqlite://）は起動のたびに空のためモデルから作成する
+    if IN_MEMORY:
+        Base.metadata.create_all(bind=engine)
+
+
+@app.on_event("shutdown")
+def _shutdown_executors() -> None:
+    shutdown_executors()
+
+
+@app.on_event("shutdown")
+async def _dispose_async_engine() -> None:
+    await dispose_async_engine()
+
+
 # Include API routers
 app.include_router(price_simulations.router, prefix=f"{settings.API_V1_STR}/price-simulations", tags=["price-simulations"])
 app.include_router(break_even.router, prefix=f"{settings.API_V1_STR}/break-even", tags=["break-even"])
 app.include_router(products.router, prefix=f"{settings.API_V1_STR}/products", tags=["products"])
 app.include_router(data_import.router, prefix=f"{settings.API_V1_STR}/data-import", tags=["data-import"])
+app.include_router(admin.router, prefix=f"{settings.API_V1_STR}/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -148,6 +340,7 @@ def root() -> Dict[str, Any]:
             "break_even": f"{settings.API_V1_STR}/break-even",
             "products": f"{settings.API_V1_STR}/products",
             "data_import": f"{settings.API_V1_STR}/data-import",
+            "admin": f"{settings.API_V1_STR}/admin",
         }
     }
 
@@ -158,60 +351,22 @@ def health_check() -> Dict[str, Any]:
 
 
 @app.get("/api/break-even/current", response_model=BreakEvenResponse)
-def get_break_even_current(year_month: str | None = None) -> BreakEvenResponse:
+async def get_break_even_current(
+    year_month: str | None = None,
+    trend_months: int = Query(DEFAULT_TREND_MONTHS, ge=1, le=60),
+    db: AsyncSession = Depends(get_async_db),
+) -> BreakEvenResponse:
     """
     損益分岐点情報取得APIエンドポイント
 
-    現在の月の損益分岐点情報を返します。
-    モックデータを返す実装です（後でデータベース連携を追加予定）。
+    フロントエンド向けの固定パスです。月次スナップショットと
+    過去Nか月のトレンドを返します（/break-even/current と同じ結果）。
     """
-    from datetime import datetime
-
-    # 年月が指定されていない場合は現在の年月を使用
-    if year_month is None:
-        year_month = datetime.now().strftime("%Y-%m")
-
-    # モックデータ（要件定義書のサンプルデータを使用）
-    fixed_costs = 4018000
-    current_revenue = 25000000
-    variable_cost_rate = Decimal("0.754")
-    gross_margin_rate = Decimal("0.246")
-
-    # 損益分岐点計算: 固定費 / 粗利率
-    break_even_revenue = round_jpy(Decimal(fixed_costs) / gross_margin_rate)
-
-    # 達成率計算: 現在売上 / 損益分岐点
-    achievement_rate = round_rate(Decimal(current_revenue) / Decimal(break_even_revenue))
-
-    # 差額計算
-    delta_revenue = current_revenue - break_even_revenue
-
-    # ステータス判定
-    if achievement_rate >= Decimal("1.2"):
-        status = "safe"
-    elif achievement_rate >= Decimal("1.0"):
-        status = "warning"
-    else:
-        status = "danger"
-
-    # トレンドデータ（過去3ヶ月分のモックデータ）
-    trend = [
-        TrendData(month="2025-06", revenue=23207000, break_even=15069106),
-        TrendData(month="2025-07", revenue=28722000, break_even=34235772),
-        TrendData(month="2025-08", revenue=25000000, break_even=16341463),
-    ]
-
-    return BreakEvenResponse(
+    return await break_even.get_current_break_even(
         year_month=year_month,
-        fixed_costs=fixed_costs,
-        current_revenue=current_revenue,
-        variable_cost_rate=variable_cost_rate,
-        gross_margin_rate=gross_margin_rate,
-        break_even_revenue=break_even_revenue,
-        achievement_rate=achievement_rate,
-        delta_revenue=delta_revenue,
-        status=status,
-        trend=trend,
+        refresh=False,
+        trend_months=trend_months,
+        db=db,
     )
 
 
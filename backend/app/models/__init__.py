@@ -2,9 +2,11 @@
 from .break_even_analysis import BreakEvenAnalysis
 from .fixed_cost import FixedCost
 from .import_log import ImportLog
+from .import_row_hash import ImportRowHash
 from .monthly_revenue import MonthlyRevenue
 from .price_simulation import PriceSimulation
 from .product import Product
+from .sales_daily_summary import SalesDailySummary
 from .sales_data import SalesData
 
 __all__ = [
@@ -12,7 +14,9 @@ __all__ = [
     "PriceSimulation",
     "FixedCost",
     "SalesData",
+    "SalesDailySummary",
     "BreakEvenAnalysis",
     "ImportLog",
+    "ImportRowHash",
     "MonthlyRevenue",
 ]
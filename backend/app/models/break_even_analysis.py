@@ -4,40 +4,105 @@ from __future__ import annotations
 import uuid
 from datetime import date, datetime
 from decimal import Decimal
+from itertools import chain
+from typing import Iterable
 
 from sqlalchemy import (
     TIMESTAMP,
+    Boolean,
     Column,
     Date,
     Enum,
     Numeric,
+    event,
+    update,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, attributes
 from sqlalchemy.sql import func
 
+from app.core.cache import invalidate_break_even
 from app.core.database import Base
+from app.core.db_types import UUID
+
+from .fixed_cost import FixedCost
+from .monthly_revenue import MonthlyRevenue
+from .sales_data import SalesData
 
 
 class BreakEvenAnalysis(Base):
-    """Break-even analysis model for monthly calculations."""
+    """Break-even analysis model holding one materialized snapshot per month."""
 
     __tablename__ = "break_even_analysis"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    year_month = Column(Date, nullable=False, index=True)
+    year_month = Column(Date, unique=True, nullable=False, index=True)
     fixed_cost = Column(Numeric(14, 2), nullable=False)
-    total_revenue = Column(Numeric(16, 2), nullable=False)
-    total_variable_cost = Column(Numeric(16, 2), nullable=False)
+    # 売上・変動費は数量(3桁)×単価(3桁)の合計のため、丸めずに保持する
+    total_revenue = Column(Numeric(22, 6), nullable=False)
+    total_variable_cost = Column(Numeric(22, 6), nullable=False)
     variable_cost_rate = Column(Numeric(6, 4), nullable=False)
     gross_margin_rate = Column(Numeric(6, 4), nullable=False)
     break_even_revenue = Column(Numeric(16, 2), nullable=False)
     actual_revenue = Column(Numeric(16, 2))
-    achievement_rate = Column(Numeric(6, 3))
+    achievement_rate = Column(Numeric(10, 4))
     risk_level = Column(
         Enum("safe", "warning", "danger", name="risk_level"),
         nullable=False,
     )
+    is_stale = Column(Boolean, nullable=False, default=False)
     calculated_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
+    @classmethod
+    def mark_stale(cls, connection: Connection, months: Iterable[date]) -> None:
+        """指定月（月初日）のスナップショットを再計算対象にし、レスポンスキャッシュを破棄する"""
+        months = {month.replace(day=1) for month in months}
+        if months:
+            connection.execute(
+                update(cls).where(cls.year_month.in_(months)).values(is_stale=True)
+            )
+            invalidate_break_even(months)
+
     def __repr__(self) -> str:
         return f"<BreakEvenAnalysis {self.year_month}: {self.break_even_revenue}>"
+
+
+# スナップショットの元データと、対象月を表す日付カラム
+_SNAPSHOT_SOURCES = {
+    SalesData: "sale_date",
+    FixedCost: "year_month",
+    MonthlyRevenue: "year_month",
+}
+
+# コミット待ちの変更月を保持する Session.info のキー
+_STALE_MONTHS_KEY = "break_even_stale_months"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_snapshots_stale(session: Session, flush_context) -> None:
+    """売上・固定費・月次売上の変更を検知し、該当月のスナップショットを古い状態にする"""
+    months = set()
+    for instance in chain(session.new, session.dirty, session.deleted):
+        column = _SNAPSHOT_SOURCES.get(type(instance))
+        if column is None:
+            continue
+        history = attributes.get_history(instance, column)
+        for value in chain(history.added or (), history.unchanged or (), history.deleted or ()):
+            if value is not None:
+                months.add(value)
+    if months:
+        BreakEvenAnalysis.mark_stale(session.connection(), months)
+        session.info.setdefault(_STALE_MONTHS_KEY, set()).update(months)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_months(session: Session) -> None:
+    """コミット完了後にもう一度キャッシュを破棄（コミット前に他のリクエストが古い値を登録した場合の対策）"""
+    months = session.info.pop(_STALE_MONTHS_KEY, None)
+    if months:
+        invalidate_break_even(months)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_months(session: Session) -> None:
+    session.info.pop(_STALE_MONTHS_KEY, None)
@@ -4,17 +4,27 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import TIMESTAMP, Column, Integer, String
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy import TIMESTAMP, Column, Index, Integer, Numeric, String, Text, text
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.db_types import JSONB, UUID
 
 
 class ImportLog(Base):
     """Import log model for tracking data imports."""
 
     __tablename__ = "import_logs"
+    __table_args__ = (
+        # 実行中ジョブの一覧・監視用
+        Index(
+            "idx_import_logs_status",
+            "status",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        # 同じファイルの前回のインポートの検索用
+        Index("idx_import_logs_file", "import_type", "file_name", "imported_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     import_type = Column(String(50), nullable=False)
@@ -25,5 +35,18 @@ class ImportLog(Base):
     error_details = Column(JSONB)
     imported_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
 
+    # バックグラウンド実行の進捗（queued / running / completed / failed）
+    status = Column(String(20), nullable=False, default="completed")
+    processed_rows = Column(Integer, nullable=False, default=0)
+    rows_per_second = Column(Numeric(12, 2))
+    started_at = Column(TIMESTAMP(timezone=True))
+    finished_at = Column(TIMESTAMP(timezone=True))
+    error_message = Column(Text)
+
+    # 再インポートの差分判定（ファイルの SHA-256 と、変更がなくスキップした行・削除した行の件数）
+    file_hash = Column(String(64))
+    unchanged_rows = Column(Integer, nullable=False, default=0)
+    deleted_rows = Column(Integer, nullable=False, default=0)
+
     def __repr__(self) -> str:
         return f"<ImportLog {self.import_type}: {self.file_name}>"
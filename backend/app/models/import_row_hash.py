@@ -0,0 +1,25 @@
+"""Import row hash model."""
+from __future__ import annotations
+
+from sqlalchemy import TIMESTAMP, Column, String
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.core.db_types import UUID
+
+
+class ImportRowHash(Base):
+    """Content hash of each imported row, per import source (file and sheet)."""
+
+    __tablename__ = "import_row_hashes"
+
+    import_type = Column(String(50), primary_key=True)
+    source = Column(String(300), primary_key=True)
+    # 正規化した行のハッシュと、同じ内容の行の出現順（"ハッシュ:番号"）
+    row_key = Column(String(48), primary_key=True)
+    # 取り込んだレコードのID（sales_data.id、商品マスタは NULL）
+    record_id = Column(UUID(as_uuid=True))
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<ImportRowHash {self.import_type} {self.source}: {self.row_key}>"
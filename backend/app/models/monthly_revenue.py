@@ -6,10 +6,10 @@ from datetime import date, datetime
 from decimal import Decimal
 
 from sqlalchemy import TIMESTAMP, CheckConstraint, Column, Date, Numeric, Text
-from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.db_types import UUID
 
 
 class MonthlyRevenue(Base):
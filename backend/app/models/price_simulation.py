@@ -12,25 +12,30 @@ from sqlalchemy import (
     Column,
     Enum,
     ForeignKey,
+    Index,
     Numeric,
     String,
     Text,
 )
-from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.db_types import JSONB, UUID
 
 
 class PriceSimulation(Base):
     """Price simulation model for storing simulation results."""
 
     __tablename__ = "price_simulations"
+    __table_args__ = (
+        # 履歴のキーセットページング（(simulation_at, id) の降順、インデックスは逆順に走査）用
+        Index("idx_simulations_date_id", "simulation_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"))
-    simulation_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    simulation_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     input_cost_per_kg = Column(
         Numeric(14, 3),
         CheckConstraint("input_cost_per_kg > 0"),
@@ -5,18 +5,27 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import TIMESTAMP, Boolean, CheckConstraint, Column, Numeric, String
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import TIMESTAMP, Boolean, CheckConstraint, Column, Index, Numeric, String, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.db_types import UUID
 
 
 class Product(Base):
     """Product model representing items in the inventory."""
 
     __tablename__ = "products"
+    __table_args__ = (
+        # 有効な商品一覧のキーセットページング（(product_name, id) 順）用
+        Index(
+            "idx_products_active_name_id",
+            "product_name",
+            "id",
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     product_code = Column(String(50), unique=True, nullable=False, index=True)
@@ -0,0 +1,183 @@
+"""Daily sales summary model."""
+from __future__ import annotations
+
+import uuid
+from datetime import date
+from decimal import Decimal
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Column,
+    Date,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    delete,
+    event,
+    func,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.core.database import Base
+from app.core.db_types import UUID, nil_uuid
+
+from .sales_data import SalesData
+
+
+class SalesDailySummary(Base):
+    """Sales totals per product and day, maintained incrementally from sales_data."""
+
+    __tablename__ = "sales_daily_summary"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    sale_date = Column(Date, nullable=False)
+    product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"))
+    quantity_kg = Column(Numeric(18, 3), nullable=False, default=0)
+    revenue = Column(Numeric(22, 6), nullable=False, default=0)
+    variable_cost = Column(Numeric(22, 6), nullable=False, default=0)
+    row_count = Column(Integer, nullable=False, default=0)
+
+    # 商品が NULL の行も売上日ごとに1行にまとめる
+    # （UNIQUE NULLS NOT DISTINCT は PostgreSQL 15 以降のため、COALESCE の式インデックスを使用）
+    __table_args__ = (
+        Index(
+            "uq_sales_daily_summary_date_product",
+            sale_date,
+            func.coalesce(product_id, nil_uuid()),
+            unique=True,
+        ),
+    )
+
+    @classmethod
+    def apply_deltas(
+        cls,
+        connection: Connection,
+        deltas: Dict[Tuple[date, Optional[uuid.UUID]], List],
+    ) -> None:
+        """
+        日次集計に増分を加算（行がない場合は作成）
+
+        deltas は (売上日, 商品ID) ごとの [数量, 売上高, 変動費, 件数] の増分です。
+        """
+        if not deltas:
+            return
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "sale_date": sale_date,
+                "product_id": product_id,
+                "quantity_kg": quantity,
+                "revenue": revenue,
+                "variable_cost": variable_cost,
+                "row_count": row_count,
+            }
+            for (sale_date, product_id), (quantity, revenue, variable_cost, row_count) in deltas.items()
+        ]
+        dialect = sqlite if connection.dialect.name == "sqlite" else postgresql
+        statement = dialect.insert(cls)
+        statement = statement.on_conflict_do_update(
+            index_elements=[cls.sale_date, func.coalesce(cls.product_id, nil_uuid())],
+            set_={
+                column: getattr(cls, column) + getattr(statement.excluded, column)
+                for column in ("quantity_kg", "revenue", "variable_cost", "row_count")
+            },
+        )
+        connection.execute(statement, rows)
+        if any(delta[3] < 0 for delta in deltas.values()):
+            connection.execute(delete(cls).where(cls.row_count <= 0))
+
+    @classmethod
+    def rebuild(cls, connection: Connection, start: date, end: date) -> None:
+        """
+        期間（start 以上 end 未満）の日次集計を sales_data から再作成
+
+        ORMを経由しない一括取込みの後や、集計の初期作成に使用します。
+        """
+        connection.execute(delete(cls).where(cls.sale_date >= start, cls.sale_date < end))
+        rows = connection.execute(
+            select(
+                SalesData.sale_date,
+                SalesData.product_id,
+                func.sum(SalesData.quantity_kg),
+                func.sum(SalesData.quantity_kg * SalesData.unit_price_per_kg),
+                func.sum(SalesData.quantity_kg * SalesData.unit_cost_per_kg),
+                func.count(),
+            )
+            .where(SalesData.sale_date >= start, SalesData.sale_date < end)
+            .group_by(SalesData.sale_date, SalesData.product_id)
+        )
+        cls.apply_deltas(
+            connection,
+            {(row[0], row[1]): list(row[2:]) for row in rows},
+        )
+
+    def __repr__(self) -> str:
+        return f"<SalesDailySummary {self.sale_date} {self.product_id}: {self.revenue}>"
+
+
+# コミット前に減算する変更前の値を保持する Session.info のキー
+_PENDING_DELTAS_KEY = "sales_daily_summary_deltas"
+
+
+def _collect(
+    session: Session,
+    ids: Iterable[uuid.UUID],
+    sign: int,
+    deltas: Dict[Tuple[date, Optional[uuid.UUID]], List],
+) -> None:
+    """sales_data の現在の値（DB上）を日次集計の増分として加算（sign=-1 で減算）"""
+    ids = list(ids)
+    if not ids:
+        return
+    rows = session.connection().execute(
+        select(
+            SalesData.sale_date,
+            SalesData.product_id,
+            SalesData.quantity_kg,
+            SalesData.quantity_kg * SalesData.unit_price_per_kg,
+            SalesData.quantity_kg * SalesData.unit_cost_per_kg,
+        ).where(SalesData.id.in_(ids))
+    )
+    for sale_date, product_id, quantity, revenue, variable_cost in rows:
+        delta = deltas.setdefault((sale_date, product_id), [Decimal("0"), Decimal("0"), Decimal("0"), 0])
+        delta[0] += sign * Decimal(quantity)
+        delta[1] += sign * Decimal(revenue)
+        delta[2] += sign * Decimal(variable_cost)
+        delta[3] += sign
+
+
+@event.listens_for(Session, "before_flush")
+def _subtract_previous_values(session: Session, flush_context, instances) -> None:
+    """更新・削除される sales_data の変更前の値を減算対象として記録する"""
+    ids = [
+        instance.id
+        for instance in chain(session.dirty, session.deleted)
+        if isinstance(instance, SalesData) and instance.id is not None and instance not in session.new
+    ]
+    if ids:
+        _collect(session, ids, -1, session.info.setdefault(_PENDING_DELTAS_KEY, {}))
+
+
+@event.listens_for(Session, "after_flush")
+def _update_daily_summary(session: Session, flush_context) -> None:
+    """sales_data の追加・更新・削除を日次集計に反映する"""
+    deltas = session.info.pop(_PENDING_DELTAS_KEY, {})
+    ids = [
+        instance.id
+        for instance in chain(session.new, session.dirty)
+        if isinstance(instance, SalesData) and instance not in session.deleted
+    ]
+    _collect(session, ids, 1, deltas)
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if deltas:
+        SalesDailySummary.apply_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_deltas(session: Session) -> None:
+    session.info.pop(_PENDING_DELTAS_KEY, None)
@@ -1,34 +1,62 @@
-"""Sales data model."""
+"""Sales data model.
+
+On PostgreSQL ``sales_data`` is range-partitioned by month on ``sale_date``
+(``sales_data_yYYYYmMM``), with a ``sales_data_default`` partition that
+catches dates no monthly partition covers yet. Month-scoped queries only
+scan the matching partition. Partitions are created ahead of time by
+``SalesData.ensure_partitions`` (the sales import calls it for the months it
+loads), and old months can be detached into an archive schema with
+``SalesData.detach_partition``.
+"""
 from __future__ import annotations
 
 import uuid
 from datetime import date, datetime
 from decimal import Decimal
+from typing import List, Optional, Tuple
 
 from sqlalchemy import (
     TIMESTAMP,
     CheckConstraint,
+    DDL,
     Column,
     Date,
     ForeignKey,
+    Index,
     Numeric,
     String,
+    event,
+    text,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.core.database import Base
+from app.core.db_types import UUID
 
 
 class SalesData(Base):
     """Sales data model for tracking sales transactions."""
 
     __tablename__ = "sales_data"
+    __table_args__ = (
+        # 月次・商品別集計を索引のみで処理するためのカバリングインデックス
+        Index(
+            "idx_sales_data_date_product",
+            "sale_date",
+            "product_id",
+            postgresql_include=["quantity_kg", "unit_price_per_kg", "unit_cost_per_kg"],
+        ),
+        # 売上日は取込み順にほぼ並ぶため、範囲検索は小さな BRIN インデックスで十分
+        Index("idx_sales_data_sale_date_brin", "sale_date", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (sale_date)"},
+    )
 
+    # パーティションキーを含める必要があるため、主キーは (id, sale_date)
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.id", ondelete="CASCADE"))
-    sale_date = Column(Date, nullable=False, index=True)
+    sale_date = Column(Date, primary_key=True, nullable=False)
     quantity_kg = Column(
         Numeric(14, 3),
         CheckConstraint("quantity_kg > 0"),
@@ -51,5 +79,142 @@ class SalesData(Base):
     # Relationships
     product = relationship("Product", back_populates="sales_data")
 
+    @staticmethod
+    def partition_name(month: date) -> str:
+        """月次パーティションのテーブル名（sales_data_yYYYYmMM）"""
+        return f"sales_data_y{month.year:04d}m{month.month:02d}"
+
+    @classmethod
+    def partitions(cls, connection: Connection) -> List[Tuple[str, Optional[date]]]:
+        """
+        接続中のパーティションの一覧（月の昇順、DEFAULT パーティションの月は None）
+
+        sales_data がパーティション化されていない場合（SQLite など）は空です。
+        """
+        if not _is_partitioned(connection):
+            return []
+        names = connection.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = to_regclass(:parent)"
+            ),
+            {"parent": cls.__tablename__},
+        ).scalars()
+        return sorted(((name, _partition_month(name)) for name in names), key=lambda item: item[1] or date.min)
+
+    @classmethod
+    def ensure_partitions(cls, connection: Connection, start: date, end: date) -> List[str]:
+        """
+        start の月から end の月までの月次パーティションを作成（既存の月は何もしない）
+
+        DEFAULT パーティションにその月の行がある場合は、新しいパーティションへ移動します。
+        sales_data がパーティション化されていない場合は何もしません。
+
+        Returns:
+            作成したパーティション名
+        """
+        if not _is_partitioned(connection):
+            return []
+        # 同時に実行されたインポートが同じ月を作成しないよう、トランザクション単位でロック
+        connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('sales_data_partitions'))"))
+        existing = {name for name, _ in cls.partitions(connection)}
+
+        created = []
+        month = start.replace(day=1)
+        while month <= end:
+            following = _next_month(month)
+            name = cls.partition_name(month)
+            if name not in existing:
+                _create_partition(connection, name, month, following, _DEFAULT_PARTITION in existing)
+                created.append(name)
+            month = following
+        return created
+
+    @classmethod
+    def detach_partition(cls, connection: Connection, month: date, archive_schema: Optional[str] = "archive") -> str:
+        """
+        月次パーティションを sales_data から切り離す
+
+        切り離したテーブルは archive_schema に移動します（None の場合は public に残す）。
+        sales_daily_summary の集計は残るため、月次の推移や着地見込みには影響しません。
+
+        Returns:
+            切り離したテーブル名（スキーマ付き）
+        """
+        name = cls.partition_name(month)
+        connection.execute(text(f'ALTER TABLE {cls.__tablename__} DETACH PARTITION "{name}"'))
+        if archive_schema is None:
+            return name
+        connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+        connection.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"'))
+        return f"{archive_schema}.{name}"
+
     def __repr__(self) -> str:
         return f"<SalesData {self.id} on {self.sale_date}>"
+
+
+# 月次パーティションのない売上日を受けるパーティション
+_DEFAULT_PARTITION = "sales_data_default"
+
+event.listen(
+    SalesData.__table__,
+    "after_create",
+    DDL(f"CREATE TABLE IF NOT EXISTS {_DEFAULT_PARTITION} PARTITION OF sales_data DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _partition_month(name: str) -> Optional[date]:
+    """パーティション名から月を取得（sales_data_yYYYYmMM 以外は None）"""
+    try:
+        return datetime.strptime(name, "sales_data_y%Ym%m").date()
+    except ValueError:
+        return None
+
+
+def _is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(
+        connection.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('sales_data'))")
+        ).scalar()
+    )
+
+
+def _create_partition(connection: Connection, name: str, start: date, end: date, has_default: bool) -> None:
+    """
+    月次パーティションを作成
+
+    DEFAULT パーティションに同じ月の行があると PARTITION OF で作成できないため、
+    同じ構造のテーブルを作成して行を移動してから ATTACH します。範囲の CHECK 制約があるため、
+    ATTACH 時の新しいテーブルの検証は省略されます。
+    """
+    bounds = {"start": start, "end": end}
+    connection.execute(text(f'CREATE TABLE "{name}" (LIKE sales_data INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    connection.execute(
+        text(
+            f'ALTER TABLE "{name}" ADD CONSTRAINT "{name}_sale_date_range" '
+            f"CHECK (sale_date >= DATE '{start.isoformat()}' AND sale_date < DATE '{end.isoformat()}')"
+        )
+    )
+    if has_default:
+        connection.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {_DEFAULT_PARTITION} "
+                f"WHERE sale_date >= :start AND sale_date < :end RETURNING *) "
+                f'INSERT INTO "{name}" SELECT * FROM moved'
+            ),
+            bounds,
+        )
+    connection.execute(
+        text(
+            f'ALTER TABLE sales_data ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    )
@@ -0,0 +1,221 @@
+"""Price calculation logic shared by the simulation endpoints."""
+from __future__ import annotations
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import pricing_kernel as kernel
+from .schemas import (
+    GuardInfo,
+    MARGIN_PRESETS,
+    PricePattern,
+    PriceSimulationResponse,
+    round_jpy,
+    round_rate,
+)
+
+# 現状は 5% の粗利率を最低売価としてガード
+DEFAULT_MIN_MARGIN_RATE = Decimal("0.05")
+
+
+def calculate_recommended_price(unit_cost: Decimal, target_margin_rate: Decimal) -> Decimal:
+    if target_margin_rate >= Decimal("1"):
+        raise ValueError("target_margin_rate must be less than 1.0")
+    return unit_cost / (Decimal("1") - target_margin_rate)
+
+
+def simulate_price_decimal(
+    unit_cost: Decimal,
+    target_margin_rate: Decimal,
+    quantity_kg: Optional[Decimal] = None,
+) -> PriceSimulationResponse:
+    """
+    価格シミュレーションを実行（Decimalによる参照実装）
+
+    要件定義書v2.0に基づいた価格計算を実行します。
+    - 推奨価格 = 原価 / (1 - 目標粗利率)
+    - 粗利益 = 推奨価格 - 原価
+    - すべての計算で四捨五入（ROUND_HALF_UP）を適用
+
+    Raises:
+        ValueError: 目標粗利率が1.0以上の場合
+    """
+    recommended_price_decimal = calculate_recommended_price(unit_cost, target_margin_rate)
+
+    # 推奨価格と粗利益の計算（円/kg単位で四捨五入）
+    recommended_price = round_jpy(recommended_price_decimal)
+    rounded_price_decimal = Decimal(recommended_price)
+    gross_profit_decimal = rounded_price_decimal - unit_cost
+    gross_profit = round_jpy(gross_profit_decimal)
+
+    # 粗利率の計算（小数第4位まで）
+    margin_rate = round_rate(gross_profit_decimal / rounded_price_decimal)
+
+    # 総粗利益の計算（数量が指定されている場合）
+    gross_profit_total = None
+    if quantity_kg is not None and quantity_kg > Decimal("0"):
+        gross_profit_total = round_jpy(gross_profit_decimal * quantity_kg)
+
+    # 5つの価格パターンを生成（10%, 15%, 20%, 25%, 30%）
+    price_patterns = []
+    for preset_margin in MARGIN_PRESETS:
+        price_decimal = calculate_recommended_price(unit_cost, preset_margin)
+        rounded_price = round_jpy(price_decimal)
+        rounded_price_decimal = Decimal(rounded_price)
+        price_patterns.append(
+            PricePattern(
+                margin_rate=round_rate(preset_margin),
+                price_per_kg=rounded_price,
+                profit_per_kg=round_jpy(rounded_price_decimal - unit_cost),
+            )
+        )
+
+    # 最低売価ガード（5%マージンを最低ラインとする）
+    minimum_price_decimal = calculate_recommended_price(unit_cost, DEFAULT_MIN_MARGIN_RATE)
+    minimum_price = round_jpy(minimum_price_decimal)
+    is_below_min = recommended_price < minimum_price
+    guard_message = (
+        "最低売価を下回っています"
+        if is_below_min
+        else "最低売価を満たしています"
+    )
+
+    guard = GuardInfo(
+        minimum_price_per_kg=minimum_price,
+        is_below_min=is_below_min,
+        message=guard_message,
+    )
+
+    return PriceSimulationResponse(
+        recommended_price_per_kg=recommended_price,
+        gross_profit_per_kg=gross_profit,
+        gross_profit_total=gross_profit_total,
+        margin_rate=margin_rate,
+        price_patterns=price_patterns,
+        guard=guard,
+    )
+
+
+# 原価ごとの価格パターン・最低売価をキャッシュする件数
+PRICE_CACHE_SIZE = 1024
+
+
+def _scale_rules() -> Tuple[List[Tuple[Decimal, Optional[int]]], Optional[int]]:
+    """プリセットと最低粗利率を固定小数点カーネル用に換算"""
+    presets = [
+        (round_rate(preset_margin), kernel.to_scaled(preset_margin, kernel.RATE_PLACES))
+        for preset_margin in MARGIN_PRESETS
+    ]
+    return presets, kernel.to_scaled(DEFAULT_MIN_MARGIN_RATE, kernel.RATE_PLACES)
+
+
+_PRESETS_SCALED, _MIN_MARGIN_SCALED = _scale_rules()
+_RULES_EXACT = _MIN_MARGIN_SCALED is not None and all(
+    scaled is not None for _, scaled in _PRESETS_SCALED
+)
+
+
+@lru_cache(maxsize=PRICE_CACHE_SIZE)
+def _preset_table(cost: int) -> Tuple[Tuple[PricePattern, ...], int]:
+    """原価（1/1000円単位）ごとの価格パターン一覧と最低売価（円/kg）"""
+    price_patterns = []
+    for preset_rate, preset_margin in _PRESETS_SCALED:
+        price = kernel.recommended_price_jpy(cost, preset_margin)
+        price_patterns.append(
+            PricePattern(
+                margin_rate=preset_rate,
+                price_per_kg=price,
+                profit_per_kg=kernel.profit_jpy(price, cost),
+            )
+        )
+    minimum_price = kernel.recommended_price_jpy(cost, _MIN_MARGIN_SCALED)
+    return tuple(price_patterns), minimum_price
+
+
+def invalidate_price_cache() -> None:
+    """
+    価格パターン・最低売価キャッシュを無効化
+
+    MARGIN_PRESETS（リストを直接更新）または DEFAULT_MIN_MARGIN_RATE を
+    変更した後に呼び出してください。換算済みの値も再計算します。
+    """
+    global _PRESETS_SCALED, _MIN_MARGIN_SCALED, _RULES_EXACT
+    _PRESETS_SCALED, _MIN_MARGIN_SCALED = _scale_rules()
+    _RULES_EXACT = _MIN_MARGIN_SCALED is not None and all(
+        scaled is not None for _, scaled in _PRESETS_SCALED
+    )
+    _preset_table.cache_clear()
+
+
+def price_cache_stats() -> Dict[str, Any]:
+    """価格パターン・最低売価キャッシュの統計情報"""
+    info = _preset_table.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+        "size": info.currsize,
+        "max_size": info.maxsize,
+    }
+
+
+def _guard_info(recommended_price: int, minimum_price: int) -> GuardInfo:
+    is_below_min = recommended_price < minimum_price
+    return GuardInfo(
+        minimum_price_per_kg=minimum_price,
+        is_below_min=is_below_min,
+        message="最低売価を下回っています" if is_below_min else "最低売価を満たしています",
+    )
+
+
+def simulate_price(
+    unit_cost: Decimal,
+    target_margin_rate: Decimal,
+    quantity_kg: Optional[Decimal] = None,
+) -> PriceSimulationResponse:
+    """
+    価格シミュレーションを実行
+
+    入力がDBの桁数（原価 Numeric(14,3)、粗利率 Numeric(6,4)）で表現できる場合は
+    固定小数点カーネルで整数演算し、それ以外は simulate_price_decimal に委譲します。
+    結果はどちらの経路でも同一です。価格パターンと最低売価は原価のみで決まるため、
+    原価ごとにLRUキャッシュします。
+
+    Raises:
+        ValueError: 目標粗利率が1.0以上の場合
+    """
+    cost = kernel.to_scaled(unit_cost, kernel.COST_PLACES)
+    margin = kernel.to_scaled(target_margin_rate, kernel.RATE_PLACES)
+    quantity = (
+        kernel.to_scaled(quantity_kg, kernel.QUANTITY_PLACES)
+        if quantity_kg is not None
+        else None
+    )
+    if (
+        not _RULES_EXACT
+        or cost is None
+        or margin is None
+        or (quantity_kg is not None and quantity is None)
+    ):
+        return simulate_price_decimal(unit_cost, target_margin_rate, quantity_kg)
+
+    recommended_price = kernel.recommended_price_jpy(cost, margin)
+    gross_profit = kernel.profit_jpy(recommended_price, cost)
+    margin_rate = kernel.margin_rate(recommended_price, cost)
+
+    gross_profit_total = None
+    if quantity is not None and quantity > 0:
+        gross_profit_total = kernel.gross_profit_total_jpy(recommended_price, cost, quantity)
+
+    price_patterns, minimum_price = _preset_table(cost)
+
+    return PriceSimulationResponse(
+        recommended_price_per_kg=recommended_price,
+        gross_profit_per_kg=gross_profit,
+        gross_profit_total=gross_profit_total,
+        margin_rate=margin_rate,
+        price_patterns=list(price_patterns),
+        guard=_guard_info(recommended_price, minimum_price),
+    )
@@ -0,0 +1,79 @@
+"""Fixed-point integer pricing kernel.
+
+Costs are carried as integers in 1/1000 yen (``Numeric(14, 3)``), margin
+rates in 1/10000 (``Numeric(6, 4)``) and quantities in 1/1000 kg, so every
+calculation in the price simulation reduces to exact integer division with
+ROUND_HALF_UP. Results are identical to the Decimal implementation in
+``app.pricing.simulate_price_decimal``.
+"""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Optional
+
+COST_PLACES = 3
+RATE_PLACES = 4
+QUANTITY_PLACES = 3
+
+COST_SCALE = 10 ** COST_PLACES
+RATE_SCALE = 10 ** RATE_PLACES
+QUANTITY_SCALE = 10 ** QUANTITY_PLACES
+
+# Decimal のデフォルト精度（28桁）を超える入力はカーネルの対象外
+_MAX_DIGITS = 28
+
+_NEGATIVE_ZERO_RATE = Decimal("-0.0000")
+
+
+def to_scaled(value: Decimal, places: int) -> Optional[int]:
+    """
+    Decimal を 10**places 倍の整数に変換
+
+    丸めなしで表現できない場合（桁数超過・NaN など）は None を返します。
+    """
+    if not value.is_finite():
+        return None
+    if len(value.as_tuple().digits) > _MAX_DIGITS:
+        return None
+    scaled = value.scaleb(places)
+    integral = scaled.to_integral_value()
+    if scaled != integral:
+        return None
+    return int(integral)
+
+
+def round_half_up_div(numerator: int, denominator: int) -> int:
+    """整数除算の四捨五入（ROUND_HALF_UP、0から遠い方向に丸める）"""
+    if numerator >= 0:
+        return (2 * numerator + denominator) // (2 * denominator)
+    return -((2 * -numerator + denominator) // (2 * denominator))
+
+
+def recommended_price_jpy(cost: int, margin: int) -> int:
+    """推奨価格（円/kg、四捨五入）= 原価 / (1 - 粗利率)"""
+    if margin >= RATE_SCALE:
+        raise ValueError("target_margin_rate must be less than 1.0")
+    # (cost / 1000) / ((10000 - margin) / 10000)
+    return round_half_up_div(cost * (RATE_SCALE // COST_SCALE), RATE_SCALE - margin)
+
+
+def profit_jpy(price_jpy: int, cost: int) -> int:
+    """粗利益（円/kg、四捨五入）= 価格 - 原価"""
+    return round_half_up_div(price_jpy * COST_SCALE - cost, COST_SCALE)
+
+
+def margin_rate(price_jpy: int, cost: int) -> Decimal:
+    """粗利率（小数第4位で四捨五入）= (価格 - 原価) / 価格"""
+    profit = price_jpy * COST_SCALE - cost
+    # profit / (1000 * price) を 1/10000 単位に換算
+    scaled = round_half_up_div(profit * (RATE_SCALE // COST_SCALE), price_jpy)
+    if scaled == 0 and profit < 0:
+        # Decimal.quantize は負のゼロ（-0.0000）を返す
+        return _NEGATIVE_ZERO_RATE
+    return Decimal(scaled).scaleb(-RATE_PLACES)
+
+
+def gross_profit_total_jpy(price_jpy: int, cost: int, quantity: int) -> int:
+    """総粗利益（円、四捨五入）= (価格 - 原価) × 数量"""
+    profit = price_jpy * COST_SCALE - cost
+    return round_half_up_div(profit * quantity, COST_SCALE * QUANTITY_SCALE)
@@ -0,0 +1,145 @@
+"""Monte Carlo simulation of unit-cost uncertainty.
+
+Unit costs are drawn from a normal or triangular distribution and priced with
+the vectorized fixed-point arithmetic of ``app.pricing_sweep``. The sample is
+split into fixed-size chunks, each with its own child seed, so a given seed
+gives the same result whether the chunks run inline or on the process pool.
+"""
+from __future__ import annotations
+
+import secrets
+from decimal import Decimal
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import pricing_kernel as kernel
+from .core.executors import get_process_pool
+from .pricing import DEFAULT_MIN_MARGIN_RATE
+from .pricing_sweep import round_half_up_div
+from .schemas import (
+    MonteCarloRequest,
+    MonteCarloResponse,
+    PercentileBand,
+    UNIT_COST_MAX,
+    UNIT_COST_MIN,
+    round_jpy,
+    round_rate,
+)
+
+# 1チャンクあたりのサンプル数（シードの分割単位でもある）
+MONTE_CARLO_CHUNK_SIZE = 250_000
+# この件数を超える場合はプロセスプールで並列実行
+MONTE_CARLO_PARALLEL_THRESHOLD = 500_000
+
+_COST_MIN = kernel.to_scaled(UNIT_COST_MIN, kernel.COST_PLACES)
+_COST_MAX = kernel.to_scaled(UNIT_COST_MAX, kernel.COST_PLACES)
+
+
+def _simulate_chunk(
+    distribution: str,
+    params: Tuple[float, ...],
+    size: int,
+    seed: np.random.SeedSequence,
+    margin: int,
+    min_margin: int,
+    selected_price: int,
+    quantity: int,
+) -> Tuple[np.ndarray, np.ndarray, int, int]:
+    """
+    1チャンク分のサンプルを生成して計算（プロセスプールから呼び出し可能）
+
+    Returns:
+        (推奨価格, 総粗利益, 最低売価割れ件数, 赤字件数)
+    """
+    rng = np.random.default_rng(seed)
+    if distribution == "normal":
+        samples = rng.normal(params[0], params[1], size)
+    else:
+        samples = rng.triangular(params[0], params[1], params[2], size)
+
+    # 原価は 0.001円単位に丸め、入力可能な範囲に収める
+    costs = np.clip(np.rint(samples * kernel.COST_SCALE), _COST_MIN, _COST_MAX).astype(np.int64)
+
+    prices = round_half_up_div(costs * (kernel.RATE_SCALE // kernel.COST_SCALE), kernel.RATE_SCALE - margin)
+    minimum_prices = round_half_up_div(
+        costs * (kernel.RATE_SCALE // kernel.COST_SCALE), kernel.RATE_SCALE - min_margin
+    )
+
+    # 採用価格を固定したときの総粗利益（円）。桁あふれを避けるため float64 で計算
+    profits = (selected_price * kernel.COST_SCALE - costs).astype(np.float64)
+    totals = profits * (quantity / (kernel.COST_SCALE * kernel.QUANTITY_SCALE))
+
+    below_min = int(np.count_nonzero(selected_price < minimum_prices))
+    losses = int(np.count_nonzero(profits < 0))
+    return prices, totals, below_min, losses
+
+
+def _bands(values: np.ndarray, percentiles: Sequence[float]) -> List[PercentileBand]:
+    points = np.percentile(values, percentiles)
+    return [
+        PercentileBand(percentile=percentile, value=round_jpy(Decimal(repr(float(point)))))
+        for percentile, point in zip(percentiles, points)
+    ]
+
+
+def run_monte_carlo(payload: MonteCarloRequest) -> MonteCarloResponse:
+    """
+    原価の不確実性を考慮した価格シミュレーションを実行
+
+    - 推奨価格: サンプルした原価ごとの推奨価格（円/kg）の分布
+    - 総粗利益: 採用価格（未指定時は基準原価での推奨価格）を固定し、
+      サンプルした原価で販売した場合の総粗利益（円）の分布
+    - 最低売価割れ確率: 採用価格がサンプル原価の最低売価を下回る確率
+    """
+    distribution = payload.cost_distribution
+    if distribution.type == "normal":
+        params: Tuple[float, ...] = (float(distribution.mean), float(distribution.std))
+        reference_cost = distribution.mean
+    else:
+        params = (float(distribution.min), float(distribution.mode), float(distribution.max))
+        reference_cost = distribution.mode
+
+    margin = kernel.to_scaled(payload.target_margin_rate, kernel.RATE_PLACES)
+    min_margin = kernel.to_scaled(DEFAULT_MIN_MARGIN_RATE, kernel.RATE_PLACES)
+    quantity = kernel.to_scaled(payload.quantity_kg, kernel.QUANTITY_PLACES)
+    reference_cost = reference_cost.quantize(Decimal("0.001"))
+    selected_price = (
+        payload.selected_price_per_kg
+        if payload.selected_price_per_kg is not None
+        else kernel.recommended_price_jpy(kernel.to_scaled(reference_cost, kernel.COST_PLACES), margin)
+    )
+
+    seed = payload.seed if payload.seed is not None else secrets.randbits(32)
+    sizes = [MONTE_CARLO_CHUNK_SIZE] * (payload.samples // MONTE_CARLO_CHUNK_SIZE)
+    if payload.samples % MONTE_CARLO_CHUNK_SIZE:
+        sizes.append(payload.samples % MONTE_CARLO_CHUNK_SIZE)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunk_args = [
+        (distribution.type, params, size, chunk_seed, margin, min_margin, selected_price, quantity)
+        for size, chunk_seed in zip(sizes, chunk_seeds)
+    ]
+
+    if payload.samples > MONTE_CARLO_PARALLEL_THRESHOLD:
+        pool = get_process_pool()
+        futures = [pool.submit(_simulate_chunk, *args) for args in chunk_args]
+        chunks = [future.result() for future in futures]
+    else:
+        chunks = [_simulate_chunk(*args) for args in chunk_args]
+
+    prices = np.concatenate([chunk[0] for chunk in chunks])
+    totals = np.concatenate([chunk[1] for chunk in chunks])
+    below_min = sum(chunk[2] for chunk in chunks)
+    losses = sum(chunk[3] for chunk in chunks)
+    percentiles = [float(percentile) for percentile in payload.percentiles]
+
+    return MonteCarloResponse(
+        samples=payload.samples,
+        seed=seed,
+        reference_cost_per_kg=reference_cost,
+        selected_price_per_kg=selected_price,
+        price_per_kg=_bands(prices, percentiles),
+        gross_profit_total=_bands(totals, percentiles),
+        below_min_probability=round_rate(Decimal(below_min) / Decimal(payload.samples)),
+        loss_probability=round_rate(Decimal(losses) / Decimal(payload.samples)),
+    )
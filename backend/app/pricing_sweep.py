@@ -0,0 +1,60 @@
+"""Vectorized price sweep over a grid of unit costs and margin rates."""
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from . import pricing_kernel as kernel
+
+
+class SweepResult(NamedTuple):
+    """スイープ結果（原価 × 粗利率の行列）"""
+
+    prices: np.ndarray  # (原価数, 粗利率数) 推奨価格（円/kg）
+    profits: np.ndarray  # (原価数, 粗利率数) 粗利益（円/kg）
+    minimum_prices: np.ndarray  # (原価数,) 最低売価（円/kg）
+    guard_indexes: list[Optional[int]]  # 最低売価を満たす最初の粗利率の位置
+
+
+def round_half_up_div(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """整数配列の除算を四捨五入（ROUND_HALF_UP）- pricing_kernel.round_half_up_div のベクトル版"""
+    quotient = (2 * np.abs(numerator) + denominator) // (2 * denominator)
+    return np.where(numerator >= 0, quotient, -quotient)
+
+
+def sweep_prices(costs: Sequence[int], margins: Sequence[int], min_margin: int) -> SweepResult:
+    """
+    原価と粗利率の全組み合わせについて推奨価格・粗利益を一括計算
+
+    Args:
+        costs: 原価（1/1000円単位の整数）
+        margins: 粗利率（1/10000単位の整数、1.0未満）
+        min_margin: 最低売価ガードの粗利率（1/10000単位の整数）
+
+    Returns:
+        SweepResult
+    """
+    cost_column = np.asarray(costs, dtype=np.int64).reshape(-1, 1)
+    margin_row = np.asarray(margins, dtype=np.int64).reshape(1, -1)
+    price_numerator = cost_column * (kernel.RATE_SCALE // kernel.COST_SCALE)
+
+    # 推奨価格 = 原価 / (1 - 粗利率)、粗利益 = 推奨価格 - 原価
+    prices = round_half_up_div(price_numerator, kernel.RATE_SCALE - margin_row)
+    profits = round_half_up_div(prices * kernel.COST_SCALE - cost_column, kernel.COST_SCALE)
+
+    # 最低売価ガード（pricing.simulate_price と同じ判定: 推奨価格 < 最低売価）
+    minimum_prices = round_half_up_div(price_numerator, kernel.RATE_SCALE - min_margin).reshape(-1)
+    meets_minimum = prices >= minimum_prices.reshape(-1, 1)
+    first_index = meets_minimum.argmax(axis=1)
+    guard_indexes = [
+        int(index) if found else None
+        for index, found in zip(first_index, meets_minimum.any(axis=1))
+    ]
+
+    return SweepResult(
+        prices=prices,
+        profits=profits,
+        minimum_prices=minimum_prices,
+        guard_indexes=guard_indexes,
+    )
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 
 # 価格パターンのプリセット（10%, 15%, 20%, 25%, 30%）
@@ -17,6 +17,22 @@ UNIT_COST_MAX = Decimal("999999999.999")
 QUANTITY_MIN = Decimal("0.0")
 QUANTITY_MAX = Decimal("999999999.999")
 
+# バッチ計算で1リクエストに指定できる最大件数
+BATCH_MAX_ITEMS = 5000
+
+# 粗利率スイープ（価格カーブ）の既定刻みと上限
+SWEEP_MARGIN_STEP = Decimal("0.001")
+SWEEP_MAX_COSTS = 1000
+SWEEP_MAX_POINTS = 1_000_000
+
+# モンテカルロシミュレーションのサンプル数
+MONTE_CARLO_DEFAULT_SAMPLES = 200_000
+MONTE_CARLO_MAX_SAMPLES = 5_000_000
+
+# 損益分岐点シナリオ（what-if）の計算点数の上限
+SCENARIO_MAX_POINTS = 2_000_000
+SCENARIO_MAX_AMOUNT = Decimal("999999999999.99")
+
 
 def round_jpy(value: Decimal) -> int:
     """金額の丸め（円、整数）- 四捨五入（ROUND_HALF_UP）"""
@@ -86,6 +102,268 @@ class PriceSimulationResponse(BaseModel):
         return round_rate(value)
 
 
+# シミュレーション保存・履歴関連のスキーマ
+class PriceSimulationSaveRequest(BaseModel):
+    """価格シミュレーション保存入力モデル"""
+
+    product_name: str = Field(..., min_length=1, max_length=200, description="商品名")
+    input_cost_per_kg: Decimal = Field(..., gt=Decimal("0"), le=UNIT_COST_MAX, description="原価（円/kg）")
+    target_margin_rate: Decimal = Field(
+        ..., ge=MARGIN_RATE_MIN, le=MARGIN_RATE_MAX, description="目標粗利率"
+    )
+    calculated_price_per_kg: Decimal = Field(..., gt=Decimal("0"), description="計算価格（円/kg）")
+    selected_price_per_kg: Optional[Decimal] = Field(None, gt=Decimal("0"), description="採用価格（円/kg）")
+    quantity_kg: Optional[Decimal] = Field(
+        None, ge=QUANTITY_MIN, le=QUANTITY_MAX, description="数量（kg）"
+    )
+    gross_profit_total: Optional[Decimal] = Field(None, description="総粗利益（円）")
+    notes: Optional[str] = Field(None, description="備考")
+
+
+class PriceSimulationSaveResponse(BaseModel):
+    """価格シミュレーション保存結果"""
+
+    id: str = Field(..., description="シミュレーションID")
+    message: str = Field(..., description="メッセージ")
+
+
+class SimulationHistoryResponse(BaseModel):
+    """シミュレーション履歴"""
+
+    id: str = Field(..., description="シミュレーションID")
+    product_name: str = Field(..., description="商品名")
+    simulation_at: str = Field(..., description="シミュレーション日時（ISO 8601）")
+    input_cost_per_kg: Decimal = Field(..., description="原価（円/kg）")
+    target_margin_rate: Decimal = Field(..., description="目標粗利率")
+    calculated_price_per_kg: Decimal = Field(..., description="計算価格（円/kg）")
+    selected_price_per_kg: Optional[Decimal] = Field(None, description="採用価格（円/kg）")
+    status: Optional[str] = Field(None, description="状態（draft/approved/rejected）")
+
+
+class ProductListResponse(BaseModel):
+    """商品リスト項目"""
+
+    id: str = Field(..., description="商品ID")
+    product_code: str = Field(..., description="商品コード")
+    product_name: str = Field(..., description="商品名")
+    unit_cost_per_kg: Decimal = Field(..., description="原価（円/kg）")
+    unit_price_per_kg: Optional[Decimal] = Field(None, description="販売単価（円/kg）")
+
+
+# バッチ価格シミュレーション関連のスキーマ
+class PriceSimulationBatchRequest(BaseModel):
+    """バッチ価格シミュレーション入力モデル
+
+    items は1件ずつ PriceSimulationRequest として検証するため、
+    不正な明細（オブジェクト以外を含む）があってもバッチ全体は失敗しません。
+    """
+
+    items: List[Any] = Field(
+        default_factory=list, description="PriceSimulationRequest形式の入力一覧"
+    )
+    product_ids: List[str] = Field(default_factory=list, description="商品ID一覧")
+    target_margin_rate: Optional[Decimal] = Field(
+        default=None,
+        ge=MARGIN_RATE_MIN,
+        le=MARGIN_RATE_MAX,
+        description="商品ID指定時の目標粗利率（未指定時は商品の目標粗利率を使用）",
+    )
+    quantity_kg: Optional[Decimal] = Field(
+        default=None, ge=QUANTITY_MIN, le=QUANTITY_MAX, description="商品ID指定時の数量（kg）"
+    )
+
+    @model_validator(mode="after")
+    def _check_size(self) -> "PriceSimulationBatchRequest":
+        """件数のバリデーション（1〜BATCH_MAX_ITEMS件）"""
+        total = len(self.items) + len(self.product_ids)
+        if total == 0:
+            raise ValueError("items または product_ids を1件以上指定してください")
+        if total > BATCH_MAX_ITEMS:
+            raise ValueError(f"一度に計算できるのは{BATCH_MAX_ITEMS}件までです")
+        return self
+
+
+class BatchItemError(BaseModel):
+    """バッチ明細のエラー情報"""
+
+    code: str = Field(..., description="エラーコード")
+    message: str = Field(..., description="エラーメッセージ")
+
+
+class PriceSimulationBatchItem(BaseModel):
+    """バッチ明細ごとの計算結果"""
+
+    index: int = Field(..., description="入力順の通し番号（items → product_ids の順）")
+    product_id: Optional[str] = Field(None, description="商品ID（商品ID指定時のみ）")
+    product_name: Optional[str] = Field(None, description="商品名")
+    result: Optional[PriceSimulationResponse] = Field(None, description="計算結果")
+    error: Optional[BatchItemError] = Field(None, description="エラー情報")
+
+
+class PriceSimulationBatchResponse(BaseModel):
+    """バッチ価格シミュレーション結果"""
+
+    total: int = Field(..., description="明細件数")
+    succeeded: int = Field(..., description="計算成功件数")
+    failed: int = Field(..., description="エラー件数")
+    results: List[PriceSimulationBatchItem] = Field(..., description="明細ごとの結果")
+
+
+# 粗利率スイープ（価格カーブ）関連のスキーマ
+class PriceSweepRequest(BaseModel):
+    """粗利率スイープ入力モデル"""
+
+    unit_costs_per_kg: List[Decimal] = Field(
+        ..., min_length=1, max_length=SWEEP_MAX_COSTS, description="原価一覧（円/kg、小数第3位まで）"
+    )
+    margin_from: Decimal = Field(
+        default=MARGIN_RATE_MIN, ge=MARGIN_RATE_MIN, le=MARGIN_RATE_MAX, description="粗利率の開始値"
+    )
+    margin_to: Decimal = Field(
+        default=MARGIN_RATE_MAX, ge=MARGIN_RATE_MIN, le=MARGIN_RATE_MAX, description="粗利率の終了値"
+    )
+    margin_step: Decimal = Field(
+        default=SWEEP_MARGIN_STEP, gt=Decimal("0"), le=MARGIN_RATE_MAX, description="粗利率の刻み"
+    )
+
+    @field_validator("unit_costs_per_kg")
+    @classmethod
+    def validate_costs(cls, value: List[Decimal]) -> List[Decimal]:
+        """原価のバリデーション（UNIT_COST_MIN〜UNIT_COST_MAX、小数第3位まで）"""
+        for cost in value:
+            if not UNIT_COST_MIN <= cost <= UNIT_COST_MAX:
+                raise ValueError(f"原価は{UNIT_COST_MIN}〜{UNIT_COST_MAX}の範囲で指定してください")
+            if cost != cost.quantize(Decimal("0.001")):
+                raise ValueError("原価は小数第3位までで指定してください")
+        return value
+
+    @model_validator(mode="after")
+    def _check_grid(self) -> "PriceSweepRequest":
+        """粗利率の範囲と刻みのバリデーション（小数第4位まで、点数上限）"""
+        for value in (self.margin_from, self.margin_to, self.margin_step):
+            if value != round_rate(value):
+                raise ValueError("粗利率は小数第4位までで指定してください")
+        if self.margin_from > self.margin_to:
+            raise ValueError("margin_from は margin_to 以下である必要があります")
+        points = int((self.margin_to - self.margin_from) / self.margin_step) + 1
+        if points * len(self.unit_costs_per_kg) > SWEEP_MAX_POINTS:
+            raise ValueError(f"計算点数は{SWEEP_MAX_POINTS}点以下である必要があります")
+        return self
+
+
+class PriceSweepSeries(BaseModel):
+    """原価ごとの価格カーブ（margin_rates と同じ並び）"""
+
+    unit_cost_per_kg: Decimal = Field(..., description="原価（円/kg）")
+    price_per_kg: List[int] = Field(..., description="販売価格（円/kg）")
+    profit_per_kg: List[int] = Field(..., description="粗利益（円/kg）")
+    minimum_price_per_kg: int = Field(..., description="最低許容価格（円/kg）")
+    guard_index: Optional[int] = Field(
+        None, description="最低売価を満たす最初の粗利率の位置（該当なしの場合はnull）"
+    )
+
+
+class PriceSweepResponse(BaseModel):
+    """粗利率スイープ結果（列指向）"""
+
+    margin_rates: List[Decimal] = Field(..., description="粗利率一覧")
+    minimum_margin_rate: Decimal = Field(..., description="最低売価ガードの粗利率")
+    series: List[PriceSweepSeries] = Field(..., description="原価ごとの価格カーブ")
+
+
+class RepricingResponse(BaseModel):
+    """商品価格の一括再計算結果"""
+
+    total: int = Field(..., description="有効な商品の件数")
+    changed: int = Field(..., description="推奨価格に更新した件数")
+    guarded: int = Field(..., description="最低売価に更新した件数")
+    unchanged: int = Field(..., description="価格が正しいため更新しなかった件数")
+    skipped: int = Field(..., description="目標粗利率が未設定などで対象外の件数")
+    dry_run: bool = Field(..., description="ドライラン（変更なし）かどうか")
+
+
+# モンテカルロ（原価変動）シミュレーション関連のスキーマ
+class CostDistribution(BaseModel):
+    """原価（円/kg）の確率分布
+
+    - normal: mean（平均）、std（標準偏差）
+    - triangular: min（最小）、mode（最頻値）、max（最大）
+    """
+
+    type: Literal["normal", "triangular"] = Field(..., description="分布の種類")
+    mean: Optional[Decimal] = Field(None, gt=Decimal("0"), le=UNIT_COST_MAX, description="平均（normal）")
+    std: Optional[Decimal] = Field(None, ge=Decimal("0"), description="標準偏差（normal）")
+    min: Optional[Decimal] = Field(None, ge=UNIT_COST_MIN, le=UNIT_COST_MAX, description="最小値（triangular）")
+    mode: Optional[Decimal] = Field(None, ge=UNIT_COST_MIN, le=UNIT_COST_MAX, description="最頻値（triangular）")
+    max: Optional[Decimal] = Field(None, ge=UNIT_COST_MIN, le=UNIT_COST_MAX, description="最大値（triangular）")
+
+    @model_validator(mode="after")
+    def _check_params(self) -> "CostDistribution":
+        """分布ごとの必須パラメータのバリデーション"""
+        if self.type == "normal":
+            if self.mean is None or self.std is None:
+                raise ValueError("正規分布には mean と std を指定してください")
+        else:
+            if self.min is None or self.mode is None or self.max is None:
+                raise ValueError("三角分布には min, mode, max を指定してください")
+            if not (self.min <= self.mode <= self.max) or self.min == self.max:
+                raise ValueError("三角分布は min ≦ mode ≦ max（min < max）で指定してください")
+        return self
+
+
+class MonteCarloRequest(BaseModel):
+    """モンテカルロシミュレーション入力モデル"""
+
+    cost_distribution: CostDistribution = Field(..., description="原価の確率分布")
+    target_margin_rate: Decimal = Field(
+        ..., ge=MARGIN_RATE_MIN, le=MARGIN_RATE_MAX, decimal_places=4, description="目標粗利率"
+    )
+    quantity_kg: Decimal = Field(
+        ..., gt=QUANTITY_MIN, le=QUANTITY_MAX, decimal_places=3, description="数量（kg）"
+    )
+    selected_price_per_kg: Optional[int] = Field(
+        None, gt=0, description="採用価格（円/kg、未指定時は基準原価での推奨価格）"
+    )
+    samples: int = Field(
+        default=MONTE_CARLO_DEFAULT_SAMPLES, ge=1000, le=MONTE_CARLO_MAX_SAMPLES, description="サンプル数"
+    )
+    seed: Optional[int] = Field(None, ge=0, description="乱数シード（指定すると結果を再現可能）")
+    percentiles: List[float] = Field(
+        default_factory=lambda: [5.0, 25.0, 50.0, 75.0, 95.0],
+        min_length=1,
+        max_length=99,
+        description="算出するパーセンタイル（0〜100）",
+    )
+
+    @field_validator("percentiles")
+    @classmethod
+    def validate_percentiles(cls, value: List[float]) -> List[float]:
+        """パーセンタイルのバリデーション（0〜100）"""
+        if any(not 0 <= percentile <= 100 for percentile in value):
+            raise ValueError("パーセンタイルは0〜100で指定してください")
+        return value
+
+
+class PercentileBand(BaseModel):
+    """パーセンタイル値"""
+
+    percentile: float = Field(..., description="パーセンタイル")
+    value: int = Field(..., description="値（円）")
+
+
+class MonteCarloResponse(BaseModel):
+    """モンテカルロシミュレーション結果"""
+
+    samples: int = Field(..., description="サンプル数")
+    seed: int = Field(..., description="使用した乱数シード")
+    reference_cost_per_kg: Decimal = Field(..., description="基準原価（円/kg、平均または最頻値）")
+    selected_price_per_kg: int = Field(..., description="総粗利益の計算に用いた採用価格（円/kg）")
+    price_per_kg: List[PercentileBand] = Field(..., description="推奨価格（円/kg）の分布")
+    gross_profit_total: List[PercentileBand] = Field(..., description="総粗利益（円）の分布")
+    below_min_probability: Decimal = Field(..., description="最低売価を下回る確率")
+    loss_probability: Decimal = Field(..., description="粗利益がマイナスになる確率")
+
+
 # 損益分岐点関連のスキーマ
 class TrendData(BaseModel):
     """月次トレンドデータ"""
@@ -105,7 +383,123 @@ class BreakEvenResponse(BaseModel):
     achievement_rate: Decimal = Field(..., description="達成率")
     delta_revenue: int = Field(..., description="損益分岐点との差額（円）")
     status: str = Field(..., description="状態（safe/warning/danger）")
-    trend: List[TrendData] = Field(..., description="月次トレンド")
+    trend: List[TrendData] = Field(default_factory=list, description="月次トレンド")
+
+
+class BreakEvenForecastResponse(BaseModel):
+    """月末着地見込み（日次売上のペースからの予測）レスポンス"""
+
+    year_month: str = Field(..., description="対象年月（YYYY-MM形式）")
+    as_of: str = Field(..., description="実績の集計日（YYYY-MM-DD形式）")
+    elapsed_days: int = Field(..., description="経過日数（集計日を含む）")
+    days_in_month: int = Field(..., description="月の日数")
+    actual_revenue: int = Field(..., description="集計日までの売上高（円）")
+    projected_revenue: int = Field(..., description="月末の売上高見込み（円）")
+    projected_revenue_lower: int = Field(..., description="売上高見込みの下限（円）")
+    projected_revenue_upper: int = Field(..., description="売上高見込みの上限（円）")
+    confidence_level: Decimal = Field(..., description="信頼水準")
+    fixed_costs: int = Field(..., description="固定費（円）")
+    gross_margin_rate: Decimal = Field(..., description="粗利率（集計日までの実績）")
+    break_even_revenue: int = Field(..., description="損益分岐点売上高（円）")
+    achievement_rate: Decimal = Field(..., description="達成率の見込み")
+    achievement_rate_lower: Decimal = Field(..., description="達成率の見込みの下限")
+    achievement_rate_upper: Decimal = Field(..., description="達成率の見込みの上限")
+    status: str = Field(..., description="見込みの状態（safe/warning/danger）")
+
+
+class ProductContribution(BaseModel):
+    """商品別の貢献利益"""
+
+    product_id: Optional[str] = Field(None, description="商品ID")
+    product_code: Optional[str] = Field(None, description="商品コード")
+    product_name: Optional[str] = Field(None, description="商品名")
+    quantity_kg: Decimal = Field(..., description="販売数量（kg）")
+    revenue: int = Field(..., description="売上高（円）")
+    variable_cost: int = Field(..., description="変動費（円）")
+    contribution_margin: int = Field(..., description="貢献利益（円）")
+    contribution_margin_rate: Decimal = Field(..., description="貢献利益率")
+    contribution_share: Decimal = Field(..., description="全商品の貢献利益に占める割合")
+    break_even_coverage: Decimal = Field(..., description="固定費に対するカバー率")
+
+
+class ProductContributionResponse(BaseModel):
+    """商品別の貢献利益レスポンス"""
+
+    year_month: str = Field(..., description="対象年月（YYYY-MM形式）")
+    fixed_costs: int = Field(..., description="固定費（円）")
+    total_contribution_margin: int = Field(..., description="全商品の貢献利益（円）")
+    break_even_coverage: Decimal = Field(..., description="全商品の固定費カバー率")
+    product_count: int = Field(..., description="売上のある商品数")
+    products: List[ProductContribution] = Field(..., description="商品別の貢献利益（並び替え・上位N件）")
+
+
+class ScenarioRange(BaseModel):
+    """シナリオの入力範囲（start〜stop を steps 点で等分、steps=1 の場合は start のみ）"""
+
+    start: Decimal = Field(..., ge=Decimal("0"), le=SCENARIO_MAX_AMOUNT, description="開始値")
+    stop: Optional[Decimal] = Field(None, ge=Decimal("0"), le=SCENARIO_MAX_AMOUNT, description="終了値")
+    steps: int = Field(default=1, ge=1, le=1000, description="点数")
+
+    @model_validator(mode="after")
+    def _check_stop(self) -> "ScenarioRange":
+        """終了値のバリデーション（steps が2以上の場合は必須）"""
+        if self.steps > 1 and self.stop is None:
+            raise ValueError("steps が2以上の場合は stop を指定してください")
+        return self
+
+
+class BreakEvenScenarioRequest(BaseModel):
+    """損益分岐点シナリオ（what-if）入力モデル
+
+    固定費は fixed_cost_items（人件費・家賃・その他などの内訳ごとの範囲）の合計、
+    または fixed_costs（合計の範囲）で指定します。未指定の項目は基準月の値を使用します。
+    """
+
+    year_month: Optional[str] = Field(None, description="基準年月（YYYY-MM形式、未指定時は当月）")
+    revenue: Optional[Decimal] = Field(
+        None, ge=Decimal("0"), le=SCENARIO_MAX_AMOUNT, description="売上高（円、未指定時は基準月の実績）"
+    )
+    fixed_costs: Optional[ScenarioRange] = Field(None, description="固定費合計の範囲（円）")
+    fixed_cost_items: Dict[str, ScenarioRange] = Field(
+        default_factory=dict, description="固定費の内訳ごとの範囲（円）"
+    )
+    gross_margin_rate: Optional[ScenarioRange] = Field(None, description="粗利率の範囲")
+
+    @model_validator(mode="after")
+    def _check_grid(self) -> "BreakEvenScenarioRequest":
+        """入力の組み合わせと計算点数のバリデーション"""
+        if self.fixed_costs is not None and self.fixed_cost_items:
+            raise ValueError("fixed_costs と fixed_cost_items はどちらか一方を指定してください")
+        if self.gross_margin_rate is not None:
+            for value in (self.gross_margin_rate.start, self.gross_margin_rate.stop):
+                if value is not None and value > Decimal("1"):
+                    raise ValueError("粗利率は0〜1の範囲で指定してください")
+        points = 1
+        for axis in [self.fixed_costs, self.gross_margin_rate, *self.fixed_cost_items.values()]:
+            if axis is not None:
+                points *= axis.steps
+        if points > SCENARIO_MAX_POINTS:
+            raise ValueError(f"計算点数は{SCENARIO_MAX_POINTS}点以下である必要があります")
+        return self
+
+
+class ScenarioAxis(BaseModel):
+    """シナリオの軸（行列の次元）"""
+
+    name: str = Field(..., description="軸名（固定費の内訳名、fixed_costs、gross_margin_rate）")
+    values: List[Decimal] = Field(..., description="軸の値")
+
+
+class BreakEvenScenarioResponse(BaseModel):
+    """損益分岐点シナリオ結果（axes の順の多次元行列を行優先で平坦化）"""
+
+    year_month: str = Field(..., description="基準年月（YYYY-MM形式）")
+    revenue: int = Field(..., description="売上高（円）")
+    axes: List[ScenarioAxis] = Field(..., description="行列の軸")
+    shape: List[int] = Field(..., description="行列の形状")
+    break_even_revenue: List[int] = Field(..., description="損益分岐点売上高（円）")
+    achievement_rate: List[Decimal] = Field(..., description="達成率")
+    status_counts: Dict[str, int] = Field(..., description="状態ごとの件数（safe/warning/danger）")
 
 
 # インポート関連のスキーマ
@@ -130,3 +524,34 @@ class ImportResponse(BaseModel):
     skipped: int = Field(..., description="スキップ件数")
     errors: List[ImportError] = Field(default_factory=list, description="エラー一覧")
     warnings: List[ImportWarning] = Field(default_factory=list, description="警告一覧")
+
+
+# ジョブ状態のレスポンスに含めるエラーの最大件数
+IMPORT_JOB_MAX_ERRORS = 100
+
+
+class ImportJobResponse(BaseModel):
+    """インポートジョブの状態レスポンス"""
+
+    job_id: str = Field(..., description="ジョブID（インポートログID）")
+    import_type: str = Field(..., description="インポートタイプ")
+    file_name: Optional[str] = Field(None, description="ファイル名")
+    status: str = Field(..., description="状態（queued/running/completed/failed）")
+    processed_rows: int = Field(..., description="処理済みの行数")
+    total_rows: Optional[int] = Field(None, description="全行数（完了後）")
+    imported_rows: Optional[int] = Field(None, description="インポート成功件数（完了後）")
+    skipped_rows: Optional[int] = Field(None, description="スキップ件数（完了後）")
+    unchanged_rows: int = Field(default=0, description="前回から変更がなくスキップした件数")
+    deleted_rows: int = Field(default=0, description="前回のファイルから消えたため削除した件数")
+    rows_per_second: Optional[Decimal] = Field(None, description="処理速度（行/秒）")
+    started_at: Optional[str] = Field(None, description="開始日時")
+    finished_at: Optional[str] = Field(None, description="終了日時")
+    error_message: Optional[str] = Field(None, description="失敗時のエラーメッセージ")
+    error_count: int = Field(default=0, description="行エラーの件数")
+    errors: List[Dict[str, Any]] = Field(
+        default_factory=list, description=f"行エラー（先頭{IMPORT_JOB_MAX_ERRORS}件）"
+    )
+    warning_count: int = Field(default=0, description="警告の件数")
+    warnings: List[Dict[str, Any]] = Field(
+        default_factory=list, description=f"警告（先頭{IMPORT_JOB_MAX_ERRORS}件）"
+    )
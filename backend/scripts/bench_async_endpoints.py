@@ -0,0 +1,208 @@
+"""読み取りAPIの同期・非同期エンジンの負荷テスト
+
+商品一覧（GET /products/list と同じクエリ）を、同期セッション（スレッドプールで実行）と
+非同期セッション（イベントループ上で待機）でそれぞれ提供し、同時接続数ごとの
+スループット（req/s）とレイテンシ（p50・p95）を計測します。
+
+リクエストは httpx の ASGITransport でプロセス内から送るため、サーバーの起動は不要です。
+同期エンドポイントは FastAPI（anyio）のスレッドプール（既定40スレッド）で実行されるため、
+DBの待ち時間が長いほど同時実行数がスレッド数で頭打ちになります。
+
+--database-url を省略した場合は一時ディレクトリの SQLite ファイルを使用し、
+--latency-ms でクエリごとの待ち時間（ネットワーク往復の代わり）を再現します。
+PostgreSQL を指定した場合は実際の待ち時間で計測します（データは作成しません）。
+
+使い方（backend ディレクトリで実行）:
+    python -m scripts.bench_async_endpoints --concurrency 10,100,200 --latency-ms 20
+    python -m scripts.bench_async_endpoints --database-url postgresql://... --concurrency 50,200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+MODES = ("sync", "async")
+
+
+def _seed(database_url: str, products: int) -> None:
+    """SQLite の計測用データを作成（products テーブルのみ）"""
+    from decimal import Decimal
+
+    from sqlalchemy import create_engine, insert
+
+    from app.models import Product
+
+    engine = create_engine(database_url)
+    Product.__table__.create(engine)
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Product),
+            [
+                {
+                    "product_code": f"BENCH-{i:06d}",
+                    "product_name": f"ベンチマーク商品{i}",
+                    "unit_cost_per_kg": Decimal(100 + i % 500),
+                    "unit_price_per_kg": Decimal(150 + i % 500),
+                }
+                for i in range(products)
+            ],
+        )
+    engine.dispose()
+
+
+def _add_latency(engine, latency: float, is_async: bool) -> None:
+    """SQLite の各SQL実行前に待ち時間を入れる（ドライバのスレッドで待機）"""
+    from sqlalchemy import event
+
+    def _wait(statement: str) -> None:
+        time.sleep(latency)
+
+    @event.listens_for(engine.sync_engine if is_async else engine, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        if is_async:
+            dbapi_connection.run_async(lambda connection: connection.set_trace_callback(_wait))
+        else:
+            dbapi_connection.set_trace_callback(_wait)
+
+
+def _build_app(database_url: str, pool_size: int, latency: float):
+    """同期・非同期の商品一覧エンドポイントを持つアプリを作成"""
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import create_engine
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.orm import Session, sessionmaker
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    from app.api.deps import get_async_db
+    from app.api.endpoints.products import get_product_list
+    from app.core.database import async_database_url
+    from app.models import Product
+    from app.schemas import ProductListResponse
+
+    is_sqlite = database_url.startswith("sqlite")
+    # 接続プールが上限にならないよう、最大の同時接続数分の接続を許可
+    options = {"pool_size": pool_size, "max_overflow": 0}
+    if is_sqlite:
+        options["connect_args"] = {"check_same_thread": False}
+    sync_engine = create_engine(database_url, **options)
+    # aiosqlite は既定で NullPool のため、同期側と同じ QueuePool を指定
+    async_options = dict(options, poolclass=AsyncAdaptedQueuePool) if is_sqlite else options
+    async_engine = create_async_engine(async_database_url(database_url), **async_options)
+    if is_sqlite and latency > 0:
+        _add_latency(sync_engine, latency, is_async=False)
+        _add_latency(async_engine, latency, is_async=True)
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_sync_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_bench_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync/products")
+    def sync_products(limit: int = 100, offset: int = 0, db: Session = Depends(get_sync_db)):
+        # 変更前の同期版 GET /products/list と同じ処理
+        products = (
+            db.query(Product)
+            .filter(Product.is_active == True)
+            .order_by(Product.product_name)
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+        return [
+            ProductListResponse(
+                id=str(product.id),
+                product_code=product.product_code,
+                product_name=product.product_name,
+                unit_cost_per_kg=product.unit_cost_per_kg,
+                unit_price_per_kg=product.unit_price_per_kg,
+            )
+            for product in products
+        ]
+
+    app.add_api_route("/async/products", get_product_list, methods=["GET"])
+    app.dependency_overrides[get_async_db] = get_bench_async_db
+    return app, sync_engine, async_engine
+
+
+async def _run(app, mode: str, concurrency: int, requests: int, limit: int) -> Dict[str, float]:
+    """同時接続数 concurrency で requests 件のリクエストを送信"""
+    import httpx
+
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def _one() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(f"/{mode}/products", params={"limit": limit})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        # ウォームアップ（接続プールの作成）
+        await asyncio.gather(*(_one() for _ in range(min(concurrency, requests))))
+        latencies.clear()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="読み取りAPIの同期・非同期エンジンのスループットを計測します")
+    parser.add_argument("--database-url", default=None, help="接続先（省略時は一時SQLiteファイル）")
+    parser.add_argument("--concurrency", default="10,100,200", help="同時接続数（カンマ区切り）")
+    parser.add_argument("--requests", type=int, default=1000, help="同時接続数ごとのリクエスト数")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="SQLiteでのクエリごとの待ち時間（ミリ秒）")
+    parser.add_argument("--products", type=int, default=500, help="SQLiteに作成する商品数")
+    parser.add_argument("--limit", type=int, default=50, help="1リクエストで取得する商品数")
+    args = parser.parse_args()
+
+    levels = [int(value) for value in args.concurrency.split(",")]
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url: Optional[str] = args.database_url
+        if database_url is None:
+            database_url = f"sqlite:///{os.path.join(workdir, 'bench.sqlite3')}"
+            _seed(database_url, args.products)
+
+        app, sync_engine, async_engine = _build_app(database_url, max(levels), args.latency_ms / 1000)
+        print(f"{'concurrency':>11} {'mode':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        for concurrency in levels:
+            for mode in MODES:
+                result = asyncio.run(_run(app, mode, concurrency, args.requests, args.limit))
+                print(
+                    f"{concurrency:>11} {mode:>6} {result['rps']:>9.1f} "
+                    f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f}"
+                )
+                # イベントループごとに非同期エンジンの接続を作り直す
+                asyncio.run(async_engine.dispose())
+        sync_engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
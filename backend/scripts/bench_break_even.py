@@ -0,0 +1,132 @@
+"""損益分岐点クエリのベンチマーク（PostgreSQL）
+
+合成した sales_data（既定 300万行、24か月分）に対して、
+単月集計（calculate_break_even）と月次トレンド（calculate_trend）の
+応答時間を計測し、要件定義書の目標（200ms）と比較します。
+
+データは専用スキーマ（既定: bench_break_even）に作成するため、
+既存のテーブルには影響しません。
+
+使い方（backend ディレクトリで実行、DATABASE_URL は PostgreSQL）:
+    python -m scripts.bench_break_even --rows 3000000 --runs 20
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.break_even import add_months, calculate_break_even, calculate_trend
+from app.core.config import settings
+from app.core.database import Base
+from app.models import FixedCost, Product, SalesData
+
+TARGET_MS = 200
+
+
+def _setup(engine, schema: str, rows: int, months: int, last_month: date) -> None:
+    first_month = add_months(last_month, -(months - 1))
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+        conn.execute(text(f"SET search_path TO {schema}"))
+        Base.metadata.create_all(
+            conn, tables=[Product.__table__, SalesData.__table__, FixedCost.__table__]
+        )
+        SalesData.ensure_partitions(conn, first_month, last_month)
+        conn.execute(
+            text(
+                """
+                INSERT INTO products (id, product_code, product_name, unit_cost_per_kg, is_active)
+                SELECT gen_random_uuid(), 'BENCH-' || i, '商品' || i, 100 + i % 500, true
+                FROM generate_series(1, 2000) AS i
+                """
+            )
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO sales_data (id, product_id, sale_date, quantity_kg, unit_price_per_kg, unit_cost_per_kg)
+                SELECT gen_random_uuid(), p.id,
+                       :first_month + (random() * (:last_day - :first_month))::int,
+                       round((1 + random() * 500)::numeric, 3),
+                       round((130 + random() * 50)::numeric, 3),
+                       round((100 + random() * 20)::numeric, 3)
+                FROM generate_series(1, :rows) AS g(i)
+                JOIN (SELECT id, row_number() OVER () - 1 AS n FROM products) AS p ON p.n = g.i % 2000
+                """
+            ),
+            {
+                "rows": rows,
+                "first_month": first_month,
+                "last_day": add_months(last_month, 1),
+            },
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO fixed_costs (id, year_month, amount, category)
+                SELECT gen_random_uuid(), m::date, 4000000 + random() * 200000, '固定費'
+                FROM generate_series(:first_month, :last_month, interval '1 month') AS m
+                """
+            ),
+            {"first_month": first_month, "last_month": last_month},
+        )
+        conn.execute(text("ANALYZE"))
+
+
+def _measure(label: str, runs: int, func) -> None:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    verdict = "OK" if p95 <= TARGET_MS else "NG"
+    print(
+        f"{label}: p50={statistics.median(timings):.1f}ms p95={p95:.1f}ms "
+        f"max={timings[-1]:.1f}ms [{verdict} / 目標 {TARGET_MS}ms]"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000, help="合成する売上データの行数")
+    parser.add_argument("--months", type=int, default=24, help="売上データの月数")
+    parser.add_argument("--runs", type=int, default=20, help="計測回数")
+    parser.add_argument("--schema", default="bench_break_even", help="ベンチマーク用スキーマ")
+    parser.add_argument("--skip-setup", action="store_true", help="既存のベンチマークデータを再利用")
+    parser.add_argument("--keep", action="store_true", help="終了後もベンチマーク用スキーマを残す")
+    args = parser.parse_args()
+
+    engine = create_engine(
+        settings.DATABASE_URL,
+        connect_args={"options": f"-csearch_path={args.schema}"},
+    )
+    last_month = date.today().replace(day=1)
+
+    if not args.skip_setup:
+        started = time.perf_counter()
+        _setup(engine, args.schema, args.rows, args.months, last_month)
+        print(f"setup: {args.rows}行 ({time.perf_counter() - started:.1f}s)")
+
+    try:
+        with Session(engine) as db:
+            _measure("calculate_break_even (単月)", args.runs, lambda: calculate_break_even(db, last_month))
+            _measure("calculate_trend (12か月)", args.runs, lambda: calculate_trend(db, last_month, 12))
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {args.schema} CASCADE"))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
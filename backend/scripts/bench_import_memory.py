@@ -0,0 +1,113 @@
+"""商品Excelインポートのメモリベンチマーク
+
+従来の読み込み（file.read() + pd.read_excel(BytesIO)）とストリーミング読み込み
+（一時ファイル + openpyxl read-only + チャンク処理）について、行数ごとの
+ピークメモリ（最大RSS）と処理時間を計測します。
+
+各計測は別プロセスで実行し、書き込み先は一時ディレクトリの SQLite ファイル
+（products テーブルのみ）を使うため、既存のデータベースには影響しません。
+
+使い方（backend ディレクトリで実行）:
+    python -m scripts.bench_import_memory --rows 10000,100000,500000
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("memory", "streaming")
+
+
+def _write_workbook(path: str, rows: int) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(["商品コード", "商品名", "原価", "単価"])
+    for i in range(rows):
+        sheet.append([f"BENCH-{i:07d}", f"ベンチマーク商品{i}", 100 + i % 500, 150 + i % 500])
+    workbook.save(path)
+
+
+def _max_rss_mb() -> float:
+    # Linux の ru_maxrss は KB 単位
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker(mode: str, path: str, database: str) -> None:
+    """1回分のインポートを実行し、結果をJSONで出力（子プロセス）"""
+    import pandas as pd
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.importers.excel import iter_excel_chunks, spooled_upload
+    from app.importers.products import import_products
+    from app.models import Product
+
+    engine = create_engine(f"sqlite:///{database}")
+    Product.__table__.create(engine)
+    baseline = _max_rss_mb()
+
+    started = time.perf_counter()
+    imported = 0
+    with Session(engine) as db, open(path, "rb") as upload:
+        if mode == "memory":
+            contents = upload.read()
+            df = pd.read_excel(io.BytesIO(contents))
+            imported = import_products(db, df).imported_rows
+        else:
+            with spooled_upload(upload) as spooled:
+                for chunk in iter_excel_chunks(spooled):
+                    imported += import_products(db, chunk).imported_rows
+        db.commit()
+    elapsed = time.perf_counter() - started
+
+    print(json.dumps({
+        "imported": imported,
+        "seconds": round(elapsed, 2),
+        "baseline_mb": round(baseline, 1),
+        "peak_mb": round(_max_rss_mb(), 1),
+    }))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="商品Excelインポートのメモリ使用量を計測します")
+    parser.add_argument("--rows", default="10000,100000,500000", help="行数（カンマ区切り）")
+    parser.add_argument("--worker", nargs=3, metavar=("MODE", "PATH", "DATABASE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(*args.worker)
+        return 0
+
+    print(f"{'rows':>8} {'mode':>10} {'file MB':>8} {'peak MB':>8} {'delta MB':>9} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in (int(value) for value in args.rows.split(",")):
+            path = os.path.join(workdir, f"products_{rows}.xlsx")
+            _write_workbook(path, rows)
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            for mode in MODES:
+                database = os.path.join(workdir, f"{mode}_{rows}.sqlite3")
+                completed = subprocess.run(
+                    [sys.executable, "-m", "scripts.bench_import_memory", "--worker", mode, path, database],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                print(
+                    f"{rows:>8} {mode:>10} {size_mb:>8.1f} {result['peak_mb']:>8.1f} "
+                    f"{result['peak_mb'] - result['baseline_mb']:>9.1f} {result['seconds']:>8.2f}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
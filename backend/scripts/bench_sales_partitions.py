@@ -0,0 +1,202 @@
+"""sales_data の月次パーティションのベンチマーク（PostgreSQL）
+
+合成した5年分（既定 60か月、300万行）の sales_data を、月次パーティション化した
+テーブルとパーティションなしのテーブル（同じインデックス）にそれぞれ作成し、
+break_even.py の単月の集計（calculate_break_even と calculate_product_contributions）が
+発行する sales_data のクエリを EXPLAIN (ANALYZE, BUFFERS) で比較します。
+
+クエリごとに、実行計画で読み込んだテーブル（パーティション）、読み込んだバッファ数、
+実行時間を表示します。パーティション化したテーブルでは対象月のパーティションのみを
+読み込むことを確認できます。
+
+データは専用スキーマ（既定: bench_partitions_part / bench_partitions_flat）に作成するため、
+既存のテーブルには影響しません。
+
+使い方（backend ディレクトリで実行、DATABASE_URL は PostgreSQL）:
+    python -m scripts.bench_sales_partitions --rows 3000000 --months 60
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import date
+from typing import Any, Dict, List, Set, Tuple
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+from app.break_even import add_months, calculate_break_even, calculate_product_contributions
+from app.core.config import settings
+from app.core.database import Base
+from app.models import FixedCost, MonthlyRevenue, Product, SalesData
+
+LAYOUTS = ("part", "flat")
+
+
+def _engine(schema: str):
+    return create_engine(settings.DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+
+
+def _create_tables(conn, partitioned: bool, source_schema: str) -> None:
+    tables = [Product.__table__, FixedCost.__table__, MonthlyRevenue.__table__]
+    if partitioned:
+        tables.append(SalesData.__table__)
+    Base.metadata.create_all(conn, tables=tables)
+    if partitioned:
+        return
+    # パーティションなしの sales_data（列・制約・インデックスは同じ）
+    conn.execute(
+        text(f"CREATE TABLE sales_data (LIKE {source_schema}.sales_data INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    )
+    conn.execute(text("ALTER TABLE sales_data ADD PRIMARY KEY (id, sale_date)"))
+    for index in SalesData.__table__.indexes:
+        index.create(conn)
+
+
+def _setup(schemas: Dict[str, str], rows: int, months: int, last_month: date) -> None:
+    first_month = add_months(last_month, -(months - 1))
+    for layout in LAYOUTS:
+        schema = schemas[layout]
+        with _engine(schema).begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+            conn.execute(text(f"SET search_path TO {schema}"))
+            _create_tables(conn, layout == "part", schemas["part"])
+            if layout == "part":
+                SalesData.ensure_partitions(conn, first_month, last_month)
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO products (id, product_code, product_name, unit_cost_per_kg, is_active)
+                        SELECT gen_random_uuid(), 'BENCH-' || i, '商品' || i, 100 + i % 500, true
+                        FROM generate_series(1, 2000) AS i
+                        """
+                    )
+                )
+                # 実運用と同じく、売上日の順に登録する
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO sales_data (id, product_id, sale_date, quantity_kg, unit_price_per_kg, unit_cost_per_kg)
+                        SELECT gen_random_uuid(), p.id,
+                               :first_month + (g.i::bigint * (:last_day - :first_month) / :rows)::int,
+                               round((1 + random() * 500)::numeric, 3),
+                               round((130 + random() * 50)::numeric, 3),
+                               round((100 + random() * 20)::numeric, 3)
+                        FROM generate_series(0, :rows - 1) AS g(i)
+                        JOIN (SELECT id, row_number() OVER () - 1 AS n FROM products) AS p ON p.n = g.i % 2000
+                        """
+                    ),
+                    {"rows": rows, "first_month": first_month, "last_day": add_months(last_month, 1)},
+                )
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO fixed_costs (id, year_month, amount, category)
+                        SELECT gen_random_uuid(), m::date, 4000000 + random() * 200000, '固定費'
+                        FROM generate_series(:first_month, :last_month, interval '1 month') AS m
+                        """
+                    ),
+                    {"first_month": first_month, "last_month": last_month},
+                )
+            else:
+                source = schemas["part"]
+                for table in ("products", "fixed_costs", "sales_data"):
+                    conn.execute(text(f"INSERT INTO {table} SELECT * FROM {source}.{table}"))
+        with _engine(schema).connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM (ANALYZE)"))
+
+
+def _capture(engine, func) -> List[Tuple[str, Any]]:
+    """func が発行した sales_data のクエリ（SQLとパラメータ）"""
+    statements: List[Tuple[str, Any]] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if "sales_data" in statement:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    return statements
+
+
+def _relations(plan: Dict[str, Any], found: Set[str]) -> Set[str]:
+    if "Relation Name" in plan:
+        found.add(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        _relations(child, found)
+    return found
+
+
+def _explain(engine, statement: str, parameters: Any) -> Dict[str, Any]:
+    with engine.connect() as conn:
+        result = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+        explained = result.scalar()[0]
+    plan = explained["Plan"]
+    return {
+        "relations": sorted(name for name in _relations(plan, set()) if name.startswith("sales_data")),
+        "buffers": plan.get("Shared Hit Blocks", 0) + plan.get("Shared Read Blocks", 0),
+        "ms": explained["Execution Time"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=3_000_000, help="合成する売上データの行数")
+    parser.add_argument("--months", type=int, default=60, help="売上データの月数（既定: 5年）")
+    parser.add_argument("--runs", type=int, default=10, help="クエリごとの計測回数")
+    parser.add_argument("--schema-prefix", default="bench_partitions", help="ベンチマーク用スキーマの接頭辞")
+    parser.add_argument("--skip-setup", action="store_true", help="既存のベンチマークデータを再利用")
+    parser.add_argument("--keep", action="store_true", help="終了後もベンチマーク用スキーマを残す")
+    args = parser.parse_args()
+
+    schemas = {layout: f"{args.schema_prefix}_{layout}" for layout in LAYOUTS}
+    last_month = date.today().replace(day=1)
+    # 最新月ではなく、期間の中ほどの月を対象にする
+    target_month = add_months(last_month, -(args.months // 2))
+
+    if not args.skip_setup:
+        started = time.perf_counter()
+        _setup(schemas, args.rows, args.months, last_month)
+        print(f"setup: {args.rows}行 / {args.months}か月 ({time.perf_counter() - started:.1f}s)")
+
+    queries = {
+        "calculate_break_even": lambda db: calculate_break_even(db, target_month),
+        "calculate_product_contributions": lambda db: calculate_product_contributions(db, target_month),
+    }
+    print(f"対象月: {target_month.strftime('%Y-%m')}")
+    print(f"{'query':<34} {'layout':<5} {'p50 ms':>8} {'buffers':>8}  scanned")
+    try:
+        for name, query in queries.items():
+            for layout in LAYOUTS:
+                engine = _engine(schemas[layout])
+                with Session(engine) as db:
+                    statements = _capture(engine, lambda: query(db))
+                    timings = []
+                    for _ in range(args.runs):
+                        started = time.perf_counter()
+                        query(db)
+                        timings.append((time.perf_counter() - started) * 1000)
+                for statement, parameters in statements:
+                    plan = _explain(engine, statement, parameters)
+                    print(
+                        f"{name:<34} {layout:<5} {statistics.median(timings):>8.1f} {plan['buffers']:>8}  "
+                        f"{', '.join(plan['relations'])}"
+                    )
+                engine.dispose()
+    finally:
+        if not args.keep:
+            with _engine("public").begin() as conn:
+                for schema in schemas.values():
+                    conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
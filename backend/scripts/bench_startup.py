@@ -0,0 +1,131 @@
+"""APIの起動時間のベンチマーク（予算超過で終了コード1）
+
+新しいプロセスで次の2つを計測し、中央値を予算と比較します。
+
+- import: app.main の import にかかる時間（pandas・openpyxl を読み込んでいないことも確認）
+- health: uvicorn のプロセス起動から GET /health が 200 を返すまでの時間
+
+オートスケールで追加したワーカーがすぐにリクエストを受けられるよう、
+CI で実行して起動時間の悪化（重いモジュールの import やDBアクセスの追加）を検出します。
+既定では DATABASE_URL=sqlite://（インメモリ）で起動するため、データベースサーバーは不要です。
+
+使い方（backend ディレクトリで実行）:
+    python -m scripts.bench_startup --runs 5
+    python -m scripts.bench_startup --import-budget-ms 2500 --health-budget-ms 3000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# 起動時に読み込まない（インポート処理の初回実行時に読み込む）モジュール
+LAZY_MODULES = ("pandas", "openpyxl")
+
+_IMPORT_PROBE = f"""
+import json, sys, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def _environment(database_url: str) -> Dict[str, str]:
+    env = dict(os.environ, DATABASE_URL=database_url, DEBUG="false")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+    return env
+
+
+def _measure_import(env: Dict[str, str]) -> Dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _measure_health(env: Dict[str, str], timeout: float) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn が終了しました（終了コード {server.returncode}）")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise RuntimeError(f"{timeout:.0f}秒以内に /health が応答しませんでした")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def _verdict(value: float, budget: float) -> str:
+    return "OK" if value <= budget else "NG"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="計測回数")
+    parser.add_argument("--database-url", default="sqlite://", help="起動時の DATABASE_URL（既定: インメモリSQLite）")
+    parser.add_argument("--import-budget-ms", type=float, default=2500.0, help="app.main の import 時間の予算（中央値）")
+    parser.add_argument("--health-budget-ms", type=float, default=3000.0, help="最初の /health 応答までの予算（中央値）")
+    parser.add_argument("--timeout", type=float, default=60.0, help="/health の応答を待つ秒数")
+    args = parser.parse_args()
+
+    env = _environment(args.database_url)
+    imports: List[float] = []
+    healths: List[float] = []
+    loaded = set()
+    for _ in range(args.runs):
+        probe = _measure_import(env)
+        imports.append(probe["ms"])
+        loaded.update(probe["loaded"])
+        healths.append(_measure_health(env, args.timeout))
+
+    import_ms = statistics.median(imports)
+    health_ms = statistics.median(healths)
+    print(f"{'metric':<8} {'p50 ms':>8} {'max ms':>8} {'budget':>8}")
+    print(f"{'import':<8} {import_ms:>8.0f} {max(imports):>8.0f} {args.import_budget_ms:>8.0f}  {_verdict(import_ms, args.import_budget_ms)}")
+    print(f"{'health':<8} {health_ms:>8.0f} {max(healths):>8.0f} {args.health_budget_ms:>8.0f}  {_verdict(health_ms, args.health_budget_ms)}")
+
+    failed = import_ms > args.import_budget_ms or health_ms > args.health_budget_ms
+    if loaded:
+        print(f"NG: 起動時に {', '.join(sorted(loaded))} が読み込まれています")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
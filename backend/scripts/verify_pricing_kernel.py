@@ -0,0 +1,148 @@
+"""固定小数点カーネルとDecimal実装の同値性チェック
+
+app.pricing_kernel の結果が、従来の Decimal による計算
+（app.pricing.simulate_price_decimal）とビット単位で一致することを確認します。
+
+- 網羅チェック: 粗利率 MARGIN_RATE_MIN〜MARGIN_RATE_MAX の全値（0.0001刻み）×
+  指定範囲の全原価（0.001円刻み）について推奨価格・粗利益・粗利率を比較
+- ランダムチェック: UNIT_COST_MIN〜UNIT_COST_MAX の対数一様分布の原価と
+  四捨五入境界ちょうどの原価について、レスポンス全体（JSON）を比較
+
+使い方（backend ディレクトリで実行）:
+    python -m scripts.verify_pricing_kernel
+    python -m scripts.verify_pricing_kernel --cost-to 5.000 --samples 1000000 --seed 42
+"""
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import time
+from decimal import Decimal
+
+from app import pricing_kernel as kernel
+from app.pricing import simulate_price, simulate_price_decimal
+from app.schemas import (
+    MARGIN_RATE_MAX,
+    MARGIN_RATE_MIN,
+    QUANTITY_MAX,
+    UNIT_COST_MAX,
+    UNIT_COST_MIN,
+    round_jpy,
+    round_rate,
+)
+
+
+def _margin_range() -> range:
+    low = kernel.to_scaled(MARGIN_RATE_MIN, kernel.RATE_PLACES)
+    high = kernel.to_scaled(MARGIN_RATE_MAX, kernel.RATE_PLACES)
+    return range(low, high + 1)
+
+
+def run_exhaustive(cost_from: Decimal, cost_to: Decimal) -> int:
+    """指定範囲の全原価 × 全粗利率でカーネルの各関数を比較し、不一致件数を返す"""
+    mismatches = 0
+    margins = [(m, Decimal(m).scaleb(-kernel.RATE_PLACES)) for m in _margin_range()]
+    cost_low = kernel.to_scaled(cost_from, kernel.COST_PLACES)
+    cost_high = kernel.to_scaled(cost_to, kernel.COST_PLACES)
+
+    for cost in range(cost_low, cost_high + 1):
+        unit_cost = Decimal(cost).scaleb(-kernel.COST_PLACES)
+        for margin, margin_decimal in margins:
+            expected_price = round_jpy(unit_cost / (Decimal("1") - margin_decimal))
+            price = kernel.recommended_price_jpy(cost, margin)
+            if price != expected_price:
+                mismatches += 1
+                print(f"price mismatch: cost={unit_cost} margin={margin_decimal} {price} != {expected_price}")
+                continue
+
+            profit_decimal = Decimal(price) - unit_cost
+            if kernel.profit_jpy(price, cost) != round_jpy(profit_decimal):
+                mismatches += 1
+                print(f"profit mismatch: cost={unit_cost} margin={margin_decimal}")
+            if price and str(kernel.margin_rate(price, cost)) != str(round_rate(profit_decimal / Decimal(price))):
+                mismatches += 1
+                print(f"margin rate mismatch: cost={unit_cost} margin={margin_decimal}")
+
+    return mismatches
+
+
+def _random_cost(rng: random.Random) -> Decimal:
+    # 対数一様分布（小さい原価と大きい原価を均等に検査する）
+    low = math.log10(float(UNIT_COST_MIN))
+    high = math.log10(float(UNIT_COST_MAX))
+    value = Decimal(str(10 ** rng.uniform(low, high))).quantize(Decimal("0.001"))
+    return min(max(value, UNIT_COST_MIN), UNIT_COST_MAX)
+
+
+def _boundary_cost(rng: random.Random, margin: int) -> Decimal | None:
+    # 推奨価格がちょうど X.5 円になる原価: cost * 10 / (10000 - margin) = k + 0.5
+    denominator = kernel.RATE_SCALE - margin
+    k = rng.randint(0, 10 ** rng.randint(1, 9))
+    numerator = (2 * k + 1) * denominator
+    if numerator % 20:
+        return None
+    cost = Decimal(numerator // 20).scaleb(-kernel.COST_PLACES)
+    if not UNIT_COST_MIN <= cost <= UNIT_COST_MAX:
+        return None
+    return cost
+
+
+def run_random(samples: int, seed: int) -> int:
+    """ランダムな入力でレスポンス全体を比較し、不一致件数を返す"""
+    rng = random.Random(seed)
+    margins = list(_margin_range())
+    mismatches = 0
+
+    for i in range(samples):
+        margin = rng.choice(margins)
+        target_margin_rate = Decimal(margin).scaleb(-kernel.RATE_PLACES)
+        unit_cost = _boundary_cost(rng, margin) if i % 2 else None
+        if unit_cost is None:
+            unit_cost = _random_cost(rng)
+        quantity_kg = (
+            Decimal(rng.randint(0, kernel.to_scaled(QUANTITY_MAX, kernel.QUANTITY_PLACES))).scaleb(
+                -kernel.QUANTITY_PLACES
+            )
+            if rng.random() < 0.5
+            else None
+        )
+
+        try:
+            expected = simulate_price_decimal(unit_cost, target_margin_rate, quantity_kg).model_dump_json()
+        except ArithmeticError:
+            expected = "ArithmeticError"
+        try:
+            actual = simulate_price(unit_cost, target_margin_rate, quantity_kg).model_dump_json()
+        except ArithmeticError:
+            actual = "ArithmeticError"
+
+        if actual != expected:
+            mismatches += 1
+            print(f"response mismatch: cost={unit_cost} margin={target_margin_rate} quantity={quantity_kg}")
+
+    return mismatches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cost-from", type=Decimal, default=UNIT_COST_MIN, help="網羅チェックの原価下限（円/kg）")
+    parser.add_argument("--cost-to", type=Decimal, default=Decimal("0.500"), help="網羅チェックの原価上限（円/kg）")
+    parser.add_argument("--samples", type=int, default=200_000, help="ランダムチェックの件数")
+    parser.add_argument("--seed", type=int, default=0, help="乱数シード")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    exhaustive = run_exhaustive(args.cost_from, args.cost_to)
+    print(f"exhaustive: {exhaustive} mismatches ({time.perf_counter() - started:.1f}s)")
+
+    started = time.perf_counter()
+    randomized = run_random(args.samples, args.seed)
+    print(f"random: {randomized} mismatches ({time.perf_counter() - started:.1f}s)")
+
+    return 1 if exhaustive or randomized else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Shared fixtures: the API on an in-memory SQLite database."""
+from __future__ import annotations
+
+import os
+
+# app の import 前に設定（設定はモジュール読み込み時に確定する）
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DEBUG"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.database import SessionLocal
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    """起動・終了処理（インメモリDBのテーブル作成を含む）を実行するテストクライアント"""
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(client):
+    """テストごとのデータベースセッション"""
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,27 @@
+"""Margin warnings of POST /api/data-import/excel are reported only for imported rows."""
+from __future__ import annotations
+
+from decimal import Decimal
+
+from app.models import Product
+
+
+def test_rejected_rows_have_no_warnings(client, db):
+    db.add(Product(product_code="WARN-A", product_name="警告テスト", unit_cost_per_kg=Decimal("100")))
+    db.commit()
+    csv = (
+        "売上日,商品コード,数量,単価,原価\n"
+        "2025-01-05,WARN-A,1,101,100\n"
+        "2025-01-05,UNKNOWN,1,101,100\n"
+        "2025-01-06,WARN-A,1,90,100\n"
+    )
+    response = client.post(
+        "/api/data-import/excel",
+        params={"import_type": "sales", "background": False},
+        files={"file": ("warnings.csv", csv.encode(), "text/csv")},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [error["row"] for error in body["errors"]] == [3]
+    assert [warning["row"] for warning in body["warnings"]] == [2, 4]
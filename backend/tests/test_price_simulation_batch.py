@@ -0,0 +1,22 @@
+"""Per-item validation of POST /api/price-simulations/calculate-batch."""
+from __future__ import annotations
+
+
+def test_invalid_items_fail_individually(client):
+    items = [
+        {"product_name": "正常", "unit_cost_per_kg": 100, "target_margin_rate": 0.2},
+        1,
+        None,
+        {"product_name": 5, "unit_cost_per_kg": 100, "target_margin_rate": 0.2},
+    ]
+    response = client.post("/api/price-simulations/calculate-batch", json={"items": items})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (4, 1, 3)
+    results = body["results"]
+    assert results[0]["error"] is None
+    assert results[0]["result"] is not None
+    for result in results[1:]:
+        assert result["result"] is None
+        assert result["error"]["code"] == "VALIDATION_ERROR"
@@ -0,0 +1,60 @@
+"""Query count of GET /api/price-simulations/history."""
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import List, Tuple
+
+from sqlalchemy import delete, event
+
+from app.core.database import get_async_engine
+from app.models import PriceSimulation, Product
+
+
+def _add_simulations(db, count: int) -> None:
+    product = Product(product_code=f"HIST-{count}", product_name="履歴テスト", unit_cost_per_kg=Decimal("100"))
+    db.add(product)
+    db.flush()
+    db.add_all(
+        PriceSimulation(
+            product_id=product.id,
+            input_cost_per_kg=Decimal("100"),
+            target_margin_rate=Decimal("0.2"),
+            calculated_price_per_kg=Decimal("125"),
+            status="draft",
+        )
+        for _ in range(count)
+    )
+    db.commit()
+
+
+def _get_history(client, limit: int) -> Tuple[int, List[str]]:
+    """履歴を取得し、（返した件数、発行したSQL）を返す"""
+    engine = get_async_engine().sync_engine
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        response = client.get("/api/price-simulations/history", params={"limit": limit})
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+    assert response.status_code == 200
+    return len(response.json()), statements
+
+
+def test_history_statement_count_is_constant(client, db):
+    db.execute(delete(PriceSimulation))
+    db.commit()
+
+    _add_simulations(db, 1)
+    returned, single = _get_history(client, limit=50)
+    assert returned == 1
+
+    _add_simulations(db, 29)
+    returned, many = _get_history(client, limit=50)
+    assert returned == 30
+
+    assert len(single) == 1
+    assert len(many) == len(single)
@@ -0,0 +1,26 @@
+"""Fixed-point pricing kernel against the Decimal implementation (scripts.verify_pricing_kernel)."""
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from scripts.verify_pricing_kernel import run_exhaustive, run_random
+
+
+@pytest.mark.parametrize(
+    ("cost_from", "cost_to"),
+    [
+        # 最小原価付近（推奨価格が0円・1円に丸められる範囲）
+        (Decimal("0.001"), Decimal("0.010")),
+        # 一般的な原価
+        (Decimal("1234.560"), Decimal("1234.565")),
+    ],
+)
+def test_exhaustive_range_matches_decimal(cost_from, cost_to):
+    assert run_exhaustive(cost_from, cost_to) == 0
+
+
+def test_random_sample_matches_decimal():
+    # 半数は四捨五入境界ちょうどの原価（シード固定で再現可能）
+    assert run_random(5_000, seed=20240601) == 0
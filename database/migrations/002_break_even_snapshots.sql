@@ -0,0 +1,23 @@
+-- 損益分岐点の月次スナップショット（break_even_analysis）
+-- 月ごとに1行を保持し、売上・固定費・月次売上の変更時に is_stale を立てて再計算する
+ALTER TABLE public.break_even_analysis
+    ADD COLUMN IF NOT EXISTS is_stale BOOLEAN NOT NULL DEFAULT FALSE,
+    ALTER COLUMN total_revenue TYPE NUMERIC(22,6),
+    ALTER COLUMN total_variable_cost TYPE NUMERIC(22,6),
+    ALTER COLUMN achievement_rate TYPE NUMERIC(10,4);
+
+-- 変更前は同じ月に複数行を登録できたため、月ごとに最新（calculated_at が最も新しい）の1行のみ残す
+DELETE FROM public.break_even_analysis AS analysis
+USING (
+    SELECT id,
+           ROW_NUMBER() OVER (
+               PARTITION BY year_month
+               ORDER BY calculated_at DESC NULLS LAST, id DESC
+           ) AS position
+    FROM public.break_even_analysis
+) AS ranked
+WHERE analysis.id = ranked.id
+  AND ranked.position > 1;
+
+DROP INDEX IF EXISTS public.ix_break_even_analysis_year_month;
+CREATE UNIQUE INDEX ix_break_even_analysis_year_month ON public.break_even_analysis(year_month);
@@ -0,0 +1,12 @@
+-- 商品別貢献利益（/break-even/products）用のカバリングインデックス
+-- 月の範囲条件と商品ごとの集計を sales_data 本体を読まずに（Index Only Scan で）処理する
+--
+-- 【トランザクション外で実行】CREATE INDEX CONCURRENTLY と VACUUM はトランザクション内で実行できない。
+-- psql -f で実行し、BEGIN で囲んだり、ファイル全体を1トランザクションで実行するツールで適用しないこと。
+-- （売上データの書き込みを止めずに作成するため CONCURRENTLY を使用）
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_sales_data_date_product
+    ON public.sales_data (sale_date, product_id)
+    INCLUDE (quantity_kg, unit_price_per_kg, unit_cost_per_kg);
+
+-- Index Only Scan には可視性マップが必要なため、作成後に VACUUM しておく
+VACUUM (ANALYZE) public.sales_data;
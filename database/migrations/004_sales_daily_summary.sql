@@ -0,0 +1,28 @@
+-- 商品×日の売上集計（sales_daily_summary）
+-- sales_data の追加・更新・削除時にアプリケーションが増分で更新し、月末の着地見込みはこの表のみを参照する
+CREATE TABLE IF NOT EXISTS public.sales_daily_summary (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    sale_date DATE NOT NULL,
+    product_id UUID REFERENCES public.products(id) ON DELETE CASCADE,
+    quantity_kg NUMERIC(18,3) NOT NULL DEFAULT 0,
+    revenue NUMERIC(22,6) NOT NULL DEFAULT 0,
+    variable_cost NUMERIC(22,6) NOT NULL DEFAULT 0,
+    row_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- 商品が NULL の行も売上日ごとに1行にまとめる
+-- UNIQUE NULLS NOT DISTINCT は PostgreSQL 15 以降のため、NULL を固定のUUIDに置き換えた式インデックスを使用する
+CREATE UNIQUE INDEX IF NOT EXISTS uq_sales_daily_summary_date_product
+    ON public.sales_daily_summary (sale_date, COALESCE(product_id, '00000000-0000-0000-0000-000000000000'::uuid));
+
+-- 既存の売上データから初期作成
+INSERT INTO public.sales_daily_summary (sale_date, product_id, quantity_kg, revenue, variable_cost, row_count)
+SELECT sale_date,
+       product_id,
+       SUM(quantity_kg),
+       SUM(quantity_kg * unit_price_per_kg),
+       SUM(quantity_kg * unit_cost_per_kg),
+       COUNT(*)
+FROM public.sales_data
+GROUP BY sale_date, product_id
+ON CONFLICT (sale_date, COALESCE(product_id, '00000000-0000-0000-0000-000000000000'::uuid)) DO NOTHING;
@@ -0,0 +1,12 @@
+-- インポートのバックグラウンドジョブ化（import_logs に進捗を記録）
+ALTER TABLE public.import_logs
+    ADD COLUMN IF NOT EXISTS status VARCHAR(20) NOT NULL DEFAULT 'completed',
+    ADD COLUMN IF NOT EXISTS processed_rows INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rows_per_second NUMERIC(12,2),
+    ADD COLUMN IF NOT EXISTS started_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS finished_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS error_message TEXT;
+
+-- 実行中ジョブの一覧・監視用
+CREATE INDEX IF NOT EXISTS idx_import_logs_status ON public.import_logs(status)
+    WHERE status IN ('queued', 'running');
@@ -0,0 +1,19 @@
+-- 再インポートの差分取込み（ファイル・行単位のハッシュ）
+ALTER TABLE public.import_logs
+    ADD COLUMN IF NOT EXISTS file_hash VARCHAR(64),
+    ADD COLUMN IF NOT EXISTS unchanged_rows INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS deleted_rows INTEGER NOT NULL DEFAULT 0;
+
+-- 同じファイルの前回のインポートの検索用
+CREATE INDEX IF NOT EXISTS idx_import_logs_file
+    ON public.import_logs(import_type, file_name, imported_at);
+
+-- 取込み元（ファイル・シート）ごとの行ハッシュ
+CREATE TABLE IF NOT EXISTS public.import_row_hashes (
+    import_type VARCHAR(50) NOT NULL,
+    source VARCHAR(300) NOT NULL,
+    row_key VARCHAR(48) NOT NULL,
+    record_id UUID,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (import_type, source, row_key)
+);
@@ -0,0 +1,26 @@
+-- 一覧APIのキーセットページング用インデックス
+-- OFFSET を使わずにソートキーの範囲で読み込むため、何ページ目でも同じコストで取得できる
+-- 対象の price_simulations・products は小さいため、CONCURRENTLY は使わず1トランザクションで作成する
+BEGIN;
+
+-- シミュレーション履歴（(simulation_at, id) の降順、インデックスは逆順に走査）
+-- simulation_at が NULL の行があると行値の比較から漏れるため、作成日時で埋めて NOT NULL にする
+UPDATE public.price_simulations
+    SET simulation_at = COALESCE(created_at, NOW())
+    WHERE simulation_at IS NULL;
+ALTER TABLE public.price_simulations ALTER COLUMN simulation_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_simulations_date_id
+    ON public.price_simulations (simulation_at, id);
+
+-- 同じ列を先頭に持つ idx_simulations_date は不要になる
+DROP INDEX IF EXISTS public.idx_simulations_date;
+
+-- 有効な商品の一覧（(product_name, id) 順）
+CREATE INDEX IF NOT EXISTS idx_products_active_name_id
+    ON public.products (product_name, id)
+    WHERE is_active;
+
+-- 月次総売上高の一覧（year_month の降順）は UNIQUE 制約のインデックスを使用する
+
+COMMIT;
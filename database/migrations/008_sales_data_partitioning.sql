@@ -0,0 +1,72 @@
+-- sales_data を売上日（sale_date）の月単位でレンジパーティション化
+-- 月単位の集計（損益分岐点・商品別貢献利益）は該当月のパーティションのみを読み込む
+-- パーティション名は sales_data_yYYYYmMM（アプリケーションの SalesData.partition_name と同じ規則）
+-- 以降の月のパーティションは python -m app.jobs.sales_partitions ensure（毎月実行）と
+-- 売上データのインポート時に作成する
+BEGIN;
+
+ALTER TABLE public.sales_data RENAME TO sales_data_unpartitioned;
+ALTER INDEX IF EXISTS public.sales_data_pkey RENAME TO sales_data_unpartitioned_pkey;
+ALTER INDEX IF EXISTS public.idx_sales_data_date_product RENAME TO idx_sales_data_unpartitioned_date_product;
+
+-- パーティションキーを含める必要があるため、主キーは (id, sale_date)
+CREATE TABLE public.sales_data (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    product_id UUID REFERENCES public.products(id) ON DELETE CASCADE,
+    sale_date DATE NOT NULL,
+    quantity_kg NUMERIC(14,3) NOT NULL CHECK (quantity_kg > 0),
+    unit_price_per_kg NUMERIC(14,3) NOT NULL CHECK (unit_price_per_kg > 0),
+    unit_cost_per_kg NUMERIC(14,3) NOT NULL CHECK (unit_cost_per_kg > 0),
+    customer_name VARCHAR(200),
+    invoice_number VARCHAR(50),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (id, sale_date)
+) PARTITION BY RANGE (sale_date);
+
+-- 月次パーティションのない売上日を受けるパーティション（月次パーティションの作成時に移動）
+CREATE TABLE public.sales_data_default PARTITION OF public.sales_data DEFAULT;
+
+-- 既存データの最古月から3か月先までの月次パーティション
+DO $$
+DECLARE
+    month_start DATE;
+BEGIN
+    FOR month_start IN
+        SELECT generate_series(
+            date_trunc('month', COALESCE((SELECT MIN(sale_date) FROM public.sales_data_unpartitioned), CURRENT_DATE)),
+            date_trunc('month', CURRENT_DATE) + INTERVAL '3 months',
+            INTERVAL '1 month'
+        )::date
+    LOOP
+        EXECUTE format(
+            'CREATE TABLE public.%I PARTITION OF public.sales_data FOR VALUES FROM (%L) TO (%L)',
+            'sales_data_y' || to_char(month_start, 'YYYY') || 'm' || to_char(month_start, 'MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO public.sales_data (
+    id, product_id, sale_date, quantity_kg, unit_price_per_kg, unit_cost_per_kg,
+    customer_name, invoice_number, created_at
+)
+SELECT id, product_id, sale_date, quantity_kg, unit_price_per_kg, unit_cost_per_kg,
+       customer_name, invoice_number, created_at
+FROM public.sales_data_unpartitioned;
+
+DROP TABLE public.sales_data_unpartitioned;
+
+-- インデックスは親テーブルに作成し、各パーティションに作成される
+-- 売上日は取込み順にほぼ並ぶため、B-tree の代わりに小さな BRIN インデックスを使用
+CREATE INDEX idx_sales_data_sale_date_brin ON public.sales_data USING brin (sale_date);
+-- 月次・商品別集計を索引のみで処理するためのカバリングインデックス（003 と同じ）
+CREATE INDEX idx_sales_data_date_product
+    ON public.sales_data (sale_date, product_id)
+    INCLUDE (quantity_kg, unit_price_per_kg, unit_cost_per_kg);
+
+COMMIT;
+
+-- Index Only Scan には可視性マップが必要なため、作成後に VACUUM しておく
+-- （VACUUM はトランザクション内で実行できないため、上の COMMIT の後に psql -f で実行する）
+VACUUM (ANALYZE) public.sales_data;
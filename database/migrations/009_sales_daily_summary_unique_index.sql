@@ -0,0 +1,12 @@
+-- sales_daily_summary の (sale_date, product_id) の一意制約を式インデックスに置き換え
+-- UNIQUE NULLS NOT DISTINCT は PostgreSQL 15 以降のみ対応のため、004 は式インデックスで作成するよう変更した
+-- 変更前の 004 を適用済み（PostgreSQL 15 以降）のデータベースで実行する（新規作成時は何もしない）
+-- アプリケーションの ON CONFLICT の対象はこの式インデックスと一致させている
+BEGIN;
+
+ALTER TABLE public.sales_daily_summary DROP CONSTRAINT IF EXISTS uq_sales_daily_summary_date_product;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_sales_daily_summary_date_product
+    ON public.sales_daily_summary (sale_date, COALESCE(product_id, '00000000-0000-0000-0000-000000000000'::uuid));
+
+COMMIT;